@@ -0,0 +1,133 @@
+"""
+Ambiente isolado para os benchmarks.
+
+Cria uma aplicação Flask separada apontando para um banco próprio (SQLite
+em memória por padrão), registra os blueprints pedidos e oferece funções
+para popular dados sintéticos. O banco de desenvolvimento nunca é tocado.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event
+
+from config import db, normalizar_url_banco, opcoes_engine
+from roteamento_banco import CONFIG_REPLICAS, binds_replicas
+import models
+from models import (
+    Usuario, Cliente, EntidadeJuridica, TipoEmpresa, RegimeTributario,
+    CategoriaServico, Servico, Proposta, ItemProposta, OrdemServico, ItemOrdemServico
+)
+
+
+def criar_app(uri: str = None, blueprints=(), replicas=()):
+    """Cria a aplicação de benchmark com as tabelas já criadas (também nas réplicas, se houver)"""
+    app = Flask('benchmark')
+    app.config['SQLALCHEMY_DATABASE_URI'] = normalizar_url_banco(uri or os.environ.get('BENCH_DATABASE_URL', 'sqlite://'))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opcoes_engine(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_BINDS'] = binds_replicas(map(normalizar_url_banco, replicas), opcoes_engine)
+    app.config[CONFIG_REPLICAS] = tuple(app.config['SQLALCHEMY_BINDS'])
+    db.init_app(app)
+    for bp in blueprints:
+        app.register_blueprint(bp)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        for chave in app.config[CONFIG_REPLICAS]:
+            db.metadata.drop_all(db.engines[chave])
+            db.metadata.create_all(db.engines[chave])
+    return app
+
+
+def copiar_para_replicas(app):
+    """Copia todas as tabelas do banco principal para as réplicas (a replicação, no benchmark)"""
+    with app.app_context():
+        with db.engines[None].connect() as origem:
+            for chave in app.config[CONFIG_REPLICAS]:
+                with db.engines[chave].begin() as destino:
+                    for tabela in reversed(db.metadata.sorted_tables):
+                        destino.execute(tabela.delete())
+                    for tabela in db.metadata.sorted_tables:
+                        linhas = [dict(linha._mapping) for linha in origem.execute(tabela.select())]
+                        if linhas:
+                            destino.execute(tabela.insert(), linhas)
+
+
+def popular_propostas(qtd_propostas: int = 200, itens_por_proposta: int = 5, qtd_servicos: int = 5):
+    """
+    Cria propostas que compartilham o mesmo pequeno conjunto de serviços,
+    o cenário em que o carregamento em cascata mais explode.
+    """
+    tipo = TipoEmpresa(nome='LTDA')
+    regime = RegimeTributario(nome='Simples Nacional')
+    categoria = CategoriaServico(nome='Contabilidade')
+    usuario = Usuario(nome='Benchmark', email='bench@bench.com', username='bench', senha_hash='x')
+    db.session.add_all([tipo, regime, categoria, usuario])
+
+    servicos = [
+        Servico(codigo=f'SRV{i:03d}', nome=f'Serviço {i}', valor_unitario=100.0 + i, categoria=categoria)
+        for i in range(qtd_servicos)
+    ]
+    db.session.add_all(servicos)
+
+    for i in range(qtd_propostas):
+        cliente = Cliente(nome=f'Cliente {i}', cpf=f'{i:011d}', email=f'cliente{i}@bench.com')
+        entidade = EntidadeJuridica(
+            razao_social=f'Empresa {i} LTDA', nome_fantasia=f'Empresa {i}', cnpj=f'{i:014d}',
+            cliente=cliente, tipo=tipo, regime_tributario=regime
+        )
+        proposta = Proposta(
+            numero_proposta=f'PROP-{i:06d}', cliente=cliente, entidade_juridica=entidade, usuario=usuario
+        )
+        for j in range(itens_por_proposta):
+            servico = servicos[j % qtd_servicos]
+            proposta.itens.append(ItemProposta(
+                quantidade=1, valor_unitario=servico.valor_unitario,
+                valor_total=servico.valor_unitario, servico=servico
+            ))
+        db.session.add_all([cliente, entidade, proposta])
+    db.session.commit()
+
+
+@contextmanager
+def contar_consultas(engine):
+    """
+    Conta as consultas e as linhas devolvidas pelo banco dentro do bloco.
+
+    As linhas são contadas reexecutando cada SELECT capturado depois que o
+    bloco termina, para não interferir no consumo do cursor pelo ORM.
+    """
+    capturadas = []
+    resultado = {'consultas': 0, 'linhas': 0}
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        capturadas.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capturar)
+    try:
+        yield resultado
+    finally:
+        event.remove(engine, 'before_cursor_execute', capturar)
+
+    with engine.connect() as conn:
+        for statement, parameters in capturadas:
+            resultado['consultas'] += 1
+            if statement.lstrip().upper().startswith('SELECT'):
+                resultado['linhas'] += len(conn.exec_driver_sql(statement, parameters).fetchall())
+
+
+@contextmanager
+def cronometro():
+    """Mede o tempo decorrido (em segundos) dentro do bloco"""
+    resultado = {'segundos': 0.0}
+    inicio = time.perf_counter()
+    try:
+        yield resultado
+    finally:
+        resultado['segundos'] = time.perf_counter() - inicio
@@ -0,0 +1,97 @@
+"""
+Benchmark da checagem de conflitos de agenda.
+
+Popula `funcionarios` agendas com `por_funcionario` agendamentos de 1h em
+dias úteis e mede, para checagens aleatórias de um horário:
+
+- varredura: carrega a agenda do funcionário e compara um a um (o que
+  sobrava sem consulta por período);
+- consulta por período no banco, pelo índice (funcionario_id, data_inicio, data_fim);
+- a conferência da gravação: a mesma consulta só com (id, início, fim) dos
+  que ocupam a agenda (AgendamentoRepository.ocupacao).
+
+Uso:
+    python benchmarks/bench_agenda.py [funcionarios] [por_funcionario] [checagens]
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from ambiente import criar_app, cronometro
+from config import db
+from models import Agendamento, Usuario
+from repositories.agendamento_repository import AgendamentoRepository
+
+INICIO = datetime(2025, 1, 6, 8, 0)
+
+
+def popular(funcionarios: int, por_funcionario: int):
+    db.session.execute(insert(Usuario), [
+        {'nome': f'Funcionário {f}', 'email': f'f{f}@bench.com', 'username': f'f{f}', 'senha_hash': 'x'}
+        for f in range(1, funcionarios + 1)
+    ])
+    linhas = []
+    for f in range(1, funcionarios + 1):
+        for i in range(por_funcionario):
+            # 4 horários por dia (8h, 10h, 13h, 15h), dia a dia
+            inicio = INICIO + timedelta(days=i // 4, hours=(0, 2, 5, 7)[i % 4])
+            linhas.append({
+                'titulo': f'Agendamento {i}', 'data_inicio': inicio, 'data_fim': inicio + timedelta(hours=1),
+                'funcionario_id': f, 'status': 'confirmado', 'prioridade': 'normal',
+            })
+    db.session.execute(insert(Agendamento), linhas)
+    db.session.commit()
+
+
+def checagens(funcionarios: int, por_funcionario: int, qtd: int):
+    dias = max(1, por_funcionario // 4)
+    for _ in range(qtd):
+        inicio = INICIO + timedelta(days=random.randrange(dias), minutes=30 * random.randrange(20))
+        yield random.randint(1, funcionarios), inicio, inicio + timedelta(minutes=45)
+
+
+def por_varredura(repo, funcionario_id, inicio, fim):
+    return [a.id for a in repo.get_by_funcionario(funcionario_id) if a.data_inicio < fim and a.data_fim > inicio]
+
+
+def por_consulta(repo, funcionario_id, inicio, fim):
+    return [a.id for a in repo.get_por_periodo(inicio, fim, funcionario_id)]
+
+
+def por_ocupacao(repo, funcionario_id, inicio, fim):
+    return [registro_id for registro_id, _, _ in repo.ocupacao(funcionario_id, inicio, fim)]
+
+
+def medir(nome: str, funcao, casos, referencia=None):
+    with cronometro() as tempo:
+        resultados = [sorted(funcao(*caso)) for caso in casos]
+        db.session.rollback()
+    if referencia is not None and resultados != referencia:
+        print(f"  {nome}: RESULTADO DIFERENTE da varredura")
+        sys.exit(1)
+    print(f"  {nome:<28} {len(casos) / tempo['segundos']:>10.0f} checagens/s")
+    return resultados
+
+
+def main():
+    funcionarios = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    por_funcionario = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    qtd = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    app = criar_app()
+    with app.app_context():
+        popular(funcionarios, por_funcionario)
+        repo = AgendamentoRepository()
+        casos = list(checagens(funcionarios, por_funcionario, qtd))
+
+        print(f"{funcionarios} funcionários x {por_funcionario} agendamentos, {qtd} checagens")
+        referencia = medir('varredura da agenda', lambda *c: por_varredura(repo, *c), casos)
+        medir('consulta por período', lambda *c: por_consulta(repo, *c), casos, referencia)
+        medir('conferência da gravação', lambda *c: por_ocupacao(repo, *c), casos, referencia)
+
+
+if __name__ == '__main__':
+    main()
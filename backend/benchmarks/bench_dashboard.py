@@ -0,0 +1,107 @@
+"""
+Benchmark do resumo do dashboard.
+
+Popula `propostas` propostas (com clientes e itens, como nos outros
+benchmarks) e `agendamentos` agendamentos de 1h nos próximos dias e compara:
+
+- por listas: o que o frontend fazia, uma listagem por status
+  (PropostaRepository/OrdemServicoRepository.get_by_status), a de clientes e
+  a de agendamentos, só para contar;
+- DashboardService.resumo: leitura dos contadores materializados.
+
+Confere que os dois dão os mesmos números e mede o custo dos contadores na
+escrita (propostas/s com e sem os eventos).
+
+Uso:
+    python benchmarks/bench_dashboard.py [propostas] [agendamentos]
+"""
+
+import sys
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import event
+
+from ambiente import criar_app, popular_propostas, contar_consultas, cronometro
+from config import db
+from models import Agendamento, Cliente, Proposta, Usuario
+from models.dashboard import CONTADORES, _contar_apos_inserir
+from models.ordemServico import STATUS_ORDEM_SERVICO
+from models.proposta import STATUS_PROPOSTA
+from repositories.agendamento_repository import AgendamentoRepository
+from repositories.ordemServico_repository import OrdemServicoRepository
+from repositories.proposta_repository import PropostaRepository
+from services.dashboard_service import DashboardService, DASHBOARD_DIAS_PROXIMOS
+
+
+def por_listas():
+    propostas = {status: len(PropostaRepository().get_by_status(status)) for status in STATUS_PROPOSTA}
+    ordens = {status: len(OrdemServicoRepository().get_by_status(status)) for status in STATUS_ORDEM_SERVICO}
+    clientes = len(Cliente.ativos().all())
+    inicio = datetime.combine(date.today(), time())
+    agendamentos = len([
+        a for a in AgendamentoRepository().get_por_periodo(inicio, inicio + timedelta(days=DASHBOARD_DIAS_PROXIMOS))
+        if a.data_inicio >= inicio and a.status not in ('cancelado', 'adiado')
+    ])
+    return propostas, ordens, clientes, agendamentos
+
+
+def popular_agendamentos(qtd: int):
+    usuario = Usuario.query.first()
+    inicio = datetime.combine(date.today(), time(8))
+    db.session.add_all([
+        Agendamento(titulo=f'Agendamento {i}', funcionario_id=usuario.id,
+                    data_inicio=inicio + timedelta(days=i % 30, minutes=i % 600),
+                    data_fim=inicio + timedelta(days=i % 30, minutes=i % 600 + 60))
+        for i in range(qtd)
+    ])
+    db.session.commit()
+
+
+def medir_escrita(qtd: int, inicio: int) -> float:
+    with cronometro() as tempo:
+        for i in range(inicio, inicio + qtd):
+            db.session.add(Proposta(numero_proposta=f'ESC-{i:06d}'))
+            db.session.commit()
+    return qtd / tempo['segundos']
+
+
+def main():
+    propostas = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    agendamentos = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    app = criar_app()
+    with app.app_context():
+        popular_propostas(propostas, itens_por_proposta=2)
+        popular_agendamentos(agendamentos)
+        db.session.remove()
+        print(f"{propostas} propostas/clientes, {agendamentos} agendamentos")
+
+        with contar_consultas(db.engine) as contagem, cronometro() as tempo:
+            esperado = por_listas()
+        print(f"  {'por listas':<28} {tempo['segundos'] * 1000:>9.1f} ms   "
+              f"{contagem['consultas']} consultas, {contagem['linhas']} linhas")
+        db.session.remove()
+
+        with contar_consultas(db.engine) as contagem, cronometro() as tempo:
+            resumo = DashboardService().resumo()
+        print(f"  {'contadores (resumo)':<28} {tempo['segundos'] * 1000:>9.1f} ms   "
+              f"{contagem['consultas']} consulta(s), {contagem['linhas']} linhas")
+
+        obtido = (
+            resumo['propostas']['por_status'], resumo['ordens']['por_status'],
+            resumo['clientes']['ativos'], resumo['agendamentos']['proximos'],
+        )
+        if obtido != esperado:
+            print("RESULTADO DIFERENTE entre os dois métodos")
+            sys.exit(1)
+
+        event.remove(Proposta, 'after_insert', _contar_apos_inserir)
+        sem_eventos = medir_escrita(2000, 0)
+        event.listen(Proposta, 'after_insert', _contar_apos_inserir)
+        com_eventos = medir_escrita(2000, 2000)
+        print(f"  escrita: {sem_eventos:.0f} propostas/s sem contadores, {com_eventos:.0f} com "
+              f"({len(CONTADORES)} modelos contados)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark da disponibilidade em comum de uma equipe.
+
+Popula `funcionarios` agendas (as mesmas de bench_agenda.py) e procura
+horários de 1h livres para todos em uma janela de `dias`:
+
+- por objetos: carrega os Agendamentos ORM de cada funcionário e cruza as
+  agendas uma a uma (o que o frontend fazia);
+- AgendamentoService.disponibilidade: uma consulta ordenada, só tuplas
+  (mais a das séries da equipe), e uma varredura.
+
+Uso:
+    python benchmarks/bench_disponibilidade.py [funcionarios] [por_funcionario] [dias]
+"""
+
+import sys
+from datetime import timedelta
+
+from ambiente import criar_app, contar_consultas, cronometro
+from bench_agenda import INICIO, popular
+from config import db
+from repositories.agendamento_repository import AgendamentoRepository
+from services.agenda_indice import trechos_livres
+from services.agendamento_services import AgendamentoService
+
+
+def por_objetos(funcionario_ids, inicio, fim, duracao):
+    repo = AgendamentoRepository()
+    ocupados = []
+    for funcionario_id in funcionario_ids:
+        ocupados += [(a.data_inicio, a.data_fim) for a in repo.get_by_funcionario(funcionario_id)
+                     if a.data_inicio < fim and a.data_fim > inicio]
+    return trechos_livres(sorted(ocupados), inicio, fim, duracao)
+
+
+def main():
+    funcionarios = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    por_funcionario = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    dias = int(sys.argv[3]) if len(sys.argv) > 3 else 365
+
+    app = criar_app()
+    with app.app_context():
+        popular(funcionarios, por_funcionario)
+        ids = list(range(1, funcionarios + 1))
+        inicio, fim = INICIO, INICIO + timedelta(days=dias)
+        print(f"{funcionarios} funcionários x {por_funcionario} agendamentos, janela de {dias} dias")
+
+        with cronometro() as tempo:
+            esperado = por_objetos(ids, inicio, fim, timedelta(hours=1))
+        db.session.remove()
+        print(f"  {'por objetos':<28} {tempo['segundos'] * 1000:>9.0f} ms   {funcionarios} consultas")
+
+        with contar_consultas(db.engine) as contagem, cronometro() as tempo:
+            resultado = AgendamentoService().disponibilidade(inicio, fim, 60, funcionario_ids=ids)
+        print(f"  {'varredura':<28} {tempo['segundos'] * 1000:>9.0f} ms   "
+              f"{contagem['consultas']} consulta(s), {len(resultado['livres'])} horários livres")
+
+        if [(d.isoformat(), a.isoformat()) for d, a in esperado] != [(t['inicio'], t['fim']) for t in resultado['livres']]:
+            print("RESULTADO DIFERENTE entre os dois métodos")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
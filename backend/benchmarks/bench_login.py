@@ -0,0 +1,94 @@
+"""
+Benchmark de vazão do login.
+
+Cria N usuários e mede logins por segundo de UsuarioService.validar_credenciais
+entrando por username, email e CPF. Para comparação, mede também só a busca
+do usuário: a busca antiga (até três consultas: username, email, CPF) e a
+tabela login_identificadores (uma consulta). O login completo inclui o hash
+da senha, que costuma dominar o tempo; a busca isolada mostra o custo que
+sai do banco.
+
+Uso:
+    python benchmarks/bench_login.py [qtd_usuarios] [buscas] [logins]
+"""
+
+import random
+import sys
+
+from werkzeug.security import generate_password_hash
+
+from ambiente import criar_app, contar_consultas, cronometro
+from config import db
+from models import Usuario
+from repositories.login_identificador_repository import LoginIdentificadorRepository
+from services.usuario_service import UsuarioService
+
+SENHA = 'senha-benchmark'
+
+
+def popular_usuarios(qtd: int):
+    # Um único hash para todos: popular o banco não deve custar N execuções do scrypt
+    senha_hash = generate_password_hash(SENHA)
+    for inicio in range(0, qtd, 1000):
+        db.session.add_all([
+            Usuario(
+                nome=f'Usuário {i}', username=f'usuario{i}', email=f'usuario{i}@bench.com',
+                cpf=f'{i:011d}', senha_hash=senha_hash
+            )
+            for i in range(inicio, min(inicio + 1000, qtd))
+        ])
+        db.session.commit()
+
+
+def busca_antiga(identificador: str):
+    usuario = Usuario.query.filter_by(username=identificador, ativo=True).first()
+    if not usuario:
+        usuario = Usuario.query.filter_by(email=identificador, ativo=True).first()
+    if not usuario:
+        usuario = Usuario.query.filter_by(cpf=identificador, ativo=True).first()
+    return usuario
+
+
+def medir(nome: str, funcao, identificadores, engine):
+    funcao(identificadores[0])  # aquecimento (compilação da consulta, cache de statements)
+    with contar_consultas(engine) as contagem, cronometro() as tempo:
+        for identificador in identificadores:
+            assert funcao(identificador) is not None, identificador
+    qtd = len(identificadores)
+    print(f"  {nome:<34} {qtd / tempo['segundos']:>10.0f}/s   {contagem['consultas'] / qtd:.1f} consultas cada")
+
+
+def main():
+    qtd_usuarios = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    buscas = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    logins = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    app = criar_app()
+    with app.app_context():
+        popular_usuarios(qtd_usuarios)
+        engine = db.engine
+        repo = LoginIdentificadorRepository()
+        service = UsuarioService()
+
+        sorteados = [random.randrange(qtd_usuarios) for _ in range(buscas)]
+        por_tipo = {
+            'username': [f'usuario{i}' for i in sorteados],
+            'email': [f'usuario{i}@bench.com' for i in sorteados],
+            'cpf': [f'{i:011d}' for i in sorteados],
+        }
+
+        print(f"Usuários no banco: {qtd_usuarios}")
+        print(f"Busca do usuário ({buscas} por cenário)")
+        for tipo, identificadores in por_tipo.items():
+            medir(f"antiga, por {tipo}", busca_antiga, identificadores, engine)
+            medir(f"login_identificadores, por {tipo}", repo.buscar_usuario, identificadores, engine)
+
+        print(f"Login completo: busca + verificação da senha + último login ({logins} por cenário)")
+        for tipo, identificadores in por_tipo.items():
+            medir(f"validar_credenciais, por {tipo}",
+                  lambda identificador: service.validar_credenciais(identificador, SENHA),
+                  identificadores[:logins], engine)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark do tempo de renderização de um PDF de proposta.
+
+Compara o caminho antigo — Environment do Jinja novo, busca do logo e CSS
+embutido no HTML reinterpretado pelo WeasyPrint a cada documento, sem
+cache de fontes — com o renderizador aquecido de services/pdf_renderizador.py
+(template compilado, CSS pré-interpretado, fontes e logo em cache, saída em
+bytes). Usa os dados de exemplo do PropostaPDF, sem banco.
+
+Uso:
+    python benchmarks/bench_pdf_render.py [documentos]
+"""
+
+import os
+import sys
+
+from ambiente import cronometro
+from jinja2 import Environment, FileSystemLoader
+from services.pdf_renderizador import (
+    obter_renderizador, formatar_moeda, _caminho_logo, CSS_PDF, TEMPLATE_PDF, WEASYPRINT_AVAILABLE
+)
+from services.pdf_generator import PropostaPDF
+
+
+def renderizar_como_antes(renderizador, template_data):
+    """Reproduz o custo por documento do gerador antigo"""
+    jinja_env = Environment(loader=FileSystemLoader(renderizador.template_dir))
+    jinja_env.filters['currency'] = formatar_moeda
+    jinja_env.globals['logo_uri'] = renderizador.jinja_env.globals['logo_uri']
+    _caminho_logo()
+
+    with open(os.path.join(renderizador.template_dir, CSS_PDF), encoding='utf-8') as arquivo:
+        css = arquivo.read()
+    html = jinja_env.get_template(TEMPLATE_PDF).render(**template_data)
+    html = html.replace('</head>', f'<style>{css}</style></head>', 1)
+
+    import weasyprint
+    return weasyprint.HTML(string=html, base_url=renderizador.template_dir).write_pdf()
+
+
+def medir(nome, documentos, funcao):
+    with cronometro() as tempo:
+        for _ in range(documentos):
+            funcao()
+    print(f"  {nome:<28} {tempo['segundos'] / documentos * 1000:8.1f} ms/documento")
+    return tempo['segundos']
+
+
+def main():
+    if not WEASYPRINT_AVAILABLE:
+        print("WeasyPrint não está disponível. Instale com: pip install weasyprint")
+        sys.exit(1)
+
+    documentos = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    with cronometro() as aquecimento:
+        renderizador = obter_renderizador()
+    template_data = PropostaPDF()._criar_dados_mock(1)
+
+    # Uma renderização de cada antes de medir, para não contar importações
+    renderizar_como_antes(renderizador, template_data)
+    renderizador.pdf_bytes(template_data)
+
+    print(f"Documentos por caminho: {documentos}")
+    print(f"Criação do renderizador: {aquecimento['segundos'] * 1000:.1f} ms (uma vez por processo)")
+    antes = medir("antes (a frio)", documentos, lambda: renderizar_como_antes(renderizador, template_data))
+    depois = medir("renderizador aquecido", documentos, lambda: renderizador.pdf_bytes(template_data))
+    print(f"Ganho: {antes / depois:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark de regressão do GET /api/propostas/<id>.
+
+Conta quantas consultas e quantas linhas o banco devolve para montar uma
+única proposta e, para comparação, um dos serviços usados nos itens. Com o
+carregamento em cascata (lazy='joined' em Proposta, ItemProposta e Servico)
+carregar um serviço trazia todos os itens de todas as propostas que o usam;
+com os perfis de repositories/carregamento.py as linhas devem ficar
+constantes, independente do tamanho da tabela.
+
+Uso:
+    python benchmarks/bench_proposta_detalhe.py [qtd_propostas] [itens_por_proposta]
+"""
+
+import sys
+
+from ambiente import criar_app, popular_propostas, contar_consultas, cronometro
+from config import db
+from controllers.proposta_controller import bp as proposta_bp
+from repositories.servico_repository import ServicoRepository
+
+LIMITE_LINHAS = 50
+
+
+def main():
+    qtd_propostas = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    itens_por_proposta = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    app = criar_app(blueprints=[proposta_bp])
+    with app.app_context():
+        popular_propostas(qtd_propostas, itens_por_proposta)
+        engine = db.engine
+
+    cliente = app.test_client()
+    with contar_consultas(engine) as contagem, cronometro() as tempo:
+        resposta = cliente.get('/api/propostas/1')
+
+    assert resposta.status_code == 200, resposta.get_data(as_text=True)
+    assert len(resposta.get_json()['itens']) == itens_por_proposta
+
+    with app.app_context():
+        with contar_consultas(engine) as contagem_servico:
+            ServicoRepository().get_by_id(1).to_json()
+
+    print(f"Propostas no banco:      {qtd_propostas} ({itens_por_proposta} itens cada)")
+    print("GET /api/propostas/1")
+    print(f"  Consultas executadas:  {contagem['consultas']}")
+    print(f"  Linhas lidas do banco: {contagem['linhas']}")
+    print(f"  Tempo da requisição:   {tempo['segundos'] * 1000:.1f} ms")
+    print("ServicoRepository.get_by_id(1)")
+    print(f"  Consultas executadas:  {contagem_servico['consultas']}")
+    print(f"  Linhas lidas do banco: {contagem_servico['linhas']}")
+
+    if max(contagem['linhas'], contagem_servico['linhas']) > LIMITE_LINHAS:
+        print(f"REGRESSÃO: mais de {LIMITE_LINHAS} linhas para carregar um único registro")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
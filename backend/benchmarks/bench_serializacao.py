@@ -0,0 +1,60 @@
+"""
+Benchmark da serialização das listagens: to_json() + jsonify contra os
+serializadores compilados de serializers/ + encoder rápido.
+
+As propostas são carregadas uma única vez (com o perfil do repositório)
+e só a etapa de serialização é cronometrada. Antes de medir, confere que a
+saída padrão dos serializadores é idêntica à do to_json().
+
+Uso:
+    python benchmarks/bench_serializacao.py [qtd_propostas] [itens_por_proposta] [repeticoes]
+"""
+
+import json
+import sys
+
+from ambiente import criar_app, popular_propostas, cronometro
+from repositories.proposta_repository import PropostaRepository
+from serializers import obter_serializador, ler_expansoes, dumps, ORJSON_AVAILABLE
+
+
+def medir(nome, qtd, repeticoes, funcao):
+    melhor = None
+    for _ in range(repeticoes):
+        with cronometro() as tempo:
+            funcao()
+        melhor = tempo['segundos'] if melhor is None else min(melhor, tempo['segundos'])
+    print(f"  {nome:<38} {melhor * 1000:8.1f} ms  {qtd / melhor:10.0f} linhas/s")
+    return melhor
+
+
+def main():
+    qtd_propostas = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    itens_por_proposta = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    repeticoes = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    app = criar_app()
+    with app.app_context():
+        popular_propostas(qtd_propostas, itens_por_proposta)
+        propostas = PropostaRepository().get_all()
+
+        completo = obter_serializador('Proposta')
+        plano = obter_serializador('Proposta', None, ler_expansoes(''))
+
+        antigo = json.loads(app.json.dumps([proposta.to_json() for proposta in propostas]))
+        novo = json.loads(dumps([completo(proposta) for proposta in propostas]))
+        assert antigo == novo, "A saída padrão do schema 'Proposta' difere de Proposta.to_json()"
+
+        print(f"Propostas serializadas: {qtd_propostas} ({itens_por_proposta} itens cada)")
+        print(f"Encoder: {'orjson' if ORJSON_AVAILABLE else 'json (biblioteca padrão)'}")
+        base = medir("to_json() + jsonify", qtd_propostas, repeticoes,
+                     lambda: app.json.dumps([proposta.to_json() for proposta in propostas]))
+        rapido = medir("compilado (padrão)", qtd_propostas, repeticoes,
+                       lambda: dumps(list(map(completo, propostas))))
+        medir("compilado (?expand=, sem relações)", qtd_propostas, repeticoes,
+              lambda: dumps(list(map(plano, propostas))))
+        print(f"Ganho na saída padrão: {base / rapido:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark das séries recorrentes.
+
+Cada funcionário tem uma reunião semanal (segunda e quarta, 1h) por
+`semanas` semanas, gravada de dois jeitos:
+
+- uma linha de Agendamento por ocorrência (o que se fazia sem recorrência);
+- uma SerieAgendamento por funcionário, com as ocorrências geradas só para
+  o período pedido.
+
+Mede o tamanho da tabela e o GET por período (AgendamentoService.get_por_periodo)
+de `dias` dias no meio da série; as duas listas têm que ser iguais.
+
+Uso:
+    python benchmarks/bench_series.py [funcionarios] [semanas] [dias]
+"""
+
+import sys
+from datetime import timedelta
+
+from sqlalchemy import insert, delete, func, select
+
+from ambiente import criar_app, contar_consultas, cronometro
+from bench_agenda import INICIO
+from config import db
+from models import Agendamento, SerieAgendamento, Usuario
+from services.agendamento_services import AgendamentoService
+
+DIAS_SEMANA = (0, 2)
+
+
+def popular_funcionarios(funcionarios: int):
+    db.session.execute(insert(Usuario), [
+        {'nome': f'Funcionário {f}', 'email': f'f{f}@bench.com', 'username': f'f{f}', 'senha_hash': 'x'}
+        for f in range(1, funcionarios + 1)
+    ])
+    db.session.commit()
+
+
+def popular_linhas(funcionarios: int, semanas: int):
+    db.session.execute(insert(Agendamento), [
+        {
+            'titulo': 'Reunião semanal', 'funcionario_id': f, 'status': 'confirmado', 'prioridade': 'normal',
+            'data_inicio': INICIO + timedelta(weeks=s, days=dia),
+            'data_fim': INICIO + timedelta(weeks=s, days=dia, hours=1),
+        }
+        for f in range(1, funcionarios + 1) for s in range(semanas) for dia in DIAS_SEMANA
+    ])
+    db.session.commit()
+
+
+def popular_series(funcionarios: int, semanas: int):
+    series = []
+    for f in range(1, funcionarios + 1):
+        serie = SerieAgendamento(
+            titulo='Reunião semanal', funcionario_id=f, status='confirmado', data_inicio=INICIO,
+            duracao_minutos=60, frequencia='semanal', dias_semana=DIAS_SEMANA, contagem=semanas * len(DIAS_SEMANA),
+        )
+        serie.validar_regra()
+        series.append(serie)
+    db.session.add_all(series)
+    db.session.commit()
+
+
+def medir(nome: str, inicio, fim):
+    total = db.session.scalar(select(func.count()).select_from(Agendamento))
+    db.session.remove()
+    with contar_consultas(db.engine) as contagem, cronometro() as tempo:
+        agendamentos = AgendamentoService().get_por_periodo(inicio, fim)
+        resultado = [(a.funcionario_id, a.data_inicio, a.data_fim) for a in agendamentos]
+    print(f"  {nome:<28} {total:>9} linhas   {tempo['segundos'] * 1000:>8.1f} ms   "
+          f"{contagem['consultas']} consulta(s), {len(resultado)} agendamentos no período")
+    db.session.remove()
+    return sorted(resultado)
+
+
+def main():
+    funcionarios = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    semanas = int(sys.argv[2]) if len(sys.argv) > 2 else 260
+    dias = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+
+    app = criar_app()
+    with app.app_context():
+        popular_funcionarios(funcionarios)
+        inicio = INICIO + timedelta(weeks=semanas // 2)
+        fim = inicio + timedelta(days=dias)
+        print(f"{funcionarios} funcionários x {semanas} semanas de reunião, período de {dias} dias")
+
+        popular_linhas(funcionarios, semanas)
+        esperado = medir('uma linha por ocorrência', inicio, fim)
+
+        db.session.execute(delete(Agendamento))
+        db.session.commit()
+        popular_series(funcionarios, semanas)
+        resultado = medir('séries (expansão no período)', inicio, fim)
+
+        if resultado != esperado:
+            print("RESULTADO DIFERENTE entre os dois métodos")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark dos totais guardados de propostas.
+
+Popula `propostas` propostas com `itens` itens cada e compara a listagem de
+totais (subtotal, desconto, total e quantidade de itens por proposta):
+
+- somando os itens: propostas com os itens carregados (selectinload) e a
+  soma feita em Python, como Proposta.calcular_totais() fazia;
+- colunas guardadas: PropostaRepository.get_totais(), só a tabela de propostas.
+
+Confere que os dois dão os mesmos números e mede o custo dos eventos na
+escrita de itens (itens/s com e sem os eventos de models/totais.py).
+
+Uso:
+    python benchmarks/bench_totais.py [propostas] [itens]
+"""
+
+import sys
+
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+
+from ambiente import criar_app, popular_propostas, contar_consultas, cronometro
+from config import db
+from models import Proposta, ItemProposta
+from models.totais import _somar_apos_inserir
+from repositories.proposta_repository import PropostaRepository
+
+
+def somando_itens():
+    totais = {}
+    for proposta in Proposta.query.options(selectinload(Proposta.itens)).filter_by(ativo=True).order_by(Proposta.id):
+        ativos = [item for item in proposta.itens if item.ativo]
+        subtotal = round(sum(item.valor_total for item in ativos), 2)
+        desconto = round(subtotal * (proposta.porcentagem_desconto or 0) / 100, 2)
+        totais[proposta.id] = (subtotal, desconto, round(subtotal - desconto, 2), sum(item.quantidade for item in ativos))
+    return totais
+
+
+def colunas_guardadas():
+    return {
+        linha['id']: (linha['subtotal'], linha['valor_desconto'], linha['valor_total'], linha['quantidade_itens'])
+        for linha in PropostaRepository().get_totais()
+    }
+
+
+def medir_escrita(proposta_id: int, qtd: int) -> float:
+    with cronometro() as tempo:
+        for _ in range(qtd):
+            db.session.add(ItemProposta(proposta_id=proposta_id, quantidade=1, valor_unitario=10.0, valor_total=10.0))
+            db.session.commit()
+    return qtd / tempo['segundos']
+
+
+def main():
+    propostas = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    itens = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    app = criar_app()
+    with app.app_context():
+        popular_propostas(propostas, itens_por_proposta=itens)
+        db.session.remove()
+        print(f"{propostas} propostas com {itens} itens")
+
+        resultados = []
+        for nome, funcao in (('somando os itens', somando_itens), ('colunas guardadas', colunas_guardadas)):
+            with contar_consultas(db.engine) as contagem, cronometro() as tempo:
+                resultados.append(funcao())
+            print(f"  {nome:<28} {tempo['segundos'] * 1000:>9.1f} ms   "
+                  f"{contagem['consultas']} consulta(s), {contagem['linhas']} linhas")
+            db.session.remove()
+
+        if resultados[0] != resultados[1]:
+            print("RESULTADO DIFERENTE entre os dois métodos")
+            sys.exit(1)
+
+        proposta_id = min(resultados[1])
+        event.remove(ItemProposta, 'after_insert', _somar_apos_inserir)
+        sem_eventos = medir_escrita(proposta_id, 2000)
+        event.listen(ItemProposta, 'after_insert', _somar_apos_inserir)
+        com_eventos = medir_escrita(proposta_id, 2000)
+        print(f"  escrita: {sem_eventos:.0f} itens/s sem os totais, {com_eventos:.0f} com")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,125 @@
 import json
 from flask import Blueprint, request, jsonify
-from services.agendamento_services import AgendamentoService
+from services.agendamento_services import AgendamentoService, SerieAgendamentoService, ConflitoAgendamento
+from controllers.paginacao import resposta_lista
+from models.agendamento import Agendamento, SerieAgendamento
+from controllers.condicional import get_condicional, RELACOES_FUNCIONARIO
 
 bp = Blueprint('agendamento', __name__, url_prefix='/api/agendamentos')
 service = AgendamentoService()
+series_service = SerieAgendamentoService()
+
+
+def resposta_conflito(erro: ConflitoAgendamento):
+    return jsonify({'error': str(erro), 'conflitos': erro.conflitos, 'series': erro.series}), 409
 
 @bp.route('/', methods=['GET'])
+@get_condicional(Agendamento, relacoes=RELACOES_FUNCIONARIO, modelos=(SerieAgendamento,))
 def get_agendamentos():
-    agendamentos = service.get_all()
-    return jsonify([agendamento.to_json() for agendamento in agendamentos])
+    filtros = {nome: request.args.get(nome) for nome in ('inicio', 'fim', 'funcionario_id') if request.args.get(nome)}
+    if not filtros:
+        return resposta_lista(service.get_all(), 'Agendamento')
+    try:
+        agendamentos = service.get_por_periodo(**filtros)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_lista(agendamentos, 'Agendamento')
+
+@bp.route('/disponibilidade', methods=['GET'])
+def get_disponibilidade():
+    try:
+        parametros = ('inicio', 'fim', 'duracao', 'funcionario_ids', 'departamento_id', 'cargo_id', 'expediente')
+        return jsonify(service.disponibilidade(**{nome: request.args.get(nome) for nome in parametros}))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/conflitos', methods=['GET'])
+def get_conflitos():
+    try:
+        conflitos = service.conflitos(
+            request.args.get('funcionario_id'), request.args.get('inicio'),
+            request.args.get('fim'), request.args.get('ignorar'), request.args.get('ignorar_serie')
+        )
+        return jsonify(conflitos)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+# ======================================================
+# Séries recorrentes
+# ======================================================
+
+@bp.route('/series', methods=['GET'])
+@get_condicional(SerieAgendamento, relacoes=RELACOES_FUNCIONARIO)
+def get_series():
+    return resposta_lista(series_service.get_all(), 'SerieAgendamento')
+
+@bp.route('/series/<int:serie_id>', methods=['GET'])
+@get_condicional(SerieAgendamento, 'serie_id', relacoes=RELACOES_FUNCIONARIO)
+def get_serie(serie_id):
+    serie = series_service.get_by_id(serie_id)
+    if not serie:
+        return jsonify({'error': 'Série não encontrada'}), 404
+    return jsonify(serie.to_json())
+
+@bp.route('/series/<int:serie_id>/ocorrencias', methods=['GET'])
+@get_condicional(SerieAgendamento, 'serie_id', relacoes=RELACOES_FUNCIONARIO)
+def get_ocorrencias_serie(serie_id):
+    try:
+        ocorrencias = series_service.ocorrencias(serie_id, request.args.get('inicio'), request.args.get('fim'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_lista(ocorrencias, 'Agendamento')
+
+@bp.route('/series', methods=['POST'])
+def criar_serie():
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Dados não fornecidos'}), 400
+
+    try:
+        serie = series_service.criar_serie(**data)
+        return jsonify(serie.to_json()), 201
+    except ConflitoAgendamento as e:
+        return resposta_conflito(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/series/<int:serie_id>', methods=['PUT'])
+def altera_serie(serie_id):
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Dados para atualização não encontrados'}), 400
+
+    try:
+        serie = series_service.atualizar_serie(serie_id, **data)
+        return jsonify(serie.to_json()), 200
+    except ConflitoAgendamento as e:
+        return resposta_conflito(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/series/<int:serie_id>/excecoes', methods=['POST'])
+def adicionar_excecao_serie(serie_id):
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Dados não fornecidos'}), 400
+
+    try:
+        serie = series_service.adicionar_excecao(serie_id, data.get('data'))
+        return jsonify(serie.to_json()), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/series/<int:serie_id>', methods=['DELETE'])
+def deletar_serie(serie_id):
+    try:
+        series_service.deletar_serie(serie_id)
+        return jsonify({'message': 'Série deletada com sucesso'}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 @bp.route('/<int:agendamento_id>', methods=['GET'])
+@get_condicional(Agendamento, 'agendamento_id', relacoes=RELACOES_FUNCIONARIO)
 def get_agendamento_especifico(agendamento_id):
     agendamento = service.get_by_id(agendamento_id)
     if not agendamento:
@@ -18,10 +127,21 @@ def get_agendamento_especifico(agendamento_id):
     return jsonify(agendamento.to_json())
 
 @bp.route('/funcionario/<int:funcionario_id>', methods=['GET'])
+@get_condicional(Agendamento, relacoes=RELACOES_FUNCIONARIO)
 def get_agendamentos_por_funcionario(funcionario_id):
     agendamentos = service.get_by_funcionario(funcionario_id)
     return jsonify([agendamento.to_json() for agendamento in agendamentos])
 
+@bp.route('/funcionario/<int:funcionario_id>/livres', methods=['GET'])
+def get_horarios_livres(funcionario_id):
+    try:
+        livres = service.horarios_livres(
+            funcionario_id, request.args.get('inicio'), request.args.get('fim'), request.args.get('duracao')
+        )
+        return jsonify(livres)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
 @bp.route('/', methods=['POST'])
 def criar_agendamento():
     data = request.get_json()
@@ -31,6 +151,8 @@ def criar_agendamento():
     try:
         agendamento = service.criar_agendamento(**data)
         return jsonify(agendamento.to_json()), 201
+    except ConflitoAgendamento as e:
+        return resposta_conflito(e)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
 
@@ -43,6 +165,8 @@ def altera_agendamento(agendamento_id):
     try:
         agendamento = service.atualizar_agendamento(agendamento_id, **data)
         return jsonify(agendamento.to_json()), 200
+    except ConflitoAgendamento as e:
+        return resposta_conflito(e)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     
@@ -0,0 +1,23 @@
+from flask import Blueprint, request, jsonify
+from services.autocomplete_service import autocomplete_service
+from middleware.autenticacao_middleware import token_obrigatório
+from serializers import resposta_json
+
+bp = Blueprint('autocomplete', __name__, url_prefix='/api/autocomplete')
+
+@bp.route('/<string:entidade>', methods=['GET'])
+@token_obrigatório
+def autocomplete(entidade):
+    """
+    Sugestões para os seletores, do índice em memória
+
+    Entidades: clientes, entidades-juridicas, servicos, tipos-atividade
+    Query Parameters:
+    - prefix: str (obrigatório) - Início de qualquer palavra do nome (ou do código)
+    - limit: int (opcional) - Máximo de sugestões (padrão 10, máximo 50)
+    """
+    try:
+        resultados = autocomplete_service.buscar(entidade, request.args.get('prefix'), request.args.get('limit'))
+        return resposta_json(resultados)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
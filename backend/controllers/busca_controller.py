@@ -0,0 +1,31 @@
+from flask import Blueprint, request, jsonify
+from services.busca_service import BuscaService
+from middleware.autenticacao_middleware import token_obrigatório
+from serializers import resposta_json
+
+bp = Blueprint('busca', __name__, url_prefix='/api/search')
+service = BuscaService()
+
+@bp.route('', methods=['GET'])
+@bp.route('/', methods=['GET'])
+@token_obrigatório
+def buscar():
+    """
+    Busca unificada por relevância
+
+    Query Parameters:
+    - q: str (obrigatório) - Texto buscado (prefixos, sem diferenciar acentos)
+    - tipos: str (opcional) - cliente,entidade_juridica,servico,usuario
+    - limit: int (opcional) - Resultados por página (padrão 20)
+    - offset: int (opcional) - Posição inicial
+    """
+    try:
+        resultado = service.buscar(
+            request.args.get('q'),
+            tipos=request.args.get('tipos'),
+            limit=request.args.get('limit'),
+            offset=request.args.get('offset'),
+        )
+        return resposta_json(resultado)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from services.cargo_service import CargoService
 from middleware.autenticacao_middleware import token_obrigatório
+from controllers.condicional import resposta_com_etag, get_condicional
+from models.organizacional import Cargo
 
 bp = Blueprint('cargo', __name__, url_prefix='/api/cargos')
 service = CargoService()
@@ -14,13 +16,14 @@ service = CargoService()
 def get_cargos():
     """Lista todos os cargos"""
     try:
-        cargos = service.get_all()
-        return jsonify([cargo.to_json() for cargo in cargos]), 200
+        cargos, etag = service.listar_json()
+        return resposta_com_etag(cargos, etag)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:cargo_id>', methods=['GET'])
 @token_obrigatório
+@get_condicional(Cargo, 'cargo_id')
 def get_cargo_por_id(cargo_id):
     """Busca cargo por ID"""
     try:
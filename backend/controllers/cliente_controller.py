@@ -1,8 +1,11 @@
 import json
 from flask import Blueprint, request, jsonify
+from controllers.paginacao import listar
 from services.cliente_service import ClienteService
 from services.endereco_service import EnderecoService
 from services.entidade_juridica_service import EntidadeJuridicaService
+from models.cliente import Cliente
+from controllers.condicional import get_condicional
 
 bp = Blueprint('cliente', __name__, url_prefix='/api/clientes')
 service_cliente = ClienteService()
@@ -10,11 +13,12 @@ service_endereco = EnderecoService()
 service_entidade = EntidadeJuridicaService()
 
 @bp.route('/', methods=['GET'])
+@get_condicional(Cliente)
 def get_clientes():
-    clientes = service_cliente.get_all()
-    return jsonify([cliente.to_json() for cliente in clientes])
+    return listar(service_cliente, 'Cliente')
 
 @bp.route('/<int:cliente_id>', methods=['GET'])
+@get_condicional(Cliente, 'cliente_id', relacoes=('enderecos',))
 def get_cliente_especifico(cliente_id):
     cliente = service_cliente.get_by_id(cliente_id)
     if not cliente:
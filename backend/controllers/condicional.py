@@ -0,0 +1,168 @@
+"""
+Respostas com ETag e GET condicional (If-None-Match / If-Modified-Since -> 304).
+
+get_condicional() envolve um endpoint GET: antes de chamar o handler lê a
+versão do que ele vai devolver com uma única consulta agregada (sem
+carregar nem serializar registros) e, se o cliente já tem essa versão,
+responde 304 na hora.
+
+- Registro (`parametro` = nome do argumento da rota com o id): updated_at
+  da linha mais, para cada relação em `relacoes`, o updated_at do registro
+  relacionado (many-to-one) ou max(updated_at) + count(*) dos filhos
+  (one-to-many), em subconsultas correlacionadas.
+- Coleção (sem `parametro`): max(updated_at) + count(*) da tabela e das
+  tabelas das relações. O count pega exclusões físicas, que não mudam o max.
+
+Relações com ponto ('itens.servico', 'usuario.cargo') entram sempre pela
+tabela inteira; também servem para as referências que o to_json() de uma
+relação embute pelo cache_referencias (cargo, tipo, regime tributário), que
+precisam estar na lista para mudar o ETag. A query string e o usuário
+autenticado também compõem o ETag, já que mudam o corpo da resposta.
+"""
+
+import hashlib
+from datetime import timezone
+from functools import wraps
+from flask import request, Response, make_response
+from sqlalchemy import select, func
+
+from config import db
+from serializers import resposta_json
+
+# O cliente sempre revalida; com o ETag igual a resposta é um 304 sem corpo
+CACHE_CONTROL_REVALIDAR = 'private, no-cache'
+# Relação `funcionario` (Usuario) com o cargo que Usuario.to_json() embute pelo cache de referências
+RELACOES_FUNCIONARIO = ('funcionario', 'funcionario.cargo')
+
+
+def nao_modificado(etag: str, ultima_modificacao=None, fraco: bool = False):
+    """Resposta 304 se o cliente já tem essa versão, senão None"""
+    if request.if_none_match:
+        atual = request.if_none_match.contains_weak(etag)
+    else:
+        desde = request.if_modified_since
+        atual = bool(ultima_modificacao and desde and ultima_modificacao.replace(microsecond=0) <= desde)
+    if not atual:
+        return None
+    resposta = Response(status=304)
+    _marcar(resposta, etag, ultima_modificacao, fraco)
+    return resposta
+
+
+def _marcar(resposta, etag: str, ultima_modificacao=None, fraco: bool = False):
+    resposta.set_etag(etag, weak=fraco)
+    if ultima_modificacao is not None:
+        resposta.last_modified = ultima_modificacao
+    resposta.headers['Cache-Control'] = CACHE_CONTROL_REVALIDAR
+
+
+def resposta_com_etag(dados, etag: str):
+    """JSON dos dados com ETag, ou 304 se o cliente já tem essa versão"""
+    resposta = nao_modificado(etag)
+    if resposta is not None:
+        return resposta
+    resposta = resposta_json(dados)
+    _marcar(resposta, etag)
+    return resposta
+
+
+# ======================================================
+# Versões lidas do banco
+# ======================================================
+
+def _relacao(modelo, caminho: str):
+    """Atributo de relacionamento e classe final de 'a' ou 'a.b'"""
+    atributo = None
+    for nome in caminho.split('.'):
+        atributo = getattr(modelo, nome)
+        modelo = atributo.property.mapper.class_
+    return atributo, modelo
+
+
+def _versao_tabela(modelo):
+    return [
+        select(func.max(modelo.updated_at)).scalar_subquery(),
+        select(func.count()).select_from(modelo).scalar_subquery(),
+    ]
+
+
+def versao_colecao(modelo, relacoes=(), modelos=()):
+    """Tupla com max(updated_at) e count(*) da tabela, das tabelas relacionadas e de `modelos`"""
+    colunas = _versao_tabela(modelo)
+    for caminho in relacoes:
+        colunas += _versao_tabela(_relacao(modelo, caminho)[1])
+    for outro in modelos:
+        colunas += _versao_tabela(outro)
+    return tuple(db.session.execute(select(*colunas)).one())
+
+
+def versao_registro(modelo, registro_id, relacoes=()):
+    """Tupla com o updated_at do registro e das suas relações, ou None se ele não existe"""
+    colunas = [modelo.updated_at]
+    for caminho in relacoes:
+        atributo, alvo = _relacao(modelo, caminho)
+        if '.' in caminho:
+            colunas += _versao_tabela(alvo)
+        elif atributo.property.uselist:
+            condicao = atributo.property.primaryjoin
+            colunas += [
+                select(func.max(alvo.updated_at)).where(condicao).scalar_subquery(),
+                select(func.count()).select_from(alvo).where(condicao).scalar_subquery(),
+            ]
+        else:
+            colunas.append(select(alvo.updated_at).where(atributo.property.primaryjoin).scalar_subquery())
+    linha = db.session.execute(select(*colunas).where(modelo.id == registro_id)).one_or_none()
+    return tuple(linha) if linha is not None else None
+
+
+def _calcular_etag(prefixo: str, versao) -> str:
+    principal = getattr(request, 'usuario_atual', None)
+    # Permissões entram junto: quem deixa de ser gerente não recebe 304 do que via antes
+    usuario = principal['user'] if principal else {}
+    perfil = (usuario.get('id'), usuario.get('tipo_usuario'), usuario.get('eh_gerente'))
+    conteudo = repr((versao, request.query_string, perfil)).encode('utf-8')
+    return f"{prefixo}-{hashlib.sha1(conteudo).hexdigest()[:20]}"
+
+
+def get_condicional(modelo, parametro: str = None, relacoes=(), modelos=()):
+    """
+    Decorator de GET condicional para o `modelo` (precisa de updated_at).
+
+    Em coleções, `modelos` lista outras tabelas que também entram na
+    resposta sem serem relações do modelo (ex.: séries cujas ocorrências
+    aparecem junto dos agendamentos).
+
+    Deve ficar abaixo dos decorators de autenticação. Só respostas 200
+    recebem ETag; o resto (404, 400...) passa sem alteração. Como a versão
+    é lida antes do handler, uma alteração no meio do caminho no máximo
+    faz o próximo GET devolver o corpo de novo, nunca um 304 desatualizado.
+    """
+    tabela = modelo.__tablename__
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            ultima_modificacao = None
+            if parametro is None:
+                versao = versao_colecao(modelo, relacoes, modelos)
+                prefixo = tabela
+            else:
+                versao = versao_registro(modelo, kwargs[parametro], relacoes)
+                if versao is None:
+                    return f(*args, **kwargs)
+                prefixo = f"{tabela}-{kwargs[parametro]}"
+                # Last-Modified só quando a data diz tudo (sem filhos que podem ser excluídos)
+                if not relacoes and versao[0] is not None:
+                    ultima_modificacao = versao[0].replace(tzinfo=timezone.utc)
+
+            etag = _calcular_etag(prefixo, versao)
+            resposta = nao_modificado(etag, ultima_modificacao, fraco=True)
+            if resposta is not None:
+                return resposta
+
+            resposta = make_response(f(*args, **kwargs))
+            if resposta.status_code == 200:
+                _marcar(resposta, etag, ultima_modificacao, fraco=True)
+            return resposta
+        return decorated
+    return decorator
@@ -0,0 +1,9 @@
+from flask import Blueprint, jsonify
+from services.dashboard_service import DashboardService
+
+bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
+service = DashboardService()
+
+@bp.route('/resumo', methods=['GET'])
+def get_resumo():
+    return jsonify(service.resumo())
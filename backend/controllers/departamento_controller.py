@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from services.departamento_service import DepartamentoService
 from middleware.autenticacao_middleware import token_obrigatório
+from models.organizacional import Departamento
+from controllers.condicional import get_condicional
 
 # Criar blueprint
 bp = Blueprint('departamentos', __name__, url_prefix='/api/departamentos')
@@ -8,12 +10,22 @@ bp = Blueprint('departamentos', __name__, url_prefix='/api/departamentos')
 # Inicializar serviço
 departamento_service = DepartamentoService()
 
+def _eh_admin(usuario_atual):
+    """Mesma regra de DepartamentoService.usuario_eh_admin, pelos dados do principal"""
+    return usuario_atual['user'].get('tipo_usuario') == 'admin'
+
+def _eh_admin_ou_gerente(usuario_atual):
+    """Mesma regra de DepartamentoService.usuario_eh_admin_ou_gerente, pelos dados do principal"""
+    user = usuario_atual['user']
+    return bool(user.get('eh_gerente') or user.get('tipo_usuario') in ['admin', 'gerente'])
+
 # ======================================================
 # 📋 ROTAS DE CONSULTA
 # ======================================================
 
 @bp.route('/', methods=['GET'])
 @token_obrigatório
+@get_condicional(Departamento, relacoes=('cargos',))
 def listar_departamentos():
     """
     Lista todos os departamentos ativos
@@ -64,6 +76,7 @@ def listar_departamentos():
 
 @bp.route('/<int:departamento_id>', methods=['GET'])
 @token_obrigatório
+@get_condicional(Departamento, 'departamento_id', relacoes=('cargos',))
 def buscar_departamento(departamento_id):
     """
     Busca um departamento específico por ID
@@ -138,7 +151,7 @@ def criar_departamento():
             return jsonify({'error': 'Dados não fornecidos'}), 400
         
         # Verificar permissões (apenas admin ou gerente pode criar departamentos)
-        if not departamento_service.usuario_eh_admin_ou_gerente(request.usuario_atual['user']['id']):
+        if not _eh_admin_ou_gerente(request.usuario_atual):
             return jsonify({'error': 'Acesso negado. Apenas administradores e gerentes podem criar departamentos'}), 403
         
         resultado = departamento_service.create(dados)
@@ -171,7 +184,7 @@ def atualizar_departamento(departamento_id):
             return jsonify({'error': 'Dados não fornecidos'}), 400
         
         # Verificar permissões
-        if not departamento_service.usuario_eh_admin_ou_gerente(request.usuario_atual['user']['id']):
+        if not _eh_admin_ou_gerente(request.usuario_atual):
             return jsonify({'error': 'Acesso negado. Apenas administradores e gerentes podem atualizar departamentos'}), 403
         
         resultado = departamento_service.update(departamento_id, dados)
@@ -192,7 +205,7 @@ def remover_departamento(departamento_id):
     """
     try:
         # Verificar permissões (apenas admin pode deletar)
-        if not departamento_service.usuario_eh_admin(request.usuario_atual['user']['id']):
+        if not _eh_admin(request.usuario_atual):
             return jsonify({'error': 'Acesso negado. Apenas administradores podem remover departamentos'}), 403
         
         resultado = departamento_service.delete(departamento_id)
@@ -249,7 +262,7 @@ def relatorio_geral():
     """
     try:
         # Verificar permissões
-        if not departamento_service.usuario_eh_admin_ou_gerente(request.usuario_atual['user']['id']):
+        if not _eh_admin_ou_gerente(request.usuario_atual):
             return jsonify({'error': 'Acesso negado'}), 403
         
         resultado = departamento_service.get_all()
@@ -1,15 +1,19 @@
 from flask import Blueprint, request, jsonify
 from services.empresa_service import EmpresaService
+from models.organizacional import Empresa
+from controllers.condicional import get_condicional
 
 bp = Blueprint('empresa', __name__, url_prefix='/api/empresas')
 service = EmpresaService()
 
 @bp.route('/', methods=['GET'])
+@get_condicional(Empresa)
 def get_empresas():
     empresas = service.get_all()
     return jsonify([empresa.to_json() for empresa in empresas])
 
 @bp.route('/<int:empresa_id>', methods=['GET'])
+@get_condicional(Empresa, 'empresa_id')
 def get_empresa_by_id(empresa_id):
     empresa = service.get_by_id(empresa_id)
     if not empresa:
@@ -1,15 +1,19 @@
 from flask import Blueprint, request, jsonify
 from services.endereco_service import EnderecoService
+from models.cliente import Endereco
+from controllers.condicional import get_condicional
 
 bp = Blueprint('endereco', __name__, url_prefix='/api/enderecos')
 service = EnderecoService()
 
 @bp.route('/', methods=['GET'])
+@get_condicional(Endereco)
 def get_enderecos():
     enderecos = service.get_all()
     return jsonify([endereco.to_json() for endereco in enderecos])
 
 @bp.route('/<int:endereco_id>', methods=['GET'])
+@get_condicional(Endereco, 'endereco_id')
 def get_endereco_por_id(endereco_id):
     endereco = service.get_by_id(endereco_id)
     if not endereco:
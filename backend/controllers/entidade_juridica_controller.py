@@ -1,15 +1,19 @@
 from flask import Blueprint, request, jsonify
 from services.entidade_juridica_service import EntidadeJuridicaService
+from models.entidadeJuridica import EntidadeJuridica
+from controllers.condicional import get_condicional
 
 bp = Blueprint('entidade_juridica', __name__, url_prefix='/api/entidades-juridicas')
 service = EntidadeJuridicaService()
 
 @bp.route('/', methods=['GET'])
+@get_condicional(EntidadeJuridica, relacoes=('tipo', 'regime_tributario'))
 def get_entidades_juridicas():
     entidades = service.get_all()
     return jsonify([entidade.to_json() for entidade in entidades])
 
 @bp.route('/<int:entidade_id>', methods=['GET'])
+@get_condicional(EntidadeJuridica, 'entidade_id', relacoes=('tipo', 'regime_tributario'))
 def get_entidade_juridica(entidade_id):
     entidade = service.get_by_id(entidade_id)
     if not entidade:
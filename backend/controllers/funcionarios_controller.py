@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from services.usuario_service import UsuarioService
 from middleware.autenticacao_middleware import token_obrigatório
+from controllers.paginacao import resposta_lista
+from models.organizacional import Usuario
+from controllers.condicional import get_condicional
 
 bp = Blueprint('funcionarios', __name__, url_prefix='/api/funcionarios')
 service = UsuarioService()
@@ -11,16 +14,18 @@ service = UsuarioService()
 
 @bp.route('/', methods=['GET'])
 @token_obrigatório
+@get_condicional(Usuario, relacoes=('cargo',))
 def listar_funcionarios():
     """Lista todos os funcionários (usuários)"""
     try:
         funcionarios = service.get_all()
-        return jsonify([funcionario.to_json() for funcionario in funcionarios]), 200
+        return resposta_lista(funcionarios, 'Usuario')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:funcionario_id>', methods=['GET'])
 @token_obrigatório
+@get_condicional(Usuario, 'funcionario_id', relacoes=('cargo',))
 def get_funcionario_por_id(funcionario_id):
     """Busca funcionário por ID"""
     try:
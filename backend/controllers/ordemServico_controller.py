@@ -1,16 +1,26 @@
 import json
 from flask import Blueprint, request, jsonify
+from controllers.paginacao import listar
 from services.ordemServico_services import OrdemServicoService
+from models.ordemServico import OrdemServico
+from controllers.condicional import get_condicional
 
 bp = Blueprint('ordem_servico', __name__, url_prefix='/api/ordens-servico')
 service = OrdemServicoService()
 
+# Caminhos com ponto: o que o to_json() das relações embute (inclusive pelo cache_referencias)
+RELACOES_ORDEM = (
+    'cliente', 'empresa', 'empresa.tipo', 'empresa.regime_tributario', 'usuario', 'usuario.cargo',
+    'departamento', 'departamento.cargos', 'itens', 'itens.servico',
+)
+
 @bp.route('/', methods=['GET'])
+@get_condicional(OrdemServico, relacoes=RELACOES_ORDEM)
 def get_ordens_servico():
-    ordens_servico = service.get_all()
-    return jsonify([ordem.to_json() for ordem in ordens_servico])
+    return listar(service, 'OrdemServico')
 
 @bp.route('/<int:ordem_id>', methods=['GET'])
+@get_condicional(OrdemServico, 'ordem_id', relacoes=RELACOES_ORDEM)
 def get_ordem_especifica(ordem_id):
     ordem = service.get_by_id(ordem_id)
     if not ordem:
@@ -18,6 +28,7 @@ def get_ordem_especifica(ordem_id):
     return jsonify(ordem.to_json())
 
 @bp.route('/cliente/<int:cliente_id>', methods=['GET'])
+@get_condicional(OrdemServico, relacoes=RELACOES_ORDEM)
 def get_ordens_por_cliente(cliente_id):
     ordens_servico = service.get_by_cliente(cliente_id)
     return jsonify([ordem.to_json() for ordem in ordens_servico])
@@ -52,4 +63,17 @@ def deletar_ordem_servico(ordem_id):
         service.deletar_ordem_servico(ordem_id)
         return jsonify({'message': 'Ordem de Serviço deletada com sucesso'}), 200
     except ValueError as e:
-        return jsonify({'error': str(e)}), 400
\ No newline at end of file
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/<int:ordem_id>/itens:batch', methods=['POST'])
+def salvar_itens_em_lote(ordem_id):
+    """Cria/altera vários itens de uma vez: {"itens": [{servico_id, quantidade, valor_unitario, desconto} | {id, ...}]}"""
+    try:
+        ordem, itens = service.salvar_itens_em_lote(ordem_id, request.get_json(silent=True))
+        return jsonify({
+            'ordem_servico_id': ordem.id,
+            'valor_total_os': ordem.valor_total_os,
+            'itens': [item.to_json() for item in itens]
+        }), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
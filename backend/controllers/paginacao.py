@@ -0,0 +1,100 @@
+""" Helpers de listagem paginada e streaming NDJSON para os controllers """
+
+from flask import request, jsonify, Response, stream_with_context
+from repositories.paginacao import normalizar_limite
+from serializers import obter_serializador, ler_campos, ler_expansoes, dumps, resposta_json
+
+MIMETYPE_NDJSON = 'application/x-ndjson'
+
+
+def quer_stream():
+    """Streaming é opt-in: ?stream=ndjson ou Accept: application/x-ndjson"""
+    if request.args.get('stream') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best == MIMETYPE_NDJSON
+
+
+def quer_pagina():
+    """A listagem só é paginada quando limit ou after forem informados"""
+    return 'limit' in request.args or 'after' in request.args
+
+
+def ler_parametros_pagina():
+    """Lê e valida limit/after da query string"""
+    parametros = {}
+    for nome in ('limit', 'after'):
+        valor = request.args.get(nome)
+        if valor in (None, ''):
+            parametros[nome] = None
+            continue
+        try:
+            parametros[nome] = int(valor)
+        except ValueError:
+            raise ValueError(f"O parâmetro {nome} deve ser um número inteiro")
+    return parametros['limit'], parametros['after']
+
+
+def serializador_da_requisicao(schema):
+    """Serializador compilado para o schema, respeitando ?fields= e ?expand="""
+    return obter_serializador(
+        schema,
+        ler_campos(request.args.get('fields')),
+        ler_expansoes(request.args.get('expand')),
+    )
+
+
+def resposta_pagina(registros, proximo_after, limit, after, serializar):
+    """Monta a resposta JSON de uma página com o cursor da próxima"""
+    return resposta_json({
+        'data': list(map(serializar, registros)),
+        'limit': limit,
+        'after': after,
+        'next_after': proximo_after,
+        'has_more': proximo_after is not None
+    })
+
+
+def resposta_ndjson(registros, serializar):
+    """Envia um registro JSON por linha à medida que são lidos do banco"""
+    def gerar():
+        for registro in registros:
+            yield dumps(serializar(registro)) + b'\n'
+
+    return Response(stream_with_context(gerar()), mimetype=MIMETYPE_NDJSON)
+
+
+def resposta_lista(registros, schema):
+    """Lista completa serializada pelo schema (para endpoints sem paginação)"""
+    try:
+        serializar = serializador_da_requisicao(schema)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return resposta_json(list(map(serializar, registros)))
+
+
+def listar(service, schema):
+    """
+    Listagem padrão usada pelos endpoints GET de coleção.
+
+    Sem parâmetros mantém o comportamento antigo (lista completa); com
+    limit/after devolve uma página; com stream=ndjson devolve um stream.
+    Em todos os casos ?fields= e ?expand= escolhem os campos do schema.
+    """
+    try:
+        serializar = serializador_da_requisicao(schema)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if quer_stream():
+        return resposta_ndjson(service.iterar_todos(), serializar)
+
+    if quer_pagina():
+        try:
+            limit, after = ler_parametros_pagina()
+            limit = normalizar_limite(limit)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        registros, proximo_after = service.get_pagina(limit, after)
+        return resposta_pagina(registros, proximo_after, limit, after, serializar)
+
+    return resposta_json(list(map(serializar, service.get_all())))
@@ -1,25 +1,51 @@
 import json
-from flask import Blueprint, request, jsonify
+import os
+from datetime import datetime
+from flask import Blueprint, request, jsonify, send_file, url_for, Response, stream_with_context
+from controllers.paginacao import listar
 from services.proposta_services import PropostaService
 from services.cliente_service import ClienteService
 from services.servico_services import ServicoService
+from services.pdf_fila import FilaPDFService
+from services.pdf_lote import LotePDFService
+from models.jobPdf import JobPDF
+from models.proposta import Proposta
+from controllers.condicional import get_condicional
 
 bp = Blueprint('proposta', __name__, url_prefix='/api/propostas')
 service = PropostaService()
+fila_pdf = FilaPDFService()
+lote_pdf = LotePDFService(fila_pdf)
+
+# Caminhos com ponto: referências que o to_json() das relações embute (cache_referencias)
+RELACOES_PROPOSTA = (
+    'cliente', 'entidade_juridica', 'entidade_juridica.tipo', 'entidade_juridica.regime_tributario',
+    'usuario', 'usuario.cargo', 'itens',
+)
 
 @bp.route('/', methods=['GET'])
+@get_condicional(Proposta, relacoes=RELACOES_PROPOSTA)
 def get_propostas():
-    propostas = service.get_all()
-    return jsonify([proposta.to_json() for proposta in propostas])
+    return listar(service, 'Proposta')
 
 @bp.route('/<int:proposta_id>', methods=['GET'])
+@get_condicional(Proposta, 'proposta_id', relacoes=RELACOES_PROPOSTA)
 def get_proposta_especifica(proposta_id):
     proposta = service.get_by_id(proposta_id)
     if not proposta:
         return jsonify({'error': 'Proposta não encontrada'}), 404
     return jsonify(proposta.to_json())
 
+@bp.route('/totais', methods=['GET'])
+@get_condicional(Proposta)
+def get_totais_propostas():
+    """Totais guardados das propostas, sem itens: ?status=&cliente_id="""
+    return jsonify(service.get_totais(
+        request.args.get('status', type=str), request.args.get('cliente_id', type=int)
+    ))
+
 @bp.route('/cliente/<int:cliente_id>', methods=['GET'])
+@get_condicional(Proposta, relacoes=RELACOES_PROPOSTA)
 def get_propostas_por_cliente(cliente_id):
     propostas = service.get_by_cliente(cliente_id)
     return jsonify([proposta.to_json() for proposta in propostas])
@@ -54,4 +80,77 @@ def deletar_proposta(proposta_id):
         service.deletar_proposta(proposta_id)
         return jsonify({'message': 'Proposta deletada com sucesso'}), 200
     except ValueError as e:
-        return jsonify({'error': str(e)}), 400
\ No newline at end of file
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/<int:proposta_id>/itens:batch', methods=['POST'])
+def salvar_itens_em_lote(proposta_id):
+    """Cria/altera vários itens de uma vez: {"itens": [{servico_id, quantidade, valor_unitario} | {id, ...}]}"""
+    try:
+        proposta, itens = service.salvar_itens_em_lote(proposta_id, request.get_json(silent=True))
+        return jsonify({
+            'proposta_id': proposta.id,
+            'valor_total': proposta.valor_total,
+            'itens': [item.to_json() for item in itens]
+        }), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+# ==============================================
+# GERAÇÃO ASSÍNCRONA DE PDF
+# ==============================================
+
+@bp.route('/<int:proposta_id>/pdf', methods=['POST'])
+def gerar_pdf_proposta(proposta_id):
+    try:
+        job = fila_pdf.enfileirar(proposta_id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+    except ImportError as e:
+        return jsonify({'error': str(e)}), 503
+
+    resposta = jsonify(job)
+    resposta.status_code = 202
+    resposta.headers['Location'] = url_for('proposta.get_job_pdf', job_id=job['id'])
+    return resposta
+
+@bp.route('/pdf/jobs/<job_id>', methods=['GET'])
+def get_job_pdf(job_id):
+    job = fila_pdf.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job não encontrado'}), 404
+    return jsonify(job)
+
+@bp.route('/pdf/jobs/<job_id>/arquivo', methods=['GET'])
+def baixar_pdf_job(job_id):
+    job = fila_pdf.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job não encontrado'}), 404
+    if job['status'] != JobPDF.STATUS_CONCLUIDO:
+        return jsonify({'error': 'PDF ainda não está pronto', 'status': job['status']}), 409
+    if not job['caminho'] or not os.path.exists(job['caminho']):
+        return jsonify({'error': 'Arquivo do PDF não encontrado'}), 410
+    return send_file(job['caminho'], mimetype='application/pdf', as_attachment=True,
+                     download_name=f"proposta_{job['proposta_id']}.pdf")
+
+@bp.route('/pdf/lote', methods=['POST'])
+def exportar_pdfs_em_lote():
+    """Renderiza as propostas do filtro e devolve um ZIP (padrão) ou um único PDF"""
+    data = request.get_json(silent=True) or {}
+    formato = data.pop('formato', 'zip')
+    try:
+        query = lote_pdf.preparar_lote(formato=formato, **data)
+    except TypeError:
+        return jsonify({'error': 'Filtros aceitos: status, data_inicio, data_fim, cliente_id'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except ImportError as e:
+        return jsonify({'error': str(e)}), 503
+
+    nome = f"propostas_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if formato == 'pdf':
+        resposta = Response(stream_with_context(lote_pdf.gerar_pdf_unico(query)), mimetype='application/pdf')
+        resposta.headers['Content-Disposition'] = f'attachment; filename={nome}.pdf'
+    else:
+        resposta = Response(stream_with_context(lote_pdf.gerar_zip(query)), mimetype='application/zip')
+        resposta.headers['Content-Disposition'] = f'attachment; filename={nome}.zip'
+    return resposta
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from services.regime_tributario_service import RegimeTributarioService
 from middleware.autenticacao_middleware import token_obrigatório
+from controllers.condicional import resposta_com_etag, get_condicional
+from models.entidadeJuridica import RegimeTributario
 
 bp = Blueprint('regime_tributario', __name__, url_prefix='/api/regimes-tributarios')
 service = RegimeTributarioService()
@@ -14,13 +16,14 @@ service = RegimeTributarioService()
 def get_regimes():
     """Lista todos os regimes tributários"""
     try:
-        regimes = service.get_all()
-        return jsonify([regime.to_json() for regime in regimes]), 200
+        regimes, etag = service.listar_json()
+        return resposta_com_etag(regimes, etag)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:regime_id>', methods=['GET'])
 @token_obrigatório
+@get_condicional(RegimeTributario, 'regime_id')
 def get_regime_por_id(regime_id):
     """Busca regime tributário por ID"""
     try:
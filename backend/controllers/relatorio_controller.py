@@ -1,6 +1,8 @@
 import json
 from flask import Blueprint, request, jsonify
 from services.relatorio_services import RelatorioService
+from models.relatorio import Relatorio
+from controllers.condicional import get_condicional, RELACOES_FUNCIONARIO
 
 bp = Blueprint('relatorio', __name__, url_prefix='/api/relatorios')
 service = RelatorioService()
@@ -8,7 +10,7 @@ service = RelatorioService()
 @bp.route('/clientes', methods=['GET'])
 def relatorio_clientes():
     try:
-        relatorio = service.gerar_relatorio_clientes()
+        relatorio = service.gerar_relatorio_clientes(**request.args.to_dict())
         return jsonify(relatorio), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -16,7 +18,7 @@ def relatorio_clientes():
 @bp.route('/propostas', methods=['GET'])
 def relatorio_propostas():
     try:
-        relatorio = service.gerar_relatorio_propostas()
+        relatorio = service.gerar_relatorio_propostas(**request.args.to_dict())
         return jsonify(relatorio), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -24,7 +26,7 @@ def relatorio_propostas():
 @bp.route('/agendamentos', methods=['GET'])
 def relatorio_agendamentos():
     try:
-        relatorio = service.gerar_relatorio_agendamentos()
+        relatorio = service.gerar_relatorio_agendamentos(**request.args.to_dict())
         return jsonify(relatorio), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -32,7 +34,7 @@ def relatorio_agendamentos():
 @bp.route('/servicos', methods=['GET'])
 def relatorio_servicos():
     try:
-        relatorio = service.gerar_relatorio_servicos()
+        relatorio = service.gerar_relatorio_servicos(**request.args.to_dict())
         return jsonify(relatorio), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -40,7 +42,7 @@ def relatorio_servicos():
 @bp.route('/financeiro', methods=['GET'])
 def relatorio_financeiro():
     try:
-        relatorio = service.gerar_relatorio_financeiro()
+        relatorio = service.gerar_relatorio_financeiro(**request.args.to_dict())
         return jsonify(relatorio), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -59,6 +61,7 @@ def relatorio_customizado():
     except Exception as e:
         return jsonify({'error': 'Erro inesperado: ' + str(e)}), 500
 @bp.route('/<int:relatorio_id>', methods=['GET'])
+@get_condicional(Relatorio, 'relatorio_id', relacoes=RELACOES_FUNCIONARIO)
 def get_relatorio_especifico(relatorio_id):  
     relatorio = service.get_by_id(relatorio_id)
     if not relatorio:
@@ -72,6 +75,7 @@ def deletar_relatorio(relatorio_id):
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
 @bp.route('/', methods=['GET'])
+@get_condicional(Relatorio, relacoes=RELACOES_FUNCIONARIO)
 def get_relatorios():
     relatorios = service.get_all()
     return jsonify([relatorio.to_json() for relatorio in relatorios])   
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from middleware.autenticacao_middleware import token_obrigatório
+from controllers.condicional import resposta_com_etag, get_condicional
 from services.servico_services import ServicoService, CategoriaServicoService
+from models.servico import Servico, CategoriaServico
 
 # Criando o blueprint
 bp = Blueprint('servicos', __name__, url_prefix='/api/servicos')
@@ -14,6 +16,7 @@ categoria_service = CategoriaServicoService()
 
 @bp.route('/', methods=['GET'])
 @token_obrigatório
+@get_condicional(Servico)
 def listar_servicos():
     """Lista todos os serviços ativos"""
     try:
@@ -24,6 +27,7 @@ def listar_servicos():
 
 @bp.route('/<int:servico_id>', methods=['GET'])
 @token_obrigatório
+@get_condicional(Servico, 'servico_id')
 def buscar_servico(servico_id):
     """Busca um serviço específico por ID"""
     try:
@@ -125,13 +129,14 @@ def buscar_servico_por_nome(nome):
 def listar_categorias():
     """Lista todas as categorias de serviços ativas"""
     try:
-        categorias = categoria_service.get_all()
-        return jsonify([categoria.to_json() for categoria in categorias]), 200
+        categorias, etag = categoria_service.listar_json()
+        return resposta_com_etag(categorias, etag)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @categoria_bp.route('/<int:categoria_id>', methods=['GET'])
 @token_obrigatório
+@get_condicional(CategoriaServico, 'categoria_id')
 def buscar_categoria(categoria_id):
     """Busca uma categoria específica por ID"""
     try:
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from services.tipo_atividade_service import TipoAtividadeService
 from middleware.autenticacao_middleware import token_obrigatório
+from controllers.condicional import resposta_com_etag, get_condicional
+from models.tipoAtividade import TipoAtividade
 
 bp = Blueprint('tipo_atividade', __name__, url_prefix='/api/tipos-atividade')
 service = TipoAtividadeService()
@@ -14,13 +16,14 @@ service = TipoAtividadeService()
 def get_tipos():
     """Lista todos os tipos de atividade"""
     try:
-        tipos = service.get_all()
-        return jsonify([tipo.to_json() for tipo in tipos]), 200
+        tipos, etag = service.listar_json()
+        return resposta_com_etag(tipos, etag)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:tipo_id>', methods=['GET'])
 @token_obrigatório
+@get_condicional(TipoAtividade, 'tipo_id')
 def get_tipo_por_id(tipo_id):
     """Busca tipo de atividade por ID"""
     try:
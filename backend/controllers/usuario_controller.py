@@ -1,14 +1,27 @@
 from flask import Blueprint, request, jsonify
 from services.usuario_service import UsuarioService
+from services.credenciais_service import credenciais_service, CredenciaisOcupadas, SENHA_HASH_RETRY_AFTER
 from models.organizacional import Usuario
 from middleware.autenticacao_middleware import (
     token_obrigatório, usuario_opcional, 
-    gerar_token, gerar_refresh_token
+    gerar_token, gerar_refresh_token, renovar_token, revogar_refresh_token
 )
+from controllers.condicional import get_condicional
 
 bp = Blueprint('usuario', __name__, url_prefix='/api/usuarios')
 service = UsuarioService()
 
+def _eh_admin(usuario_logado):
+    """Admin ou gerente, pelos dados do principal (sem consultar o banco)"""
+    user = usuario_logado['user']
+    return bool(user.get('eh_gerente') or user.get('tipo_usuario') == 'admin')
+
+def _resposta_ocupado(erro):
+    """429 quando a fila de hash de senhas está cheia"""
+    resposta = jsonify({"error": str(erro)})
+    resposta.headers['Retry-After'] = str(SENHA_HASH_RETRY_AFTER)
+    return resposta, 429
+
 # ============= ROTAS PÚBLICAS =============
 
 @bp.route('/login', methods=['POST'])
@@ -51,9 +64,42 @@ def login():
             'user': usuario.to_json()  # ✅ CORRIGIDO - usar to_json()
         }), 200
         
+    except CredenciaisOcupadas as e:
+        return _resposta_ocupado(e)
     except Exception as e:
         return jsonify({"error": "Erro interno do servidor"}), 500
 
+@bp.route('/refresh', methods=['POST'])
+def refresh():
+    """Renova os tokens a partir do refresh token - Público"""
+    data = request.json or {}
+    refresh_token = data.get('refresh_token')
+    if not refresh_token:
+        return jsonify({"error": "refresh_token é obrigatório"}), 400
+
+    tokens, erro = renovar_token(refresh_token)
+    if erro:
+        return jsonify({"error": erro}), 401
+
+    access_token, novo_refresh_token = tokens
+    return jsonify({
+        'access_token': access_token,
+        'refresh_token': novo_refresh_token,
+        'token_type': 'Bearer',
+        'expires_in': 900
+    }), 200
+
+@bp.route('/logout', methods=['POST'])
+def logout():
+    """Revoga o refresh token - Público"""
+    data = request.json or {}
+    refresh_token = data.get('refresh_token')
+    if not refresh_token:
+        return jsonify({"error": "refresh_token é obrigatório"}), 400
+
+    revogar_refresh_token(refresh_token)
+    return jsonify({"message": "Logout realizado com sucesso"}), 200
+
 @bp.route('/registro', methods=['POST'])
 def criar_usuario():
     """Registro de novo usuário - Público"""
@@ -64,6 +110,8 @@ def criar_usuario():
             'message': 'Usuário criado com sucesso',
             'user': usuario.to_json()  # ✅ CORRIGIDO
         }), 201
+    except CredenciaisOcupadas as e:
+        return _resposta_ocupado(e)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
@@ -71,12 +119,13 @@ def criar_usuario():
 
 @bp.route('/', methods=['GET'])
 @token_obrigatório
+@get_condicional(Usuario, relacoes=('cargo',))
 def get_usuarios():
     """Listar todos os usuários - Protegido"""
     usuario_logado = request.usuario_atual
     
     # Verificar se é admin
-    if not service.usuario_eh_admin(usuario_logado['user']['id']):  # ✅ CORRIGIDO
+    if not _eh_admin(usuario_logado):  # ✅ CORRIGIDO
         return jsonify({"error": "Acesso negado. Apenas administradores."}), 403
     
     usuarios = service.get_all()
@@ -84,13 +133,14 @@ def get_usuarios():
 
 @bp.route('/<int:usuario_id>', methods=['GET'])
 @token_obrigatório
+@get_condicional(Usuario, 'usuario_id', relacoes=('cargo',))
 def get_usuario(usuario_id):
     """Buscar usuário específico - Protegido"""
     usuario_logado = request.usuario_atual
     
     # Verificar permissão (próprio perfil ou admin)
     if (usuario_logado['user']['id'] != usuario_id and 
-        not service.usuario_eh_admin(usuario_logado['user']['id'])):  # ✅ CORRIGIDO
+        not _eh_admin(usuario_logado)):  # ✅ CORRIGIDO
         return jsonify({"error": "Sem permissão para acessar este perfil"}), 403
     
     usuario = service.get_by_id(usuario_id)
@@ -106,13 +156,15 @@ def atualizar_usuario(usuario_id):
     
     # Verificar permissão
     if (usuario_logado['user']['id'] != usuario_id and 
-        not service.usuario_eh_admin(usuario_logado['user']['id'])):  # ✅ CORRIGIDO
+        not _eh_admin(usuario_logado)):  # ✅ CORRIGIDO
         return jsonify({"error": "Sem permissão para editar este usuário"}), 403
     
     data = request.json
     try:
         usuario = service.atualizar_usuario(usuario_id, **data)
         return jsonify(usuario.to_json()), 200  # ✅ CORRIGIDO
+    except CredenciaisOcupadas as e:
+        return _resposta_ocupado(e)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
@@ -123,7 +175,7 @@ def deletar_usuario(usuario_id):
     usuario_logado = request.usuario_atual
     
     # Só admin pode deletar
-    if not service.usuario_eh_admin(usuario_logado['user']['id']):
+    if not _eh_admin(usuario_logado):
         return jsonify({"error": "Apenas administradores podem deletar usuários"}), 403
     
     # Não deletar a si mesmo
@@ -162,12 +214,20 @@ def get_usuarios_por_ultimo_login(dias):
     """Usuários por último login - Protegido"""
     usuario_logado = request.usuario_atual
     
-    if not service.usuario_eh_admin(usuario_logado['user']['id']):
+    if not _eh_admin(usuario_logado):
         return jsonify({"error": "Apenas administradores podem acessar estes dados"}), 403
     
     usuarios = service.get_usuario_por_ultimo_login(dias)
     return jsonify([u.to_json() for u in usuarios]), 200
 
+@bp.route('/metricas/credenciais', methods=['GET'])
+@token_obrigatório
+def get_metricas_credenciais():
+    """Fila e latência do hash de senhas - Protegido (admin)"""
+    if not _eh_admin(request.usuario_atual):
+        return jsonify({"error": "Apenas administradores podem acessar estes dados"}), 403
+    return jsonify(credenciais_service.metricas()), 200
+
 # ========== ROTAS DE PERFIL ==========
 
 @bp.route('/me', methods=['GET'])
@@ -192,5 +252,7 @@ def atualizar_meu_perfil():
     try:
         usuario = service.atualizar_usuario(usuario_logado['user']['id'], **data)
         return jsonify(usuario.to_json()), 200
+    except CredenciaisOcupadas as e:
+        return _resposta_ocupado(e)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
\ No newline at end of file
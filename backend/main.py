@@ -13,11 +13,25 @@ from models import (
     # Entidades Jurídicas
     RegimeTributario, FaixaFaturamento, TipoEmpresa, EntidadeJuridica,
     # Outros modelos
-    Solicitacao, Relatorio, Agendamento,
+    Solicitacao, Relatorio, Agendamento, SerieAgendamento,
     # Propostas e Ordens
-    ItemProposta, Proposta, ItemOrdemServico, OrdemServico
+    ItemProposta, Proposta, ItemOrdemServico, OrdemServico,
+    # Filas
+    JobPDF,
+    # Login
+    LoginIdentificador,
+    # Dashboard
+    ContadorDashboard
 )
 
+from repositories.login_identificador_repository import LoginIdentificadorRepository
+from repositories.busca_repository import BuscaRepository
+from services.autocomplete_service import autocomplete_service, recarga_autocomplete
+from repositories.agendamento_repository import AgendamentoRepository
+from repositories.proposta_repository import PropostaRepository
+from repositories.ordemServico_repository import OrdemServicoRepository
+from services.dashboard_service import DashboardService, reconciliacao_dashboard
+
 # Importar controllers
 from controllers.usuario_controller import bp as usuario_bp
 from controllers.cliente_controller import bp as cliente_bp
@@ -33,12 +47,30 @@ from controllers.cargo_controller import bp as cargo_bp
 from controllers.regime_tributario_controller import bp as regime_tributario_bp
 from controllers.funcionarios_controller import bp as funcionarios_bp
 from controllers.tipo_atividade_controller import bp as tipo_atividade_bp
+from controllers.busca_controller import bp as busca_bp
+from controllers.autocomplete_controller import bp as autocomplete_bp
+from controllers.dashboard_controller import bp as dashboard_bp
 
 # ✅ CONFIGURAR APLICAÇÃO DEPOIS DE IMPORTAR MODELOS
 with app.app_context():
     try:
         db.create_all()
         print("✅ Tabelas criadas com sucesso!")
+        # Bancos criados antes da tabela de identificadores de login
+        LoginIdentificadorRepository().preencher_faltantes()
+        # Índice da busca textual (/api/search)
+        BuscaRepository().preparar_indice()
+        # Índices de autocomplete em memória (/api/autocomplete)
+        autocomplete_service.carregar()
+        recarga_autocomplete.iniciar(app)
+        # Bancos criados antes do índice de período dos agendamentos
+        AgendamentoRepository().criar_indices()
+        # Bancos criados antes dos totais guardados de propostas e ordens
+        PropostaRepository().preparar_totais()
+        OrdemServicoRepository().preparar_totais()
+        # Contadores do dashboard conferidos com as tabelas (e depois periodicamente)
+        DashboardService().reconciliar()
+        reconciliacao_dashboard.iniciar(app)
     except Exception as e:
         print(f"❌ Erro ao criar tabelas: {e}")
 
@@ -58,6 +90,9 @@ app.register_blueprint(cargo_bp)
 app.register_blueprint(regime_tributario_bp)
 app.register_blueprint(funcionarios_bp)
 app.register_blueprint(tipo_atividade_bp)
+app.register_blueprint(busca_bp)
+app.register_blueprint(autocomplete_bp)
+app.register_blueprint(dashboard_bp)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
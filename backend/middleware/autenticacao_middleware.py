@@ -3,13 +3,17 @@ from flask import request, jsonify
 import jwt
 import datetime
 import os
-import threading
+import uuid
+
+from middleware.token_store import criar_token_store
+from middleware.principal_cache import cache_principais
+from repositories.usuario_repository import UsuarioRepository
 
 SECRET_KEY = os.environ.get('SECRET_KEY', 'chave-secreta-muito-complexa-aqui')
 REFRESH_SECRET_KEY = os.environ.get('REFRESH_SECRET_KEY', 'outra-chave-secreta-complexa')
 
-refresh_tokens = set()
-refresh_tokens_lock = threading.Lock()
+# Refresh tokens válidos, pelo jti (memória ou Redis, ver middleware/token_store.py)
+token_store = criar_token_store()
 
 def gerar_token(user):
     payload = {
@@ -20,13 +24,15 @@ def gerar_token(user):
     
 
 def gerar_refresh_token(user):
+    expira_em = datetime.datetime.utcnow() + datetime.timedelta(days=7)
+    jti = uuid.uuid4().hex
     payload = {
         "user": user,
-        "exp": datetime.datetime.utcnow() + datetime.timedelta(days=7)
+        "jti": jti,
+        "exp": expira_em
     }
     token = jwt.encode(payload, REFRESH_SECRET_KEY, algorithm="HS256")
-    with refresh_tokens_lock:
-        refresh_tokens.add(token)
+    token_store.adicionar(jti, user.get('id'), expira_em.replace(tzinfo=datetime.timezone.utc).timestamp())
     return token
 
 def verificar_token(token):
@@ -39,39 +45,88 @@ def verificar_token(token):
     except jwt.InvalidTokenError:
         return None, "Token inválido"
 
-def verificar_refresh_token(token):
-    """Verifica refresh token"""
+def autenticar(token):
+    """
+    Retorna o principal do access token: o payload do JWT com tipo_usuario e
+    eh_gerente do usuário em payload['user']. Usa o cache de principals; só a
+    primeira requisição com o token decodifica o JWT e consulta o banco.
+    """
+    principal = cache_principais.obter(token)
+    if principal is not None:
+        return principal, None
+
+    payload, erro = verificar_token(token)
+    if erro:
+        return None, erro
+
+    user_id = payload['user']['id']
+    geracao = cache_principais.geracao(user_id)
+    usuario = UsuarioRepository().get_by_id(user_id)
+    if not usuario:
+        return None, "Usuário inativo ou não encontrado"
+
+    principal = dict(payload)
+    principal['user'] = {
+        **payload['user'],
+        'tipo_usuario': usuario.tipo_usuario,
+        'eh_gerente': bool(usuario.eh_gerente),
+    }
+    cache_principais.guardar(token, principal, payload['exp'], geracao)
+    return principal, None
+
+def _decodificar_refresh_token(token):
     try:
-        # Verificar se o token está na lista de tokens válidos
-        with refresh_tokens_lock:
-            if token not in refresh_tokens:
-                return None, "Refresh token revogado ou inválido"
-        
-        # Decodificar o token
         payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=["HS256"])
-        return payload, None
     except jwt.ExpiredSignatureError:
-        # Remover token expirado da lista
-        with refresh_tokens_lock:
-            refresh_tokens.discard(token)
         return None, "Refresh token expirado"
     except jwt.InvalidTokenError:
         return None, "Refresh token inválido"
+    if not payload.get('jti'):
+        return None, "Refresh token inválido"
+    return payload, None
+
+def verificar_refresh_token(token):
+    """Verifica refresh token"""
+    payload, erro = _decodificar_refresh_token(token)
+    if erro:
+        return None, erro
+
+    # Verificar se o token ainda não foi revogado
+    if not token_store.contem(payload['jti']):
+        return None, "Refresh token revogado ou inválido"
+    return payload, None
 
 def revogar_refresh_token(token):
     """Remove refresh token da lista de tokens válidos"""
-    with refresh_tokens_lock:
-        refresh_tokens.discard(token)
+    try:
+        payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=["HS256"], options={"verify_exp": False})
+    except jwt.InvalidTokenError:
+        return
+    if payload.get('jti'):
+        token_store.revogar(payload['jti'])
+
+def revogar_tokens_usuario(user_id):
+    """Revoga todos os refresh tokens de um usuário"""
+    token_store.revogar_usuario(user_id)
 
 def renovar_token(refresh_token):
-    """Renova access token usando refresh token"""
-    payload, erro = verificar_refresh_token(refresh_token)
+    """
+    Renova os tokens usando o refresh token (rotação).
+
+    O refresh token usado é consumido e substituído por um novo; reapresentar
+    um token já usado falha. Retorna ((access_token, refresh_token), erro).
+    """
+    payload, erro = _decodificar_refresh_token(refresh_token)
     if erro:
         return None, erro
-    
-    # Gerar novo access token
+
+    if not token_store.consumir(payload['jti']):
+        return None, "Refresh token revogado ou inválido"
+
+    # Gerar novo par de tokens
     novo_access_token = gerar_token(payload['user'])
-    return novo_access_token, None
+    novo_refresh_token = gerar_refresh_token(payload['user'])
+    return (novo_access_token, novo_refresh_token), None
 
 def token_obrigatório(f):
     """Decorator para proteger rotas que precisam de autenticação"""
@@ -93,7 +148,7 @@ def token_obrigatório(f):
             token = auth_header
         
         # Verificar token
-        payload, erro = verificar_token(token)
+        payload, erro = autenticar(token)
         if erro:
             return jsonify({'erro': erro}), 401
         
@@ -114,7 +169,7 @@ def usuario_opcional(f):
             try:
                 token_type, token = auth_header.split(' ')
                 if token_type.lower() == 'bearer':
-                    payload, _ = verificar_token(token)
+                    payload, _ = autenticar(token)
                     request.usuario_atual = payload
             except:
                 pass  # Ignora erros quando token é opcional
@@ -0,0 +1,89 @@
+"""
+Cache dos usuários autenticados (principals) por access token.
+
+Na primeira requisição com um token, o JWT é decodificado e o usuário é lido
+do banco uma vez; as claims e as flags de papel (tipo_usuario, eh_gerente)
+ficam guardadas por PRINCIPAL_CACHE_TTL segundos (nunca além da expiração do
+token). As requisições seguintes com o mesmo token não decodificam o JWT nem
+consultam o banco. UsuarioService invalida as entradas do usuário ao
+atualizá-lo ou removê-lo.
+
+O cache é do processo: com vários workers, uma alteração feita em outro
+worker vale aqui depois de no máximo PRINCIPAL_CACHE_TTL segundos.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 30))
+PRINCIPAL_CACHE_MAX = int(os.environ.get('PRINCIPAL_CACHE_MAX', 10_000))
+
+
+class CachePrincipais:
+    """ Principals por token, com TTL curto, limite LRU e invalidação por usuário """
+
+    def __init__(self, ttl: int = PRINCIPAL_CACHE_TTL, max_entradas: int = PRINCIPAL_CACHE_MAX):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()  # token -> (expira_em, user_id, principal)
+        self._por_usuario = {}          # user_id -> {token}
+        self._geracoes = {}             # user_id -> nº de invalidações
+        self._lock = threading.Lock()
+
+    def _remover(self, token):
+        entrada = self._entradas.pop(token, None)
+        if entrada is None:
+            return
+        tokens = self._por_usuario.get(entrada[1])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._por_usuario[entrada[1]]
+
+    def obter(self, token: str):
+        with self._lock:
+            entrada = self._entradas.get(token)
+            if entrada is None:
+                return None
+            if entrada[0] <= time.time():
+                self._remover(token)
+                return None
+            self._entradas.move_to_end(token)
+            return entrada[2]
+
+    def geracao(self, user_id) -> int:
+        """Versão atual do usuário; passe para guardar() o valor lido antes de consultar o banco"""
+        with self._lock:
+            return self._geracoes.get(user_id, 0)
+
+    def guardar(self, token: str, principal: dict, expira_token: float, geracao: int):
+        user_id = principal['user']['id']
+        with self._lock:
+            # O usuário mudou enquanto era lido do banco: não guarda dados velhos
+            if self._geracoes.get(user_id, 0) != geracao:
+                return
+            self._remover(token)
+            self._entradas[token] = (min(time.time() + self.ttl, expira_token), user_id, principal)
+            self._por_usuario.setdefault(user_id, set()).add(token)
+            while len(self._entradas) > self.max_entradas:
+                self._remover(next(iter(self._entradas)))
+
+    def invalidar_usuario(self, user_id):
+        with self._lock:
+            self._geracoes[user_id] = self._geracoes.get(user_id, 0) + 1
+            for token in list(self._por_usuario.get(user_id, ())):
+                self._remover(token)
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._por_usuario.clear()
+            self._geracoes.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+cache_principais = CachePrincipais()
@@ -0,0 +1,148 @@
+"""
+Armazenamento dos refresh tokens válidos.
+
+Os tokens são guardados pelo jti (identificador único do JWT), com a data
+de expiração e o id do usuário. Há duas implementações com a mesma
+interface, escolhidas por variável de ambiente:
+
+    TOKEN_STORE=memoria   (padrão) dicionário com expiração, um processo só
+    TOKEN_STORE=redis     REDIS_URL=redis://...  compartilhado entre workers
+
+Revogar e rotacionar um token custam O(1); na memória os tokens expirados
+ou excedentes (acima de MAX_TOKENS_MEMORIA) saem na ordem de expiração.
+"""
+
+import heapq
+import os
+import threading
+import time
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+TOKEN_STORE = os.environ.get('TOKEN_STORE', 'memoria')
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+MAX_TOKENS_MEMORIA = int(os.environ.get('MAX_TOKENS_MEMORIA', 100_000))
+
+
+class TokenStoreMemoria:
+    """ Refresh tokens em memória, com expiração e limite de tamanho """
+
+    def __init__(self, max_tokens: int = MAX_TOKENS_MEMORIA):
+        self.max_tokens = max_tokens
+        self._tokens = {}        # jti -> (expira_em, user_id)
+        self._por_usuario = {}   # user_id -> {jti}
+        self._heap = []          # (expira_em, jti), inclui entradas já removidas
+        self._lock = threading.Lock()
+
+    def _remover(self, jti) -> bool:
+        entrada = self._tokens.pop(jti, None)
+        if entrada is None:
+            return False
+        jtis = self._por_usuario.get(entrada[1])
+        if jtis is not None:
+            jtis.discard(jti)
+            if not jtis:
+                del self._por_usuario[entrada[1]]
+        return True
+
+    def _limpar(self, agora: float):
+        """Remove pelo topo do heap os expirados e, se passar do limite, os que expiram primeiro"""
+        while self._heap and (self._heap[0][0] <= agora or len(self._tokens) > self.max_tokens):
+            expira_em, jti = heapq.heappop(self._heap)
+            entrada = self._tokens.get(jti)
+            if entrada is not None and entrada[0] == expira_em:
+                self._remover(jti)
+
+        # Entradas de tokens revogados ficam no heap até chegar a vez delas; reconstrói se acumularem
+        if len(self._heap) > 2 * len(self._tokens) + 1024:
+            self._heap = [(expira_em, jti) for jti, (expira_em, _user_id) in self._tokens.items()]
+            heapq.heapify(self._heap)
+
+    def adicionar(self, jti: str, user_id, expira_em: float):
+        with self._lock:
+            self._tokens[jti] = (expira_em, user_id)
+            self._por_usuario.setdefault(user_id, set()).add(jti)
+            heapq.heappush(self._heap, (expira_em, jti))
+            self._limpar(time.time())
+
+    def contem(self, jti: str) -> bool:
+        with self._lock:
+            entrada = self._tokens.get(jti)
+            if entrada is None:
+                return False
+            if entrada[0] <= time.time():
+                self._remover(jti)
+                return False
+            return True
+
+    def consumir(self, jti: str) -> bool:
+        """Remove o token e informa se ele era válido (usado na rotação: só um uso por token)"""
+        with self._lock:
+            entrada = self._tokens.get(jti)
+            self._remover(jti)
+            return entrada is not None and entrada[0] > time.time()
+
+    def revogar(self, jti: str):
+        with self._lock:
+            self._remover(jti)
+
+    def revogar_usuario(self, user_id):
+        """Revoga todos os refresh tokens de um usuário"""
+        with self._lock:
+            for jti in list(self._por_usuario.get(user_id, ())):
+                self._remover(jti)
+
+    def __len__(self):
+        return len(self._tokens)
+
+
+class TokenStoreRedis:
+    """ Refresh tokens no Redis; a expiração fica a cargo do próprio Redis """
+
+    PREFIXO = 'refresh:'
+    PREFIXO_USUARIO = 'refresh_usuario:'
+
+    def __init__(self, url: str = REDIS_URL):
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis não está disponível. Instale com: pip install redis")
+        self.cliente = redis.Redis.from_url(url, decode_responses=True)
+
+    def adicionar(self, jti: str, user_id, expira_em: float):
+        ttl = max(1, int(expira_em - time.time()))
+        chave_usuario = f"{self.PREFIXO_USUARIO}{user_id}"
+        with self.cliente.pipeline() as pipe:
+            pipe.set(self.PREFIXO + jti, user_id, ex=ttl)
+            pipe.sadd(chave_usuario, jti)
+            # O índice por usuário vive tanto quanto o token mais novo
+            pipe.expire(chave_usuario, ttl, gt=True)
+            pipe.expire(chave_usuario, ttl, nx=True)
+            pipe.execute()
+
+    def contem(self, jti: str) -> bool:
+        return bool(self.cliente.exists(self.PREFIXO + jti))
+
+    def consumir(self, jti: str) -> bool:
+        """DEL é atômico: entre duas renovações simultâneas, só uma consome o token"""
+        return self.cliente.delete(self.PREFIXO + jti) == 1
+
+    def revogar(self, jti: str):
+        self.cliente.delete(self.PREFIXO + jti)
+
+    def revogar_usuario(self, user_id):
+        chave_usuario = f"{self.PREFIXO_USUARIO}{user_id}"
+        jtis = self.cliente.smembers(chave_usuario)
+        if jtis:
+            self.cliente.delete(*(self.PREFIXO + jti for jti in jtis))
+        self.cliente.delete(chave_usuario)
+
+
+def criar_token_store(tipo: str = TOKEN_STORE):
+    if tipo == 'redis':
+        return TokenStoreRedis(REDIS_URL)
+    if tipo == 'memoria':
+        return TokenStoreMemoria()
+    raise ValueError(f"TOKEN_STORE inválido: {tipo}. Use 'memoria' ou 'redis'")
@@ -19,9 +19,13 @@ from .cliente import Cliente, Endereco
 from .entidadeJuridica import RegimeTributario, FaixaFaturamento, TipoEmpresa, EntidadeJuridica
 from .solicitacao import Solicitacao
 from .relatorio import Relatorio
-from .agendamento import Agendamento
+from .agendamento import Agendamento, SerieAgendamento
 from .proposta import ItemProposta, Proposta
 from .ordemServico import ItemOrdemServico, OrdemServico
+from .jobPdf import JobPDF
+from .loginIdentificador import LoginIdentificador
+from .dashboard import ContadorDashboard
+from . import totais  # eventos dos itens que mantêm os totais de propostas e ordens
 
 # Lista de todos os modelos para facilitar imports
 __all__ = [
@@ -43,8 +47,12 @@ __all__ = [
     'Solicitacao',
     'Relatorio',
     'Agendamento',
+    'SerieAgendamento',
     'ItemProposta', 
     'Proposta',
     'ItemOrdemServico', 
-    'OrdemServico'
+    'OrdemServico',
+    'JobPDF',
+    'LoginIdentificador',
+    'ContadorDashboard'
 ]
\ No newline at end of file
@@ -1,13 +1,22 @@
-from datetime import datetime
+import json
+from datetime import datetime, timedelta
 from config import db
 from sqlalchemy.orm import validates
 from .base import TimestampMixin, ActiveMixin
+from .recorrencia import FREQUENCIAS, ocorrencias, fim_da_serie
 import re
 
+# Agendamentos nesses status não ocupam o horário (não geram conflito)
+STATUS_SEM_CONFLITO = ('cancelado', 'adiado')
+
 
 class Agendamento(db.Model, TimestampMixin, ActiveMixin):
     """ Modelo para representar um agendamento """
     __tablename__ = 'agendamentos'
+    __table_args__ = (
+        # Consultas de calendário: agenda de um funcionário em um período
+        db.Index('ix_agendamentos_funcionario_periodo', 'funcionario_id', 'data_inicio', 'data_fim'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     titulo = db.Column(db.String(200), nullable=False, index=True)
@@ -25,6 +34,9 @@ class Agendamento(db.Model, TimestampMixin, ActiveMixin):
     
     # Relacionamentos
     funcionario = db.relationship('Usuario', back_populates='agendamentos', lazy='joined')
+
+    # Agendamentos gravados não pertencem a séries (ver OcorrenciaAgendamento)
+    serie_id = None
     
     # Validadores
     @validates('titulo')
@@ -116,8 +128,198 @@ class Agendamento(db.Model, TimestampMixin, ActiveMixin):
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None,
-            'ativo': self.ativo
+            'ativo': self.ativo,
+            'serie_id': self.serie_id
         }
     
     def __repr__(self):
-        return f"<Agendamento {self.titulo} - {self.data_inicio.strftime('%d/%m/%Y %H:%M') if self.data_inicio else 'N/A'}>"
\ No newline at end of file
+        return f"<Agendamento {self.titulo} - {self.data_inicio.strftime('%d/%m/%Y %H:%M') if self.data_inicio else 'N/A'}>"
+
+
+class SerieAgendamento(db.Model, TimestampMixin, ActiveMixin):
+    """ Agendamento recorrente: a regra é gravada uma vez e as ocorrências são geradas por janela """
+    __tablename__ = 'series_agendamentos'
+    __table_args__ = (
+        db.Index('ix_series_agendamentos_funcionario_periodo', 'funcionario_id', 'data_inicio', 'fim_serie'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    titulo = db.Column(db.String(200), nullable=False)
+    descricao = db.Column(db.Text, nullable=True)
+    tipo = db.Column(db.String(50), nullable=True)
+    status = db.Column(db.String(50), default='pendente')
+    destinatario = db.Column(db.String(150), nullable=True)
+    local = db.Column(db.String(255), nullable=True)
+    prioridade = db.Column(db.String(20), default='normal')
+
+    # Regra: primeira ocorrência, duração e repetição
+    data_inicio = db.Column(db.DateTime, nullable=False)
+    duracao_minutos = db.Column(db.Integer, nullable=False)
+    frequencia = db.Column(db.String(10), nullable=False)
+    intervalo = db.Column(db.Integer, nullable=False, default=1)
+    dias_semana = db.Column(db.String(20), nullable=True)     # '0,2,4' (0 = segunda), só na semanal
+    ate = db.Column(db.DateTime, nullable=True)
+    contagem = db.Column(db.Integer, nullable=True)
+    excecoes = db.Column(db.Text, nullable=True)              # JSON: inícios das ocorrências removidas
+    # Fim da última ocorrência possível (nulo = sem fim), para filtrar séries por período
+    fim_serie = db.Column(db.DateTime, nullable=True)
+
+    funcionario_id = db.Column(db.Integer, db.ForeignKey('funcionarios.id', ondelete='CASCADE'), nullable=False, index=True)
+    funcionario = db.relationship('Usuario', lazy='joined')
+
+    # Validadores
+    @validates('titulo', 'status', 'prioridade', 'destinatario', 'tipo')
+    def validar_campos_do_agendamento(self, key, valor):
+        """Mesmas regras dos campos do Agendamento"""
+        return _VALIDADORES_AGENDAMENTO[key](self, key, valor)
+
+    @validates('frequencia')
+    def validar_frequencia(self, key, frequencia):
+        if frequencia not in FREQUENCIAS:
+            raise ValueError(f"Frequência deve ser uma das seguintes: {', '.join(FREQUENCIAS)}")
+        return frequencia
+
+    @validates('intervalo', 'contagem', 'duracao_minutos')
+    def validar_positivo(self, key, valor):
+        if valor is None and key == 'contagem':
+            return None
+        if isinstance(valor, bool) or not isinstance(valor, int) or valor < 1:
+            raise ValueError(f"{key} deve ser um número inteiro maior que zero")
+        return valor
+
+    @validates('dias_semana')
+    def validar_dias_semana(self, key, dias):
+        if dias in (None, '', []):
+            return None
+        if isinstance(dias, str):
+            dias = dias.split(',')
+        try:
+            dias = sorted({int(dia) for dia in dias})
+        except (TypeError, ValueError):
+            raise ValueError("dias_semana deve ser uma lista de números de 0 (segunda) a 6 (domingo)")
+        if dias[0] < 0 or dias[-1] > 6:
+            raise ValueError("dias_semana deve ser uma lista de números de 0 (segunda) a 6 (domingo)")
+        return ','.join(map(str, dias))
+
+    @validates('excecoes')
+    def validar_excecoes(self, key, excecoes):
+        if isinstance(excecoes, str):
+            return excecoes
+        try:
+            datas = sorted({(d if isinstance(d, datetime) else datetime.fromisoformat(d)).isoformat()
+                            for d in excecoes or []})
+        except (TypeError, ValueError):
+            raise ValueError("excecoes deve ser uma lista de datas no formato ISO 8601")
+        return json.dumps(datas) if datas else None
+
+    # Regra
+    def lista_dias_semana(self) -> list:
+        return [int(dia) for dia in self.dias_semana.split(',')] if self.dias_semana else []
+
+    def lista_excecoes(self) -> list:
+        return json.loads(self.excecoes) if self.excecoes else []
+
+    @property
+    def duracao(self) -> timedelta:
+        return timedelta(minutes=self.duracao_minutos)
+
+    def validar_regra(self):
+        """Valida a regra inteira e calcula fim_serie"""
+        if not self.data_inicio:
+            raise ValueError("Data de início não pode ser vazia")
+        if not self.frequencia:
+            raise ValueError(f"Frequência deve ser uma das seguintes: {', '.join(FREQUENCIAS)}")
+        if not self.duracao_minutos:
+            raise ValueError("duracao_minutos deve ser um número inteiro maior que zero")
+        if self.dias_semana and self.frequencia != 'semanal':
+            raise ValueError("dias_semana só vale para a frequência semanal")
+        if self.ate is not None and self.ate < self.data_inicio:
+            raise ValueError("A data final da série deve ser posterior ao início")
+        regra = self.regra()
+        del regra['excecoes']
+        self.fim_serie = fim_da_serie(**regra)
+
+    def regra(self) -> dict:
+        """Parâmetros de models.recorrencia.ocorrencias (cópia solta da sessão)"""
+        return {
+            'inicio': self.data_inicio,
+            'duracao': self.duracao,
+            'frequencia': self.frequencia,
+            'intervalo': self.intervalo or 1,
+            'dias_semana': tuple(self.lista_dias_semana()),
+            'ate': self.ate,
+            'contagem': self.contagem,
+            'excecoes': frozenset(datetime.fromisoformat(data) for data in self.lista_excecoes()),
+        }
+
+    def ocorrencias(self, inicio, fim):
+        """(início, fim) das ocorrências que cruzam [inicio, fim), em ordem"""
+        return ocorrencias(janela_inicio=inicio, janela_fim=fim, **self.regra())
+
+    def to_json(self):
+        return {
+            'id': self.id,
+            'titulo': self.titulo,
+            'descricao': self.descricao,
+            'tipo': self.tipo,
+            'status': self.status,
+            'destinatario': self.destinatario,
+            'local': self.local,
+            'prioridade': self.prioridade,
+            'data_inicio': self.data_inicio.isoformat() if self.data_inicio else None,
+            'duracao_minutos': self.duracao_minutos,
+            'frequencia': self.frequencia,
+            'intervalo': self.intervalo,
+            'dias_semana': self.lista_dias_semana(),
+            'ate': self.ate.isoformat() if self.ate else None,
+            'contagem': self.contagem,
+            'excecoes': self.lista_excecoes(),
+            'fim_serie': self.fim_serie.isoformat() if self.fim_serie else None,
+            'funcionario_id': self.funcionario_id,
+            'funcionario': self.funcionario.to_json() if self.funcionario and self.funcionario.ativo else None,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None,
+            'ativo': self.ativo
+        }
+
+    def __repr__(self):
+        return f"<SerieAgendamento {self.titulo} ({self.frequencia})>"
+
+
+_VALIDADORES_AGENDAMENTO = {
+    'titulo': Agendamento.validar_titulo,
+    'status': Agendamento.validar_status,
+    'prioridade': Agendamento.validar_prioridade,
+    'destinatario': Agendamento.validar_destinatario,
+    'tipo': Agendamento.validar_tipo,
+}
+
+
+class OcorrenciaAgendamento:
+    """
+    Ocorrência de uma série em uma data: não é gravada, só tem os mesmos
+    atributos de um Agendamento (id nulo, serie_id preenchido), então passa
+    pelos mesmos serializadores.
+    """
+
+    def __init__(self, serie: SerieAgendamento, inicio, fim):
+        self.id = None
+        self.serie_id = serie.id
+        self.titulo = serie.titulo
+        self.descricao = serie.descricao
+        self.tipo = serie.tipo
+        self.status = serie.status
+        self.destinatario = serie.destinatario
+        self.local = serie.local
+        self.prioridade = serie.prioridade
+        self.funcionario_id = serie.funcionario_id
+        self.funcionario = serie.funcionario
+        self.data_inicio = inicio
+        self.data_fim = fim
+        self.created_at = serie.created_at
+        self.updated_at = serie.updated_at
+        self.deleted_at = None
+        self.ativo = serie.ativo
+
+    to_json = Agendamento.to_json
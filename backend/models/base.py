@@ -1,5 +1,6 @@
 """ Mixins para modelos de dados """
 from datetime import datetime
+from sqlalchemy import event, inspect
 from config import db
 
 class TimestampMixin:
@@ -14,23 +15,37 @@ class ActiveMixin:
     @classmethod
     def ativos(cls):
         return cls.query.filter_by(ativo=True)
+    # Só alteram o registro: quem grava é o repositório (repositories/unidade_trabalho.py)
     def desativar(self):
         if not self.ativo:
             raise Exception("Registro já está desativado")
-        try:    
-            self.ativo = False
-            self.updated_at = datetime.utcnow()
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            raise Exception(f"Erro ao desativar: {str(e)}")
+        self.ativo = False
+        self.updated_at = datetime.utcnow()
     def ativar(self):
         if self.ativo:
             raise Exception("Registro já está ativo")
-        try:
-            self.ativo = True
-            self.updated_at = datetime.utcnow()
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            raise Exception(f"Erro ao ativar: {str(e)}")
\ No newline at end of file
+        self.ativo = True
+        self.updated_at = datetime.utcnow()
+
+def valores_anteriores(registro, campos) -> list:
+    """Valores dos campos antes do flush (o atual, para os que não mudaram)"""
+    estado = inspect(registro)
+    valores = []
+    for campo in campos:
+        historico = estado.attrs[campo].history
+        valores.append(historico.deleted[0] if historico.deleted else getattr(registro, campo))
+    return valores
+
+
+def _guardar_anterior(registro, valor, anterior, iniciador):
+    """Só existe para o active_history: o valor antigo é carregado antes da troca"""
+
+
+def guardar_valores_anteriores(modelo, campos):
+    """
+    Faz os campos guardarem o valor anterior mesmo quando alterados depois
+    de expirados (após um commit), para valores_anteriores() nos eventos
+    after_update/after_delete
+    """
+    for campo in campos:
+        event.listen(getattr(modelo, campo), 'set', _guardar_anterior, active_history=True)
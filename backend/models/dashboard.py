@@ -0,0 +1,122 @@
+"""
+Contadores do dashboard, mantidos junto com os registros que eles contam.
+
+Cada linha é uma chave ("propostas:enviada", "agendamentos:2025-10-20"...)
+com o total atual. Os eventos after_insert/after_update/after_delete de
+Proposta, OrdemServico, Agendamento e Cliente somam e subtraem na mesma
+transação do flush, então o contador muda junto com o commit (e volta com o
+rollback). Escritas que não passam pelo ORM (insert()/update() em massa)
+não disparam os eventos; a reconciliação periódica
+(services/dashboard_service.py) recalcula tudo a partir das tabelas.
+"""
+
+from datetime import datetime
+from sqlalchemy import bindparam, event, inspect, text, update
+from config import db
+from .base import valores_anteriores, guardar_valores_anteriores
+from .agendamento import Agendamento, STATUS_SEM_CONFLITO
+from .cliente import Cliente
+from .ordemServico import OrdemServico
+from .proposta import Proposta
+
+
+def chave_agendamentos_do_dia(dia) -> str:
+    return f"agendamentos:{dia.isoformat()}"
+
+
+# modelo -> (campos lidos, função dos valores desses campos -> chaves em que o registro conta)
+CONTADORES = {
+    Proposta: (('ativo', 'status'), lambda ativo, status: [f"propostas:{status}"] if ativo else []),
+    OrdemServico: (('ativo', 'status'), lambda ativo, status: [f"ordens:{status}"] if ativo else []),
+    Cliente: (('ativo',), lambda ativo: ['clientes:ativos'] if ativo else []),
+    # Só agendamentos que ocupam a agenda, por dia de início
+    Agendamento: (
+        ('ativo', 'status', 'data_inicio'),
+        lambda ativo, status, data_inicio: (
+            [chave_agendamentos_do_dia(data_inicio.date())]
+            if ativo and status not in STATUS_SEM_CONFLITO and data_inicio else []
+        ),
+    ),
+}
+
+
+class ContadorDashboard(db.Model):
+    """ Total atual de uma chave do dashboard """
+    __tablename__ = 'contadores_dashboard'
+
+    chave = db.Column(db.String(80), primary_key=True)
+    valor = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ContadorDashboard {self.chave}={self.valor}>"
+
+
+# Mesma sintaxe no SQLite e no Postgres. Em text() o comando entra no cache de
+# compilação; o on_conflict_do_update() do dialeto SQLite é recompilado a cada flush
+_SOMA_COM_UPSERT = text(
+    "INSERT INTO contadores_dashboard (chave, valor, updated_at) VALUES (:c_chave, :c_delta, :c_agora) "
+    "ON CONFLICT (chave) DO UPDATE SET valor = contadores_dashboard.valor + excluded.valor, "
+    "updated_at = excluded.updated_at"
+).bindparams(bindparam('c_agora', type_=db.DateTime))
+_DIALETOS_COM_UPSERT = ('sqlite', 'postgresql')
+_SOMA_SEM_UPSERT = (
+    update(ContadorDashboard.__table__)
+    .where(ContadorDashboard.__table__.c.chave == bindparam('c_chave'))
+    .values(valor=ContadorDashboard.__table__.c.valor + bindparam('c_delta'), updated_at=bindparam('c_agora'))
+)
+
+
+def somar_contadores(connection, deltas: dict):
+    """Soma os deltas ({chave: +-n}) nas linhas, criando as que faltam"""
+    agora = datetime.utcnow()
+    parametros = [{'c_chave': chave, 'c_delta': delta, 'c_agora': agora} for chave, delta in deltas.items() if delta]
+    if not parametros:
+        return
+    if connection.dialect.name in _DIALETOS_COM_UPSERT:
+        connection.execute(_SOMA_COM_UPSERT, parametros)
+        return
+    tabela = ContadorDashboard.__table__
+    for linha in parametros:
+        if connection.execute(_SOMA_SEM_UPSERT, linha).rowcount == 0:
+            connection.execute(tabela.insert().values(chave=linha['c_chave'], valor=linha['c_delta'], updated_at=agora))
+
+
+def _chaves(modelo, valores) -> list:
+    return CONTADORES[modelo][1](*valores)
+
+
+def _deltas(anteriores, atuais) -> dict:
+    deltas = {}
+    for chave in anteriores:
+        deltas[chave] = deltas.get(chave, 0) - 1
+    for chave in atuais:
+        deltas[chave] = deltas.get(chave, 0) + 1
+    return deltas
+
+
+def _contar_apos_inserir(mapper, connection, registro):
+    campos = CONTADORES[mapper.class_][0]
+    somar_contadores(connection, _deltas([], _chaves(mapper.class_, [getattr(registro, c) for c in campos])))
+
+
+def _contar_apos_atualizar(mapper, connection, registro):
+    campos = CONTADORES[mapper.class_][0]
+    estado = inspect(registro)
+    if not any(estado.attrs[campo].history.has_changes() for campo in campos):
+        return
+    anteriores = _chaves(mapper.class_, valores_anteriores(registro, campos))
+    atuais = _chaves(mapper.class_, [getattr(registro, campo) for campo in campos])
+    somar_contadores(connection, _deltas(anteriores, atuais))
+
+
+def _contar_apos_excluir(mapper, connection, registro):
+    campos = CONTADORES[mapper.class_][0]
+    somar_contadores(connection, _deltas(_chaves(mapper.class_, valores_anteriores(registro, campos)), []))
+
+
+for _modelo, (_campos, _) in CONTADORES.items():
+    guardar_valores_anteriores(_modelo, _campos)
+    event.listen(_modelo, 'after_insert', _contar_apos_inserir)
+    event.listen(_modelo, 'after_update', _contar_apos_atualizar)
+    event.listen(_modelo, 'after_delete', _contar_apos_excluir)
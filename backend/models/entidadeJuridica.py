@@ -2,6 +2,7 @@ from  datetime import datetime
 from config import db
 from sqlalchemy.orm import validates
 from .base import TimestampMixin, ActiveMixin
+from .referencias import cache_referencias
 import re
 
 class EntidadeJuridica(db.Model, TimestampMixin, ActiveMixin):
@@ -63,8 +64,8 @@ class EntidadeJuridica(db.Model, TimestampMixin, ActiveMixin):
             'endereco_id': self.endereco_id,
             'tipo_id': self.tipo_id,
             'regime_tributario_id': self.regime_tributario_id,
-            'tipo': self.tipo.to_json() if self.tipo else None,
-            'regime_tributario': self.regime_tributario.to_json() if self.regime_tributario else None,
+            'tipo': cache_referencias.json_por_id('tipos_empresa', self.tipo_id),
+            'regime_tributario': cache_referencias.json_por_id('regimes_tributarios', self.regime_tributario_id),
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None,
@@ -0,0 +1,38 @@
+from config import db
+from .base import TimestampMixin
+
+
+class JobPDF(db.Model, TimestampMixin):
+    """ Modelo para acompanhar a geração assíncrona do PDF de uma proposta """
+    __tablename__ = 'jobs_pdf'
+
+    STATUS_PENDENTE = 'pendente'
+    STATUS_PROCESSANDO = 'processando'
+    STATUS_CONCLUIDO = 'concluido'
+    STATUS_ERRO = 'erro'
+
+    id = db.Column(db.String(36), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_PENDENTE, index=True)
+    caminho = db.Column(db.String(255), nullable=True)
+    erro = db.Column(db.Text, nullable=True)
+    iniciado_em = db.Column(db.DateTime, nullable=True)
+    concluido_em = db.Column(db.DateTime, nullable=True)
+
+    # Chave estrangeira para a proposta
+    proposta_id = db.Column(db.Integer, db.ForeignKey('propostas.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    def to_json(self):
+        return {
+            'id': self.id,
+            'proposta_id': self.proposta_id,
+            'status': self.status,
+            'caminho': self.caminho,
+            'erro': self.erro,
+            'iniciado_em': self.iniciado_em.isoformat() if self.iniciado_em else None,
+            'concluido_em': self.concluido_em.isoformat() if self.concluido_em else None,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+        }
+
+    def __repr__(self):
+        return f"<JobPDF {self.id} - {self.status}>"
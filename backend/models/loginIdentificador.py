@@ -0,0 +1,76 @@
+""" Tabela de busca dos identificadores de login (username, email e CPF) """
+
+import re
+from sqlalchemy import event, inspect
+from config import db
+from .organizacional import Usuario
+
+
+# Também são os nomes das colunas em Usuario; a ordem é a prioridade quando
+# o mesmo valor identifica mais de um usuário
+TIPOS_IDENTIFICADOR = ('username', 'email', 'cpf')
+
+
+def normalizar_identificador(tipo: str, valor):
+    """Forma em que o identificador é guardado e buscado"""
+    valor = (valor or '').strip()
+    if tipo == 'email':
+        return valor.lower()
+    if tipo == 'cpf':
+        return re.sub(r'\D', '', valor)
+    return valor
+
+
+def chaves_identificador(valores: dict) -> dict:
+    """{tipo: chave} dos valores informados, sem os que ficam vazios ao normalizar"""
+    chaves = {}
+    for tipo in TIPOS_IDENTIFICADOR:
+        valor = normalizar_identificador(tipo, valores.get(tipo))
+        if valor:
+            chaves[tipo] = f"{tipo}:{valor}"
+    return chaves
+
+
+class LoginIdentificador(db.Model):
+    """ Username, email e CPF de cada usuário, normalizados, para o login em uma consulta """
+    __tablename__ = 'login_identificadores'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # "<tipo>:<valor normalizado>", ex.: "email:fulano@empresa.com"
+    chave = db.Column(db.String(160), nullable=False, index=True)
+    tipo = db.Column(db.String(10), nullable=False)
+    prioridade = db.Column(db.Integer, nullable=False)
+
+    # Chave estrangeira para o usuário
+    usuario_id = db.Column(db.Integer, db.ForeignKey('funcionarios.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    @staticmethod
+    def linhas_do_usuario(usuario_id: int, username, email, cpf) -> list:
+        chaves = chaves_identificador({'username': username, 'email': email, 'cpf': cpf})
+        return [
+            {'chave': chave, 'tipo': tipo, 'prioridade': TIPOS_IDENTIFICADOR.index(tipo), 'usuario_id': usuario_id}
+            for tipo, chave in chaves.items()
+        ]
+
+    def __repr__(self):
+        return f"<LoginIdentificador {self.chave} -> {self.usuario_id}>"
+
+
+# Mantém a tabela junto com o usuário, na mesma transação do flush
+@event.listens_for(Usuario, 'after_insert')
+def _identificadores_apos_inserir(mapper, connection, usuario):
+    linhas = LoginIdentificador.linhas_do_usuario(usuario.id, usuario.username, usuario.email, usuario.cpf)
+    if linhas:
+        connection.execute(LoginIdentificador.__table__.insert(), linhas)
+
+
+@event.listens_for(Usuario, 'after_update')
+def _identificadores_apos_atualizar(mapper, connection, usuario):
+    estado = inspect(usuario)
+    if not any(estado.attrs[campo].history.has_changes() for campo in TIPOS_IDENTIFICADOR):
+        return
+    tabela = LoginIdentificador.__table__
+    connection.execute(tabela.delete().where(tabela.c.usuario_id == usuario.id))
+    linhas = LoginIdentificador.linhas_do_usuario(usuario.id, usuario.username, usuario.email, usuario.cpf)
+    if linhas:
+        connection.execute(tabela.insert(), linhas)
@@ -4,6 +4,8 @@ from sqlalchemy.orm import validates
 from .base import TimestampMixin, ActiveMixin
 import re
 
+STATUS_ORDEM_SERVICO = ('aberta', 'em_andamento', 'pausada', 'concluida', 'cancelada')
+
 class ItemOrdemServico(db.Model, TimestampMixin, ActiveMixin):
     """ Modelo de Item da Ordem de Serviço """
     __tablename__ = 'itens_ordem_servicos'
@@ -86,6 +88,9 @@ class OrdemServico(db.Model, TimestampMixin, ActiveMixin):
     status = db.Column(db.String(50), default='aberta')
     data_abertura = db.Column(db.DateTime, default=datetime.utcnow)
     data_fechamento = db.Column(db.DateTime, nullable=True)
+    # Totais guardados, mantidos pelos eventos dos itens (models/totais.py)
+    subtotal_os = db.Column(db.Float, nullable=True, default=0.0)  # Soma de quantidade x valor unitário
+    desconto_os = db.Column(db.Float, nullable=True, default=0.0)  # Soma dos descontos dos itens
     valor_total_os = db.Column(db.Float, nullable=True, default=0.0)  # Valor total da OS
 
     # Foreign Keys
@@ -112,17 +117,14 @@ class OrdemServico(db.Model, TimestampMixin, ActiveMixin):
 
     @validates('status')
     def validando_status(self, key, status):
-        status_validos = ['aberta', 'em_andamento', 'pausada', 'concluida', 'cancelada']
-        if status not in status_validos:
-            raise ValueError(f"Status deve ser um dos seguintes: {', '.join(status_validos)}")
+        if status not in STATUS_ORDEM_SERVICO:
+            raise ValueError(f"Status deve ser um dos seguintes: {', '.join(STATUS_ORDEM_SERVICO)}")
         return status
 
     # Método para calcular valor total da OS
     def calcular_valor_total(self):
-        """Calcula o valor total da OS baseado nos itens"""
-        total = sum(item.valor_total for item in self.itens if item.ativo)
-        self.valor_total_os = total
-        return total
+        """Valor total da OS, lido da coluna guardada (sem carregar os itens)"""
+        return self.valor_total_os or 0.0
 
     # Método para fechar a OS
     def fechar_ordem(self):
@@ -139,6 +141,8 @@ class OrdemServico(db.Model, TimestampMixin, ActiveMixin):
             'status': self.status,
             'data_abertura': self.data_abertura.isoformat(),
             'data_fechamento': self.data_fechamento.isoformat() if self.data_fechamento else None,
+            'subtotal_os': self.subtotal_os,
+            'desconto_os': self.desconto_os,
             'valor_total_os': self.valor_total_os,
             'cliente': self.cliente.to_json() if self.cliente else None,
             'empresa': self.empresa.to_json() if self.empresa else None,
@@ -1,10 +1,11 @@
 """ Modelos de dados para organização da empresa """
 
 from datetime import datetime
-from config import db
+from config import db, SENHA_HASH_METODO
 from sqlalchemy.orm import validates
 from werkzeug.security import generate_password_hash, check_password_hash
 from .base import TimestampMixin, ActiveMixin
+from .referencias import cache_referencias
 import re
 
 
@@ -197,11 +198,15 @@ class Usuario(db.Model, TimestampMixin, ActiveMixin):
     propostas = db.relationship('Proposta', back_populates='usuario', lazy='dynamic')
     ordens_servico = db.relationship('OrdemServico', back_populates='usuario', lazy='dynamic')
 
-    # Métodos de senha
-    def set_senha(self, senha):
+    # Métodos de senha (na API use services/credenciais_service.py, que não bloqueia a requisição)
+    @staticmethod
+    def validar_senha(senha):
         if not senha or len(senha) < 6:
             raise ValueError("Senha deve ter pelo menos 6 caracteres")
-        self.senha_hash = generate_password_hash(senha)
+
+    def set_senha(self, senha):
+        self.validar_senha(senha)
+        self.senha_hash = generate_password_hash(senha, method=SENHA_HASH_METODO)
 
     def verificar_senha(self, senha):
         return check_password_hash(self.senha_hash, senha)
@@ -248,7 +253,7 @@ class Usuario(db.Model, TimestampMixin, ActiveMixin):
             'eh_gerente': self.eh_gerente,
             'status': self.status,
             'cargo_id': self.cargo_id,
-            'cargo': self.cargo.to_json() if self.cargo else None,
+            'cargo': cache_referencias.json_por_id('cargos', self.cargo_id),
             'ultimo_login': self.ultimo_login.isoformat() if self.ultimo_login else None,
             'tentativas_login': self.tentativas_login,
             'bloqueado_ate': self.bloqueado_ate.isoformat() if self.bloqueado_ate else None,
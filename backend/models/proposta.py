@@ -4,6 +4,8 @@ from sqlalchemy.orm import validates
 from .base import TimestampMixin, ActiveMixin
 import re
 
+STATUS_PROPOSTA = ('rascunho', 'enviada', 'aceita', 'rejeitada', 'expirada')
+
 class ItemProposta(db.Model, TimestampMixin, ActiveMixin):
     """ Modelo de Item da Proposta """
     __tablename__ = 'itens_propostas'
@@ -18,8 +20,8 @@ class ItemProposta(db.Model, TimestampMixin, ActiveMixin):
     servico_id = db.Column(db.Integer, db.ForeignKey('servicos.id', ondelete='SET NULL'), nullable=True, index=True)
 
     # Relationships
-    proposta = db.relationship('Proposta', back_populates='itens', lazy='joined')
-    servico = db.relationship('Servico', back_populates='item_propostas', lazy='joined')
+    proposta = db.relationship('Proposta', back_populates='itens')
+    servico = db.relationship('Servico', back_populates='item_propostas')
 
     # Validadores
     @validates('quantidade')
@@ -66,7 +68,11 @@ class Proposta(db.Model, TimestampMixin, ActiveMixin):
     observacao = db.Column(db.String(255), nullable=True)
     status = db.Column(db.String(50), default='rascunho')
     porcentagem_desconto = db.Column(db.Integer, nullable=True, default=0)
+    # Totais guardados, mantidos pelos eventos dos itens (models/totais.py)
+    subtotal = db.Column(db.Float, nullable=True, default=0.0)
+    valor_desconto = db.Column(db.Float, nullable=True, default=0.0)
     valor_total = db.Column(db.Float, nullable=True, default=0.0)
+    quantidade_itens = db.Column(db.Integer, nullable=True, default=0)
     requer_aprovacao = db.Column(db.Boolean, default=False)
     aprovado_por = db.Column(db.String(100), nullable=True)
     data_aprovacao = db.Column(db.DateTime, nullable=True)
@@ -82,11 +88,11 @@ class Proposta(db.Model, TimestampMixin, ActiveMixin):
     entidade_juridica_id = db.Column(db.Integer, db.ForeignKey('entidades_juridicas.id', ondelete='SET NULL'), nullable=True, index=True)
     usuario_id = db.Column(db.Integer, db.ForeignKey('funcionarios.id', ondelete='SET NULL'), nullable=True, index=True)
     
-    # Relationships
-    cliente = db.relationship('Cliente', back_populates='propostas', lazy='joined')
-    entidade_juridica = db.relationship('EntidadeJuridica', back_populates='propostas', lazy='joined')
-    usuario = db.relationship('Usuario', back_populates='propostas', lazy='joined')
-    itens = db.relationship('ItemProposta', back_populates='proposta', lazy='joined', cascade="all, delete-orphan")
+    # Relationships (a estratégia de carregamento é escolhida pelo repositório, ver repositories/carregamento.py)
+    cliente = db.relationship('Cliente', back_populates='propostas')
+    entidade_juridica = db.relationship('EntidadeJuridica', back_populates='propostas')
+    usuario = db.relationship('Usuario', back_populates='propostas')
+    itens = db.relationship('ItemProposta', back_populates='proposta', cascade="all, delete-orphan")
     
     # Validadores
     @validates('numero_proposta')
@@ -96,44 +102,19 @@ class Proposta(db.Model, TimestampMixin, ActiveMixin):
         return numero_proposta
     @validates('status')
     def validando_status(self, key, status):
-        status_permitidos = ['rascunho', 'enviada', 'aceita', 'rejeitada', 'expirada']
-        if status not in status_permitidos:
-            raise ValueError(f"O status deve ser um dos seguintes: {', '.join(status_permitidos)}")
+        if status not in STATUS_PROPOSTA:
+            raise ValueError(f"O status deve ser um dos seguintes: {', '.join(STATUS_PROPOSTA)}")
         return status
     
     def calcular_totais(self):
-        """Calcula todos os totais da proposta baseado nos itens"""
-        if not self.itens:
-            return {
-                'subtotal': 0.0,
-                'desconto_percentual': self.porcentagem_desconto or 0,
-                'valor_desconto': 0.0,
-                'total': 0.0,
-                'quantidade_total_itens': 0
-            }
-        
-        # Calcular subtotal somando todos os itens
-        subtotal = sum(item.valor_total for item in self.itens if item.ativo)
-        
-        # Calcular desconto
-        desconto_percentual = self.porcentagem_desconto or 0
-        valor_desconto = (subtotal * desconto_percentual) / 100
-        
-        # Total final
-        total = subtotal - valor_desconto
-        
-        # Quantidade total de itens
-        quantidade_total = sum(item.quantidade for item in self.itens if item.ativo)
-        
-        # Atualizar valor_total no modelo se necessário
-        if self.valor_total != total:
-            self.valor_total = total
-        
+        """Totais da proposta, lidos das colunas guardadas (sem carregar os itens)"""
+        subtotal = self.subtotal or 0.0
+        quantidade_total = self.quantidade_itens or 0
         return {
             'subtotal': round(subtotal, 2),
-            'desconto_percentual': desconto_percentual,
-            'valor_desconto': round(valor_desconto, 2),
-            'total': round(total, 2),
+            'desconto_percentual': self.porcentagem_desconto or 0,
+            'valor_desconto': round(self.valor_desconto or 0.0, 2),
+            'total': round(self.valor_total or 0.0, 2),
             'quantidade_total_itens': quantidade_total,
             'valor_unitario_medio': round(subtotal / quantidade_total, 2) if quantidade_total > 0 else 0.0
         }
@@ -150,7 +131,8 @@ class Proposta(db.Model, TimestampMixin, ActiveMixin):
         if not self.cliente_id and not self.entidade_juridica_id:
             erros.append("Cliente ou Entidade Jurídica deve ser informado")
         
-        if not self.itens or len([item for item in self.itens if item.ativo]) == 0:
+        itens_ativos = [item for item in self.itens if item.ativo]
+        if not itens_ativos:
             erros.append("Proposta deve ter pelo menos um item")
         
         # Validações de negócio
@@ -161,18 +143,16 @@ class Proposta(db.Model, TimestampMixin, ActiveMixin):
             avisos.append("Desconto superior a 50% - pode requerer aprovação")
         
         # Validar itens
-        for item in self.itens:
-            if item.ativo:
-                if item.quantidade <= 0:
-                    erros.append(f"Item {item.id}: quantidade deve ser positiva")
-                if item.valor_unitario <= 0:
-                    erros.append(f"Item {item.id}: valor unitário deve ser positivo")
-                if item.valor_total != (item.quantidade * item.valor_unitario):
-                    avisos.append(f"Item {item.id}: valor total inconsistente")
+        for item in itens_ativos:
+            if item.quantidade <= 0:
+                erros.append(f"Item {item.id}: quantidade deve ser positiva")
+            if item.valor_unitario <= 0:
+                erros.append(f"Item {item.id}: valor unitário deve ser positivo")
+            if item.valor_total != (item.quantidade * item.valor_unitario):
+                avisos.append(f"Item {item.id}: valor total inconsistente")
         
-        # Verificar se requer aprovação
-        totais = self.calcular_totais()
-        if totais['total'] > 10000:  # Valores altos podem requerer aprovação
+        # Verificar se requer aprovação (total guardado, sem somar os itens de novo)
+        if (self.valor_total or 0) > 10000:  # Valores altos podem requerer aprovação
             if not self.requer_aprovacao:
                 avisos.append("Proposta de valor alto - considere marcar como 'requer aprovação'")
         
@@ -200,7 +180,10 @@ class Proposta(db.Model, TimestampMixin, ActiveMixin):
             'observacao': self.observacao,
             'status': self.status,
             'porcentagem_desconto': self.porcentagem_desconto,
+            'subtotal': self.subtotal,
+            'valor_desconto': self.valor_desconto,
             'valor_total': self.valor_total,
+            'quantidade_itens': self.quantidade_itens,
             'requer_aprovacao': self.requer_aprovacao,
             'aprovado_por': self.aprovado_por,
             'data_aprovacao': self.data_aprovacao.isoformat() if self.data_aprovacao else None,
@@ -0,0 +1,88 @@
+"""
+Expansão de regras de recorrência (no estilo RRULE) em ocorrências.
+
+Uma regra é: início da primeira ocorrência, duração, frequência ('diaria',
+'semanal' ou 'mensal') com intervalo (a cada N dias/semanas/meses), dias da
+semana (0 = segunda, só na semanal), limite por data (`ate`) e/ou por
+quantidade (`contagem`) e exceções (inícios de ocorrências removidas).
+
+As ocorrências nunca são gravadas: são geradas sob demanda só para a janela
+pedida. Na diária e na semanal o gerador salta direto para o período da
+janela; na mensal percorre os meses desde o início (12 passos por ano).
+Como na RFC 5545, `contagem` conta as ocorrências antes de tirar as
+exceções, e dias inexistentes no mês (31/04) são pulados.
+"""
+
+from calendar import monthrange
+from datetime import timedelta
+
+FREQUENCIAS = ('diaria', 'semanal', 'mensal')
+
+
+def _somar_meses(data, meses: int):
+    """A mesma data `meses` depois, ou None se o dia não existe naquele mês"""
+    total = data.month - 1 + meses
+    ano, mes = data.year + total // 12, total % 12 + 1
+    if data.day > monthrange(ano, mes)[1]:
+        return None
+    return data.replace(year=ano, month=mes)
+
+
+def _candidatos(inicio, frequencia: str, intervalo: int, dias_semana, a_partir_de):
+    """(índice, início) das ocorrências em ordem, começando perto de `a_partir_de`"""
+    if frequencia == 'diaria':
+        passo = timedelta(days=intervalo)
+        k = max(0, (a_partir_de - inicio) // passo)
+        while True:
+            yield k, inicio + k * passo
+            k += 1
+
+    elif frequencia == 'semanal':
+        dias = sorted(set(dias_semana)) or [inicio.weekday()]
+        segunda = inicio - timedelta(days=inicio.weekday())
+        # Dias da primeira semana anteriores ao início não contam
+        pulados = sum(1 for dia in dias if dia < inicio.weekday())
+        passo = timedelta(weeks=intervalo)
+        k = max(0, (a_partir_de - segunda) // passo)
+        while True:
+            semana = segunda + k * passo
+            for posicao, dia in enumerate(dias):
+                indice = k * len(dias) + posicao - pulados
+                if indice >= 0:
+                    yield indice, semana + timedelta(days=dia)
+            k += 1
+
+    elif frequencia == 'mensal':
+        k, indice = 0, 0
+        while True:
+            data = _somar_meses(inicio, k * intervalo)
+            if data is not None:
+                yield indice, data
+                indice += 1
+            k += 1
+
+    else:
+        raise ValueError(f"Frequência deve ser uma das seguintes: {', '.join(FREQUENCIAS)}")
+
+
+def ocorrencias(inicio, duracao, frequencia, janela_inicio, janela_fim, intervalo=1, dias_semana=(),
+                ate=None, contagem=None, excecoes=frozenset()):
+    """(início, fim) das ocorrências que cruzam [janela_inicio, janela_fim), em ordem de início"""
+    for indice, de in _candidatos(inicio, frequencia, intervalo or 1, dias_semana or (), janela_inicio - duracao):
+        if de >= janela_fim or (ate is not None and de > ate) or (contagem is not None and indice >= contagem):
+            return
+        if de + duracao > janela_inicio and de not in excecoes:
+            yield de, de + duracao
+
+
+def fim_da_serie(inicio, duracao, frequencia, intervalo=1, dias_semana=(), ate=None, contagem=None):
+    """Fim da última ocorrência possível (limite superior), ou None se a série não termina"""
+    limites = []
+    if ate is not None:
+        limites.append(ate + duracao)
+    if contagem is not None:
+        for indice, de in _candidatos(inicio, frequencia, intervalo or 1, dias_semana or (), inicio):
+            if indice >= contagem - 1 or (ate is not None and de > ate):
+                limites.append(de + duracao)
+                break
+    return min(limites) if limites else None
@@ -0,0 +1,108 @@
+"""
+Cache versionado dos dados de referência.
+
+Regimes tributários, tipos de empresa, faixas de faturamento, categorias de
+serviço, tipos de atividade e cargos mudam raramente e são embutidos no JSON
+de muitos registros (EntidadeJuridica.tipo, Usuario.cargo...). Cada tabela é
+lida inteira uma vez e guardada já serializada (to_json()) por id, junto com
+a lista dos ativos e um ETag calculado do conteúdo (igual em todos os
+processos enquanto os dados forem os mesmos).
+
+Os services dos modelos chamam invalidar() ao criar, alterar ou remover um
+registro. Alterações feitas por outro processo aparecem depois de no máximo
+REFERENCIAS_CACHE_TTL segundos.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from config import db
+
+REFERENCIAS_CACHE_TTL = int(os.environ.get('REFERENCIAS_CACHE_TTL', 300))
+
+# tipo de referência -> nome da classe do modelo (resolvida no primeiro uso)
+REFERENCIAS = {
+    'regimes_tributarios': 'RegimeTributario',
+    'tipos_empresa': 'TipoEmpresa',
+    'faixas_faturamento': 'FaixaFaturamento',
+    'categorias_servico': 'CategoriaServico',
+    'tipos_atividade': 'TipoAtividade',
+    'cargos': 'Cargo',
+}
+
+
+class _Tabela:
+    __slots__ = ('versao', 'carregado_em', 'por_id', 'ativos', 'etag')
+
+    def __init__(self, versao, por_id, ativos, etag):
+        self.versao = versao
+        self.carregado_em = time.monotonic()
+        self.por_id = por_id
+        self.ativos = ativos
+        self.etag = etag
+
+
+class CacheReferencias:
+    """ Tabelas de referência serializadas em memória, com ETag e invalidação por tipo """
+
+    def __init__(self, ttl: int = REFERENCIAS_CACHE_TTL):
+        self.ttl = ttl
+        self._tabelas = {}
+        self._versoes = {tipo: 0 for tipo in REFERENCIAS}
+        self._lock = threading.Lock()
+
+    def _modelo(self, tipo: str):
+        return db.Model.registry._class_registry[REFERENCIAS[tipo]]
+
+    def _carregar(self, tipo: str) -> _Tabela:
+        versao = self._versoes[tipo]
+        modelo = self._modelo(tipo)
+        por_id = {}
+        ativos = []
+        for registro in modelo.query.order_by(modelo.id).all():
+            dados = registro.to_json()
+            por_id[registro.id] = dados
+            if registro.ativo:
+                ativos.append(dados)
+        conteudo = json.dumps(ativos, sort_keys=True, ensure_ascii=False, default=str)
+        etag = f"{tipo}-{hashlib.sha1(conteudo.encode('utf-8')).hexdigest()[:20]}"
+        return _Tabela(versao, por_id, ativos, etag)
+
+    def _obter(self, tipo: str) -> _Tabela:
+        tabela = self._tabelas.get(tipo)
+        if tabela is not None and time.monotonic() - tabela.carregado_em < self.ttl:
+            return tabela
+        tabela = self._carregar(tipo)
+        with self._lock:
+            # Invalidado durante a leitura: usa os dados, mas não guarda
+            if tabela.versao == self._versoes[tipo]:
+                self._tabelas[tipo] = tabela
+        return tabela
+
+    def json_por_id(self, tipo: str, registro_id):
+        """JSON do registro (ativo ou não), ou None"""
+        if registro_id is None:
+            return None
+        tabela = self._obter(tipo)
+        dados = tabela.por_id.get(registro_id)
+        if dados is None and time.monotonic() - tabela.carregado_em > 1:
+            # Criado por outro processo depois da carga
+            self.invalidar(tipo)
+            dados = self._obter(tipo).por_id.get(registro_id)
+        return dados
+
+    def listar_com_etag(self, tipo: str):
+        """(JSON dos registros ativos ordenados por id, ETag da lista)"""
+        tabela = self._obter(tipo)
+        return tabela.ativos, tabela.etag
+
+    def invalidar(self, tipo: str):
+        with self._lock:
+            self._versoes[tipo] += 1
+            self._tabelas.pop(tipo, None)
+
+
+cache_referencias = CacheReferencias()
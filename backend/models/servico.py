@@ -20,9 +20,9 @@ class Servico(db.Model, TimestampMixin, ActiveMixin):
     # Foreign Keys
     categoria_id = db.Column(db.Integer, db.ForeignKey('categorias_servicos.id', ondelete='SET NULL'), nullable=True)
     #Relationships
-    item_ordem_servicos = db.relationship('ItemOrdemServico', back_populates='servico', lazy='joined')
-    item_propostas = db.relationship('ItemProposta', back_populates='servico', lazy='joined')
-    categoria = db.relationship('CategoriaServico', back_populates='servicos', lazy='joined')
+    item_ordem_servicos = db.relationship('ItemOrdemServico', back_populates='servico')
+    item_propostas = db.relationship('ItemProposta', back_populates='servico')
+    categoria = db.relationship('CategoriaServico', back_populates='servicos')
 
     # Validadores
     @validates('codigo')
@@ -56,7 +56,7 @@ class CategoriaServico(db.Model, TimestampMixin, ActiveMixin):
     descricao = db.Column(db.String(255), nullable=True)
     
     #Relationships
-    servicos = db.relationship('Servico', back_populates='categoria', lazy='joined')
+    servicos = db.relationship('Servico', back_populates='categoria')
     
     # Validadores
     @validates('nome')
@@ -0,0 +1,174 @@
+"""
+Totais guardados de propostas e ordens de serviço, mantidos pelos itens.
+
+Proposta.subtotal/quantidade_itens/valor_desconto/valor_total e
+OrdemServico.subtotal_os/desconto_os/valor_total_os são colunas. Os eventos
+after_insert/after_update/after_delete de ItemProposta e ItemOrdemServico
+somam a diferença da contribuição do item (zero quando inativo) na linha do
+pai, na mesma transação do flush; a mudança de porcentagem_desconto da
+proposta refaz o desconto e o total a partir do subtotal. Listagens e
+relatórios leem as colunas, sem carregar os itens.
+
+Escritas que não passam pelo ORM (o insert() em massa dos lotes de itens,
+scripts) não disparam os eventos: quem as faz chama recalcular_totais() do
+repositório, que refaz as colunas a partir dos itens (também o comando
+recalcular_totais.py, para o banco inteiro).
+"""
+
+from sqlalchemy import bindparam, event, func, inspect, select, update
+from sqlalchemy.orm import attributes, object_session
+from .base import valores_anteriores, guardar_valores_anteriores
+from .ordemServico import OrdemServico, ItemOrdemServico
+from .proposta import Proposta, ItemProposta
+
+_PROPOSTAS = Proposta.__table__
+_ORDENS = OrdemServico.__table__
+
+
+def totais_da_proposta(subtotal) -> dict:
+    """
+    Colunas de totais da proposta a partir de uma expressão SQL do subtotal
+    (mesma regra que Proposta.calcular_totais() usava: desconto percentual
+    sobre o subtotal), em centavos
+    """
+    subtotal = func.round(subtotal, 2)
+    desconto = func.round(subtotal * func.coalesce(_PROPOSTAS.c.porcentagem_desconto, 0) / 100.0, 2)
+    return {'subtotal': subtotal, 'valor_desconto': desconto, 'valor_total': func.round(subtotal - desconto, 2)}
+
+
+def totais_da_ordem(subtotal, total) -> dict:
+    """Colunas de totais da ordem a partir das expressões SQL do bruto e do líquido dos itens"""
+    subtotal, total = func.round(subtotal, 2), func.round(total, 2)
+    return {'subtotal_os': subtotal, 'desconto_os': func.round(subtotal - total, 2), 'valor_total_os': total}
+
+
+# O lado direito do SET lê os valores anteriores da linha (SQLite e Postgres)
+_SOMA_PROPOSTA = update(_PROPOSTAS).where(_PROPOSTAS.c.id == bindparam('t_id')).values(
+    quantidade_itens=func.coalesce(_PROPOSTAS.c.quantidade_itens, 0) + bindparam('t_quantidade'),
+    **totais_da_proposta(func.coalesce(_PROPOSTAS.c.subtotal, 0) + bindparam('t_subtotal')),
+)
+_SOMA_ORDEM = update(_ORDENS).where(_ORDENS.c.id == bindparam('t_id')).values(
+    **totais_da_ordem(
+        func.coalesce(_ORDENS.c.subtotal_os, 0) + bindparam('t_subtotal'),
+        func.coalesce(_ORDENS.c.valor_total_os, 0) + bindparam('t_total'),
+    )
+)
+
+
+# item -> (pai, chave estrangeira, comando de soma, campos lidos, função dos valores -> contribuição no pai)
+TOTAIS = {
+    ItemProposta: (
+        Proposta, 'proposta_id', _SOMA_PROPOSTA,
+        ('ativo', 'quantidade', 'valor_total'),
+        lambda ativo, quantidade, valor_total: (
+            {'t_subtotal': valor_total, 't_quantidade': quantidade} if ativo else {}
+        ),
+    ),
+    ItemOrdemServico: (
+        OrdemServico, 'ordem_servico_id', _SOMA_ORDEM,
+        ('ativo', 'quantidade', 'valor_unitario', 'valor_total'),
+        lambda ativo, quantidade, valor_unitario, valor_total: (
+            {'t_subtotal': quantidade * valor_unitario, 't_total': valor_total} if ativo else {}
+        ),
+    ),
+}
+
+# Parâmetros dos comandos de soma, para as contribuições que não citam todos
+_ZERADOS = {
+    ItemProposta: {'t_subtotal': 0, 't_quantidade': 0},
+    ItemOrdemServico: {'t_subtotal': 0, 't_total': 0},
+}
+
+# Colunas guardadas de cada pai
+COLUNAS_TOTAIS = {
+    Proposta: ('subtotal', 'quantidade_itens', 'valor_desconto', 'valor_total'),
+    OrdemServico: ('subtotal_os', 'desconto_os', 'valor_total_os'),
+}
+
+
+def _somar(connection, sessao, item_modelo, pai_id, contribuicao: dict):
+    """Soma a contribuição na linha do pai e atualiza o pai carregado na sessão, se houver"""
+    pai_modelo, _, comando, _, _ = TOTAIS[item_modelo]
+    connection.execute(comando, {**_ZERADOS[item_modelo], **contribuicao, 't_id': pai_id})
+    _sincronizar(connection, sessao, pai_modelo, pai_id)
+
+
+def _sincronizar(connection, sessao, pai_modelo, pai_id):
+    """
+    Copia as colunas recalculadas no banco para o objeto do pai no identity
+    map (sem isso ele seguiria com os totais antigos até expirar)
+    """
+    if pai_id is None or sessao is None:
+        return
+    pai = sessao.identity_map.get(inspect(pai_modelo).identity_key_from_primary_key((pai_id,)))
+    if pai is None:
+        return
+    colunas = COLUNAS_TOTAIS[pai_modelo]
+    tabela = pai_modelo.__table__
+    linha = connection.execute(
+        select(*(tabela.c[coluna] for coluna in colunas)).where(tabela.c.id == pai_id)
+    ).first()
+    if linha is not None:
+        for coluna, valor in zip(colunas, linha):
+            attributes.set_committed_value(pai, coluna, valor)
+
+
+def _diferenca(anterior: dict, atual: dict) -> dict:
+    return {chave: atual.get(chave, 0) - anterior.get(chave, 0) for chave in anterior.keys() | atual.keys()}
+
+
+def _contribuicao(modelo, valores) -> dict:
+    return TOTAIS[modelo][4](*valores)
+
+
+def _somar_apos_inserir(mapper, connection, item):
+    _, chave, _, campos, _ = TOTAIS[mapper.class_]
+    contribuicao = _contribuicao(mapper.class_, [getattr(item, campo) for campo in campos])
+    if contribuicao:
+        _somar(connection, object_session(item), mapper.class_, getattr(item, chave), contribuicao)
+
+
+def _somar_apos_atualizar(mapper, connection, item):
+    _, chave, _, campos, _ = TOTAIS[mapper.class_]
+    estado = inspect(item)
+    if not any(estado.attrs[campo].history.has_changes() for campo in campos + (chave,)):
+        return
+    anterior = _contribuicao(mapper.class_, valores_anteriores(item, campos))
+    atual = _contribuicao(mapper.class_, [getattr(item, campo) for campo in campos])
+    pai_anterior, = valores_anteriores(item, (chave,))
+    pai_atual = getattr(item, chave)
+    sessao = object_session(item)
+    if pai_anterior != pai_atual:
+        # Item trocou de proposta/ordem: sai de uma e entra na outra
+        if anterior:
+            _somar(connection, sessao, mapper.class_, pai_anterior, {c: -v for c, v in anterior.items()})
+        if atual:
+            _somar(connection, sessao, mapper.class_, pai_atual, atual)
+        return
+    diferenca = _diferenca(anterior, atual)
+    if any(diferenca.values()):
+        _somar(connection, sessao, mapper.class_, pai_atual, diferenca)
+
+
+def _somar_apos_excluir(mapper, connection, item):
+    _, chave, _, campos, _ = TOTAIS[mapper.class_]
+    anterior = _contribuicao(mapper.class_, valores_anteriores(item, campos))
+    if anterior:
+        pai_id, = valores_anteriores(item, (chave,))
+        _somar(connection, object_session(item), mapper.class_, pai_id, {c: -v for c, v in anterior.items()})
+
+
+def _refazer_desconto(mapper, connection, proposta):
+    """Nova porcentagem de desconto: refaz desconto e total a partir do subtotal guardado"""
+    if not inspect(proposta).attrs.porcentagem_desconto.history.has_changes():
+        return
+    _somar(connection, object_session(proposta), ItemProposta, proposta.id, {})
+
+
+for _modelo, (_, _chave, _, _campos, _) in TOTAIS.items():
+    guardar_valores_anteriores(_modelo, _campos + (_chave,))
+    event.listen(_modelo, 'after_insert', _somar_apos_inserir)
+    event.listen(_modelo, 'after_update', _somar_apos_atualizar)
+    event.listen(_modelo, 'after_delete', _somar_apos_excluir)
+
+event.listen(Proposta, 'after_update', _refazer_desconto)
@@ -0,0 +1,46 @@
+"""
+Recalcula os totais guardados de propostas e ordens de serviço a partir dos
+itens ativos (models/totais.py). Os eventos do ORM mantêm esses totais; use
+depois de cargas ou correções feitas direto no banco.
+
+Uso:
+    python recalcular_totais.py              # propostas e ordens
+    python recalcular_totais.py propostas    # só propostas
+    python recalcular_totais.py ordens       # só ordens
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import app, db
+import models
+from repositories.proposta_repository import PropostaRepository
+from repositories.ordemServico_repository import OrdemServicoRepository
+
+REPOSITORIOS = {
+    'propostas': PropostaRepository,
+    'ordens': OrdemServicoRepository,
+}
+
+
+def main():
+    escolhidos = sys.argv[1:] or list(REPOSITORIOS)
+    invalidos = [nome for nome in escolhidos if nome not in REPOSITORIOS]
+    if invalidos:
+        print(f"❌ Opção inválida: {', '.join(invalidos)} (use {' ou '.join(REPOSITORIOS)})")
+        sys.exit(1)
+
+    with app.app_context():
+        db.create_all()
+        for nome in escolhidos:
+            repositorio = REPOSITORIOS[nome]()
+            criadas = repositorio.preparar_totais()
+            if criadas:
+                print(f"✅ Colunas criadas em {nome}: {', '.join(criadas)}")
+            print(f"✅ {repositorio.recalcular_totais()} {nome} recalculada(s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,30 @@
+from sqlalchemy import select, update, and_, or_
 from config import db
-from models.agendamento import Agendamento
+from repositories.unidade_trabalho import confirmar
+from models.agendamento import Agendamento, SerieAgendamento, STATUS_SEM_CONFLITO
+from models.organizacional import Cargo, Usuario
+
+def _filtro_equipe(funcionario_ids=(), departamento_id=None, cargo_id=None):
+    """Usuários nos ids, no departamento ou no cargo informados"""
+    equipe = []
+    if funcionario_ids:
+        equipe.append(Usuario.id.in_(funcionario_ids))
+    if departamento_id is not None:
+        equipe.append(Usuario.cargo_id.in_(select(Cargo.id).where(Cargo.departamento_id == departamento_id)))
+    if cargo_id is not None:
+        equipe.append(Usuario.cargo_id == cargo_id)
+    return or_(*equipe)
+
+
+def _series_no_periodo(inicio=None, fim=None):
+    """Condições de séries ativas com alguma ocorrência possível em [inicio, fim)"""
+    condicoes = [SerieAgendamento.ativo == True]
+    if fim is not None:
+        condicoes.append(SerieAgendamento.data_inicio < fim)
+    if inicio is not None:
+        condicoes.append(or_(SerieAgendamento.fim_serie.is_(None), SerieAgendamento.fim_serie > inicio))
+    return condicoes
+
 
 class AgendamentoRepository:
     """Repositório para gerenciar os Agendamentos"""
@@ -7,19 +32,151 @@ class AgendamentoRepository:
         return Agendamento.query.filter_by(ativo=True).all()
 
     def get_by_id(self, agendamento_id: int):
-        return Agendamento.query.filter_by(agendamento_id, ativo=True).first()
+        return Agendamento.query.filter_by(id=agendamento_id, ativo=True).first()
     
     def get_by_funcionario(self, funcionario_id: int):
         return Agendamento.query.filter_by(funcionario_id=funcionario_id, ativo=True).all()
+
+    def get_por_periodo(self, inicio=None, fim=None, funcionario_id: int = None):
+        """Agendamentos que cruzam [inicio, fim), pelo índice (funcionario_id, data_inicio, data_fim)"""
+        query = Agendamento.query.filter_by(ativo=True)
+        if funcionario_id is not None:
+            query = query.filter(Agendamento.funcionario_id == funcionario_id)
+        if fim is not None:
+            query = query.filter(Agendamento.data_inicio < fim)
+        if inicio is not None:
+            query = query.filter(Agendamento.data_fim > inicio)
+        return query.order_by(Agendamento.data_inicio, Agendamento.id).all()
+
+    def travar_agenda(self, funcionario_id: int):
+        """
+        Trava a agenda do funcionário até o fim da transação, para conferir
+        conflitos e gravar sem outra gravação no meio: atualiza a linha dele
+        sem mudar nada (lock da linha no Postgres, lock de escrita no SQLite)
+        """
+        tabela = Usuario.__table__
+        db.session.execute(
+            update(tabela).where(tabela.c.id == funcionario_id)
+            .values(id=tabela.c.id, updated_at=tabela.c.updated_at)
+        )
+
+    def ocupacao(self, funcionario_id: int, inicio, fim, ignorar: int = None) -> list:
+        """
+        Linhas (id, data_inicio, data_fim) dos agendamentos do funcionário que
+        ocupam a agenda e cruzam [inicio, fim), em ordem de início, pelo
+        índice (funcionario_id, data_inicio, data_fim)
+        """
+        consulta = select(Agendamento.id, Agendamento.data_inicio, Agendamento.data_fim).where(
+            Agendamento.funcionario_id == funcionario_id,
+            Agendamento.data_inicio < fim,
+            Agendamento.data_fim > inicio,
+            Agendamento.ativo == True,
+            Agendamento.status.notin_(STATUS_SEM_CONFLITO),
+        )
+        if ignorar is not None:
+            consulta = consulta.where(Agendamento.id != ignorar)
+        return db.session.execute(consulta.order_by(Agendamento.data_inicio, Agendamento.id)).all()
+
+    def ocupacao_da_equipe(self, inicio, fim, funcionario_ids=(), departamento_id=None, cargo_id=None):
+        """
+        Linhas (funcionario_id, data_inicio, data_fim) dos horários ocupados em
+        [inicio, fim) de cada funcionário ativo da equipe, em ordem de início.
+        Quem não tem nada no período aparece uma vez, com as datas nulas. A
+        equipe é a união dos ids, do departamento e do cargo informados.
+        Uma única consulta, sem carregar objetos.
+        """
+        equipe = _filtro_equipe(funcionario_ids, departamento_id, cargo_id)
+        ocupa = and_(
+            Agendamento.funcionario_id == Usuario.id,
+            Agendamento.ativo == True,
+            Agendamento.status.notin_(STATUS_SEM_CONFLITO),
+            Agendamento.data_inicio < fim,
+            Agendamento.data_fim > inicio,
+        )
+        consulta = (
+            select(Usuario.id, Agendamento.data_inicio, Agendamento.data_fim)
+            .outerjoin(Agendamento, ocupa)
+            .where(Usuario.ativo == True, equipe)
+            .order_by(Agendamento.data_inicio)
+        )
+        return db.session.execute(consulta.execution_options(yield_per=5000))
+
+    def series_da_equipe(self, inicio, fim, funcionario_ids=(), departamento_id=None, cargo_id=None):
+        """Séries que ocupam a agenda dos funcionários ativos da equipe em [inicio, fim)"""
+        return (
+            SerieAgendamento.query
+            .join(Usuario, SerieAgendamento.funcionario_id == Usuario.id)
+            .filter(
+                Usuario.ativo == True,
+                _filtro_equipe(funcionario_ids, departamento_id, cargo_id),
+                SerieAgendamento.status.notin_(STATUS_SEM_CONFLITO),
+                *_series_no_periodo(inicio, fim),
+            )
+            .all()
+        )
+
+    def criar_indices(self):
+        """Cria os índices das tabelas que faltarem (bancos criados antes deles)"""
+        for tabela in (Agendamento.__table__, SerieAgendamento.__table__):
+            for indice in tabela.indexes:
+                indice.create(db.engine, checkfirst=True)
     
     def create(self, agendamento: Agendamento):
         db.session.add(agendamento)
-        db.session.commit()
+        confirmar()
         return agendamento
     def update(self, agendamento: Agendamento):
-        db.session.commit()
+        confirmar()
         return agendamento
     def delete(self, agendamento: Agendamento):
         agendamento.desativar()
-        db.session.commit()
-        return agendamento  
\ No newline at end of file
+        confirmar()
+        return agendamento
+
+
+class SerieAgendamentoRepository:
+    """Repositório das séries de agendamentos recorrentes"""
+    def get_all(self):
+        return SerieAgendamento.query.filter_by(ativo=True).order_by(SerieAgendamento.id).all()
+
+    def get_by_id(self, serie_id: int):
+        return SerieAgendamento.query.filter_by(id=serie_id, ativo=True).first()
+
+    def _por_periodo(self, inicio=None, fim=None, funcionario_id: int = None):
+        query = SerieAgendamento.query.filter(*_series_no_periodo(inicio, fim))
+        if funcionario_id is not None:
+            query = query.filter(SerieAgendamento.funcionario_id == funcionario_id)
+        return query
+
+    def get_por_periodo(self, inicio=None, fim=None, funcionario_id: int = None):
+        """Séries com alguma ocorrência possível em [inicio, fim), pelo índice (funcionario_id, data_inicio, fim_serie)"""
+        return self._por_periodo(inicio, fim, funcionario_id).order_by(SerieAgendamento.id).all()
+
+    def existe_no_periodo(self, inicio=None, fim=None, funcionario_id: int = None) -> bool:
+        """Se alguma série pode ter ocorrência em [inicio, fim)"""
+        return db.session.query(self._por_periodo(inicio, fim, funcionario_id).exists()).scalar()
+
+    def que_ocupam(self, inicio, fim, funcionario_id: int = None, ignorar: int = None):
+        """Séries que ocupam a agenda com alguma ocorrência possível em [inicio, fim)"""
+        query = SerieAgendamento.query.filter(
+            SerieAgendamento.status.notin_(STATUS_SEM_CONFLITO), *_series_no_periodo(inicio, fim)
+        )
+        if funcionario_id is not None:
+            query = query.filter(SerieAgendamento.funcionario_id == funcionario_id)
+        if ignorar is not None:
+            query = query.filter(SerieAgendamento.id != ignorar)
+        return query.order_by(SerieAgendamento.id).all()
+
+    def create(self, serie: SerieAgendamento):
+        db.session.add(serie)
+        confirmar()
+        return serie
+
+    def update(self, serie: SerieAgendamento):
+        confirmar()
+        return serie
+
+    def delete(self, serie: SerieAgendamento):
+        serie.desativar()
+        confirmar()
+        return serie
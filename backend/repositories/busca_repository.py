@@ -0,0 +1,244 @@
+"""
+Índice de busca textual (SQLite FTS5) de clientes, entidades jurídicas,
+serviços e usuários.
+
+Cada registro ativo vira uma linha da tabela virtual busca_fts, com um
+título (nome / razão social) e um detalhe (documentos, email, códigos). O
+tokenizer unicode61 com remove_diacritics dobra acentos e maiúsculas, então
+"joao" encontra "João". O rowid da linha é derivado do tipo e do id do
+registro, e as linhas são gravadas pelos eventos do ORM na mesma transação
+que altera o registro.
+
+Fora do SQLite (ou sem FTS5) a busca cai em ILIKE nas mesmas colunas, sem
+ranking nem dobra de acentos.
+"""
+
+import re
+from collections import namedtuple
+from html import escape
+from sqlalchemy import event, inspect, or_, text
+
+from config import db
+from models.cliente import Cliente
+from models.entidadeJuridica import EntidadeJuridica
+from models.servico import Servico
+from models.organizacional import Usuario
+
+TABELA_BUSCA = 'busca_fts'
+PESO_TITULO = 10.0
+PESO_DETALHE = 2.0
+
+# codigo entra no rowid (id * 8 + codigo): não mudar o de um tipo existente
+FonteBusca = namedtuple('FonteBusca', 'codigo modelo titulo detalhe')
+
+FONTES_BUSCA = {
+    'cliente': FonteBusca(1, Cliente, ('nome',), ('cpf', 'email')),
+    'entidade_juridica': FonteBusca(2, EntidadeJuridica, ('razao_social', 'nome_fantasia'), ('cnpj',)),
+    'servico': FonteBusca(3, Servico, ('nome',), ('codigo', 'descricao')),
+    'usuario': FonteBusca(4, Usuario, ('nome',), ('email',)),
+}
+
+# O snippet() marca os termos com caracteres de controle; o texto é escapado
+# antes de eles virarem <mark>, para o trecho nunca levar HTML vindo dos registros
+_INICIO_DESTAQUE, _FIM_DESTAQUE = '\x02', '\x03'
+
+_indice_pronto = False
+
+
+def _rowid(fonte: FonteBusca, registro_id: int) -> int:
+    return registro_id * 8 + fonte.codigo
+
+
+def _juntar(registro, campos) -> str:
+    return ' '.join(str(valor) for valor in (getattr(registro, campo) for campo in campos) if valor)
+
+
+def montar_consulta_fts(termo: str):
+    """
+    Converte o texto digitado em uma expressão MATCH segura: cada palavra
+    vira um prefixo entre aspas e todas precisam aparecer. Pontuação entre
+    dígitos é removida para que "123.456.789-01" encontre o CPF gravado só
+    com números.
+    """
+    termo = re.sub(r'(?<=\d)[.\-/](?=\d)', '', termo or '')
+    palavras = re.findall(r'\w+', termo)
+    if not palavras:
+        return None
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+class BuscaRepository:
+
+    def fts_disponivel(self) -> bool:
+        return db.engine.dialect.name == 'sqlite' and _indice_pronto
+
+    def preparar_indice(self) -> dict:
+        """
+        Cria a tabela virtual se precisar e reindexa os tipos cujo número de
+        linhas não bate com o de registros ativos (banco criado antes do índice
+        ou alterado por scripts que não passam pelo ORM). Retorna {tipo: linhas}
+        dos tipos reindexados.
+        """
+        global _indice_pronto
+        if db.engine.dialect.name != 'sqlite':
+            return {}
+        try:
+            db.session.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_BUSCA} USING fts5("
+                "tipo UNINDEXED, registro_id UNINDEXED, titulo, detalhe, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            ))
+        except Exception as e:
+            db.session.rollback()
+            print(f"FTS5 indisponível, busca sem índice: {e}")
+            return {}
+
+        indexadas = dict(db.session.execute(
+            text(f"SELECT tipo, COUNT(*) FROM {TABELA_BUSCA} GROUP BY tipo")
+        ).all())
+        reindexados = {}
+        for tipo, fonte in FONTES_BUSCA.items():
+            ativos = fonte.modelo.query.filter_by(ativo=True).count()
+            if indexadas.get(tipo, 0) != ativos:
+                reindexados[tipo] = self.reindexar(tipo)
+        db.session.commit()
+        _indice_pronto = True
+        return reindexados
+
+    def reindexar(self, tipo: str) -> int:
+        """Refaz as linhas de um tipo a partir da tabela de origem (não faz commit)"""
+        fonte = FONTES_BUSCA[tipo]
+        db.session.execute(text(f"DELETE FROM {TABELA_BUSCA} WHERE tipo = :tipo"), {'tipo': tipo})
+        linhas = [
+            self._linha(tipo, fonte, registro)
+            for registro in fonte.modelo.query.filter_by(ativo=True).yield_per(500)
+        ]
+        if linhas:
+            db.session.execute(self._sql_inserir(), linhas)
+        return len(linhas)
+
+    def _linha(self, tipo: str, fonte: FonteBusca, registro) -> dict:
+        return {
+            'rowid': _rowid(fonte, registro.id),
+            'tipo': tipo,
+            'registro_id': registro.id,
+            'titulo': _juntar(registro, fonte.titulo),
+            'detalhe': _juntar(registro, fonte.detalhe),
+        }
+
+    def _sql_inserir(self):
+        return text(
+            f"INSERT INTO {TABELA_BUSCA} (rowid, tipo, registro_id, titulo, detalhe) "
+            "VALUES (:rowid, :tipo, :registro_id, :titulo, :detalhe)"
+        )
+
+    def sincronizar(self, connection, tipo: str, registro, removido: bool = False):
+        """Atualiza a linha do registro (chamado pelos eventos do ORM, na transação do flush)"""
+        fonte = FONTES_BUSCA[tipo]
+        connection.execute(
+            text(f"DELETE FROM {TABELA_BUSCA} WHERE rowid = :rowid"),
+            {'rowid': _rowid(fonte, registro.id)}
+        )
+        if not removido and registro.ativo:
+            connection.execute(self._sql_inserir(), self._linha(tipo, fonte, registro))
+
+    def buscar(self, termo: str, tipos=None, limit: int = 20, offset: int = 0):
+        """
+        Retorna (resultados, tem_mais). Cada resultado tem tipo, id, título,
+        detalhe, trecho com os termos destacados e score (menor = mais relevante).
+        """
+        tipos = list(tipos or FONTES_BUSCA)
+        if not self.fts_disponivel():
+            return self._buscar_sem_indice(termo, tipos, limit, offset)
+
+        consulta = montar_consulta_fts(termo)
+        if consulta is None:
+            return [], False
+
+        filtro_tipo = ''
+        parametros = {'consulta': consulta, 'limit': limit + 1, 'offset': offset}
+        if len(tipos) < len(FONTES_BUSCA):
+            marcadores = ', '.join(f':tipo{i}' for i in range(len(tipos)))
+            filtro_tipo = f"AND tipo IN ({marcadores})"
+            parametros.update({f'tipo{i}': tipo for i, tipo in enumerate(tipos)})
+
+        linhas = db.session.execute(text(
+            f"SELECT tipo, registro_id, titulo, detalhe, "
+            f"snippet({TABELA_BUSCA}, -1, char(2), char(3), '…', 10) AS trecho, "
+            f"bm25({TABELA_BUSCA}, 0, 0, {PESO_TITULO}, {PESO_DETALHE}) AS score "
+            f"FROM {TABELA_BUSCA} WHERE {TABELA_BUSCA} MATCH :consulta {filtro_tipo} "
+            f"ORDER BY score LIMIT :limit OFFSET :offset"
+        ), parametros).mappings().all()
+
+        resultados = [
+            {
+                'tipo': linha['tipo'],
+                'id': linha['registro_id'],
+                'titulo': linha['titulo'],
+                'detalhe': linha['detalhe'],
+                'trecho': _destacar(linha['trecho']),
+                'score': round(linha['score'], 4),
+            }
+            for linha in linhas[:limit]
+        ]
+        return resultados, len(linhas) > limit
+
+    def _buscar_sem_indice(self, termo: str, tipos, limit: int, offset: int):
+        termo = (termo or '').strip()
+        if not termo:
+            return [], False
+        resultados = []
+        for tipo in tipos:
+            fonte = FONTES_BUSCA[tipo]
+            colunas = [getattr(fonte.modelo, campo) for campo in fonte.titulo + fonte.detalhe]
+            registros = (
+                fonte.modelo.query
+                .filter(fonte.modelo.ativo == True, or_(*(coluna.ilike(f'%{termo}%') for coluna in colunas)))
+                .order_by(fonte.modelo.id)
+                .limit(offset + limit + 1)
+                .all()
+            )
+            resultados.extend(
+                {
+                    'tipo': tipo,
+                    'id': registro.id,
+                    'titulo': _juntar(registro, fonte.titulo),
+                    'detalhe': _juntar(registro, fonte.detalhe),
+                    'trecho': None,
+                    'score': None,
+                }
+                for registro in registros
+            )
+        pagina = resultados[offset:offset + limit + 1]
+        return pagina[:limit], len(pagina) > limit
+
+
+def _destacar(trecho):
+    """Trecho do snippet() como HTML seguro: texto escapado, só os termos entre <mark>"""
+    if trecho is None:
+        return None
+    return escape(trecho).replace(_INICIO_DESTAQUE, '<mark>').replace(_FIM_DESTAQUE, '</mark>')
+
+
+def _registrar_eventos():
+    repo = BuscaRepository()
+
+    def ouvinte(tipo, removido=False, so_se_mudou=False):
+        campos = FONTES_BUSCA[tipo].titulo + FONTES_BUSCA[tipo].detalhe + ('ativo',)
+
+        def sincronizar(mapper, connection, registro):
+            if not _indice_pronto or connection.dialect.name != 'sqlite':
+                return
+            # Ex.: o login grava ultimo_login no usuário; isso não muda o índice
+            if so_se_mudou and not any(inspect(registro).attrs[campo].history.has_changes() for campo in campos):
+                return
+            repo.sincronizar(connection, tipo, registro, removido)
+        return sincronizar
+
+    for tipo, fonte in FONTES_BUSCA.items():
+        event.listen(fonte.modelo, 'after_insert', ouvinte(tipo))
+        event.listen(fonte.modelo, 'after_update', ouvinte(tipo, so_se_mudou=True))
+        event.listen(fonte.modelo, 'after_delete', ouvinte(tipo, removido=True))
+
+
+_registrar_eventos()
@@ -1,4 +1,5 @@
 from config import db
+from repositories.unidade_trabalho import confirmar
 from models.organizacional import Cargo
 
 class CargoRepository:
@@ -30,16 +31,16 @@ class CargoRepository:
     def create(self, cargo: Cargo):
         """Cria um novo cargo"""
         db.session.add(cargo)
-        db.session.commit()
+        confirmar()
         return cargo
     
     def update(self, cargo: Cargo):
         """Atualiza um cargo existente"""
-        db.session.commit()
+        confirmar()
         return cargo
     
     def delete(self, cargo: Cargo):
         """Remove um cargo (soft delete)"""
         cargo.desativar()
-        db.session.commit()
+        confirmar()
         return cargo
\ No newline at end of file
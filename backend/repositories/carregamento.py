@@ -0,0 +1,65 @@
+"""
+Perfis de carregamento de relacionamentos usados pelos repositórios.
+
+Os modelos não definem mais lazy='joined': cada método de repositório
+escolhe o perfil que corresponde ao que o endpoint vai serializar.
+Relacionamentos many-to-one usam joinedload (uma linha por registro),
+coleções usam selectinload (uma consulta extra com IN, sem produto
+cartesiano) e o restante fica em raiseload, para que um acesso não
+previsto falhe no desenvolvimento em vez de virar um N+1 silencioso.
+"""
+
+from sqlalchemy.orm import joinedload, selectinload, raiseload
+
+from models.proposta import Proposta, ItemProposta
+from models.ordemServico import OrdemServico, ItemOrdemServico
+
+
+def _entidade_juridica(caminho):
+    """Entidade jurídica: tipo e regime tributário saem do cache de referências"""
+    return caminho.raiseload('*')
+
+
+def _usuario(caminho):
+    """Usuário: o cargo sai do cache de referências"""
+    return caminho.raiseload('*')
+
+
+def perfil_proposta():
+    """Tudo que Proposta.to_json() serializa, sem seguir os itens até os serviços"""
+    return (
+        joinedload(Proposta.cliente).raiseload('*'),
+        _entidade_juridica(joinedload(Proposta.entidade_juridica)),
+        _usuario(joinedload(Proposta.usuario)),
+        selectinload(Proposta.itens).raiseload('*'),
+        raiseload('*'),
+    )
+
+
+def perfil_proposta_pdf():
+    """Proposta com os serviços de cada item, para o gerador de PDF"""
+    return (
+        joinedload(Proposta.cliente).raiseload('*'),
+        joinedload(Proposta.entidade_juridica).raiseload('*'),
+        selectinload(Proposta.itens).options(
+            joinedload(ItemProposta.servico).raiseload('*'),
+            raiseload('*'),
+        ),
+        raiseload('*'),
+    )
+
+
+def perfil_ordem_servico():
+    """Tudo que OrdemServico.to_json() serializa"""
+    return (
+        joinedload(OrdemServico.cliente).raiseload('*'),
+        _entidade_juridica(joinedload(OrdemServico.empresa)),
+        _usuario(joinedload(OrdemServico.usuario)),
+        # Departamento.to_json() percorre cargos (lazy='dynamic'), que não aceita opções
+        joinedload(OrdemServico.departamento),
+        selectinload(OrdemServico.itens).options(
+            joinedload(ItemOrdemServico.servico).raiseload('*'),
+            raiseload('*'),
+        ),
+        raiseload('*'),
+    )
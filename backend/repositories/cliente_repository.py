@@ -1,11 +1,21 @@
 from config import db
+from repositories.unidade_trabalho import confirmar
 from models.cliente import Cliente
+from repositories.paginacao import paginar_por_chave, iterar_em_lotes, TAMANHO_LOTE
 
 class ClienteRepository:
     """Repositório para gerenciar os Clientes"""
     def get_all(self):
         return Cliente.query.filter_by(ativo=True).all()
 
+    def get_page(self, limit: int = None, after: int = None):
+        """Retorna uma página de clientes ativos a partir do cursor `after`"""
+        return paginar_por_chave(Cliente.query.filter_by(ativo=True), Cliente, limit, after)
+
+    def iter_all(self, tamanho_lote: int = TAMANHO_LOTE):
+        """Itera sobre todos os clientes ativos sem carregar a tabela inteira"""
+        return iterar_em_lotes(Cliente.query.filter_by(ativo=True), Cliente, tamanho_lote)
+
     def get_by_id(self, cliente_id: int):
         return Cliente.query.filter_by(id=cliente_id, ativo=True).first()
     
@@ -17,12 +27,12 @@ class ClienteRepository:
         
     def create(self, cliente: Cliente):
         db.session.add(cliente)
-        db.session.commit()
+        confirmar()
         return cliente
     def update(self, cliente: Cliente):
-        db.session.commit()
+        confirmar()
         return cliente
     def delete(self, cliente: Cliente):
         cliente.desativar()
-        db.session.commit()
+        confirmar()
         return cliente
\ No newline at end of file
@@ -0,0 +1,66 @@
+from datetime import datetime, time
+from sqlalchemy import select, func, delete, or_
+from config import db
+from repositories.unidade_trabalho import confirmar
+from models.agendamento import Agendamento, STATUS_SEM_CONFLITO
+from models.cliente import Cliente
+from models.dashboard import ContadorDashboard, chave_agendamentos_do_dia
+from models.ordemServico import OrdemServico
+from models.proposta import Proposta
+
+
+class DashboardRepository:
+    """Repositório dos contadores do dashboard"""
+
+    def get_contadores(self, dias=()) -> dict:
+        """
+        {chave: valor} dos contadores de status e de clientes e dos
+        agendamentos dos `dias` pedidos. Lê só essas linhas (algumas dezenas),
+        qualquer que seja o tamanho das tabelas contadas.
+        """
+        consulta = select(ContadorDashboard.chave, ContadorDashboard.valor).where(or_(
+            ContadorDashboard.chave.notlike('agendamentos:%'),
+            ContadorDashboard.chave.in_([chave_agendamentos_do_dia(dia) for dia in dias]),
+        ))
+        return dict(db.session.execute(consulta).all())
+
+    def contar_das_tabelas(self, a_partir_de) -> dict:
+        """Contadores calculados das tabelas (agendamentos só a partir do dia `a_partir_de`)"""
+        contadores = {}
+        for modelo, prefixo in ((Proposta, 'propostas'), (OrdemServico, 'ordens')):
+            consulta = select(modelo.status, func.count()).where(modelo.ativo == True).group_by(modelo.status)
+            for status, total in db.session.execute(consulta):
+                contadores[f"{prefixo}:{status}"] = total
+        contadores['clientes:ativos'] = db.session.scalar(
+            select(func.count()).select_from(Cliente).where(Cliente.ativo == True)
+        )
+        # date() existe no SQLite (texto) e no Postgres (date); str() dá 'AAAA-MM-DD' nos dois
+        dia = func.date(Agendamento.data_inicio)
+        consulta = (
+            select(dia, func.count())
+            .where(
+                Agendamento.ativo == True,
+                Agendamento.status.notin_(STATUS_SEM_CONFLITO),
+                Agendamento.data_inicio >= datetime.combine(a_partir_de, time()),
+            )
+            .group_by(dia)
+        )
+        for data, total in db.session.execute(consulta):
+            contadores[f"agendamentos:{data}"] = total
+        return contadores
+
+    def reconciliar(self, a_partir_de) -> dict:
+        """
+        Regrava todos os contadores a partir das tabelas, em uma transação.
+        A limpeza vem primeiro para a regravação já segurar a escrita da
+        tabela; dias de agendamento anteriores a `a_partir_de` são descartados.
+        """
+        db.session.execute(delete(ContadorDashboard))
+        contadores = {chave: valor for chave, valor in self.contar_das_tabelas(a_partir_de).items() if valor}
+        if contadores:
+            db.session.execute(
+                ContadorDashboard.__table__.insert(),
+                [{'chave': chave, 'valor': valor} for chave, valor in contadores.items()],
+            )
+        confirmar()
+        return contadores
@@ -1,4 +1,5 @@
 from config import db
+from repositories.unidade_trabalho import confirmar, desfazer
 from models.organizacional import Departamento
 
 class DepartamentoRepository:
@@ -37,39 +38,39 @@ class DepartamentoRepository:
         """Cria um novo departamento"""
         try:
             db.session.add(departamento)
-            db.session.commit()
+            confirmar()
             return departamento
         except Exception as e:
-            db.session.rollback()
+            desfazer()
             raise e
     
     def update(self, departamento: Departamento):
         """Atualiza um departamento existente"""
         try:
-            db.session.commit()
+            confirmar()
             return departamento
         except Exception as e:
-            db.session.rollback()
+            desfazer()
             raise e
     
     def delete(self, departamento: Departamento):
         """Desativa um departamento (soft delete)"""
         try:
             departamento.desativar()
-            db.session.commit()
+            confirmar()
             return departamento
         except Exception as e:
-            db.session.rollback()
+            desfazer()
             raise e
     
     def hard_delete(self, departamento: Departamento):
         """Remove permanentemente um departamento"""
         try:
             db.session.delete(departamento)
-            db.session.commit()
+            confirmar()
             return True
         except Exception as e:
-            db.session.rollback()
+            desfazer()
             raise e
     
     # Métodos auxiliares
@@ -1,4 +1,5 @@
 from config import db
+from repositories.unidade_trabalho import confirmar
 from models.organizacional import Empresa
 
 class EmpresaRepository:
@@ -21,14 +22,14 @@ class EmpresaRepository:
     # Métodos de CRUD
     def create(self, empresa: Empresa):
         db.session.add(empresa)
-        db.session.commit()
+        confirmar()
         return empresa
 
     def update(self, empresa: Empresa):
-        db.session.commit()
+        confirmar()
         return empresa
     
     def delete(self, empresa: Empresa):
         empresa.desativar()
-        db.session.commit()
+        confirmar()
         return empresa
\ No newline at end of file
@@ -1,4 +1,5 @@
 from config import db
+from repositories.unidade_trabalho import confirmar
 from models.cliente import Endereco
 
 class EnderecoRepository:
@@ -23,12 +24,12 @@ class EnderecoRepository:
 
     def create(self, endereco: Endereco):
         db.session.add(endereco)
-        db.session.commit()
+        confirmar()
         return endereco
     def update(self, endereco: Endereco):
-        db.session.commit()
+        confirmar()
         return endereco
     def delete(self, endereco: Endereco):
         endereco.desativar()
-        db.session.commit()
+        confirmar()
         return endereco
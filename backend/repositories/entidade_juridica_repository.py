@@ -1,4 +1,5 @@
 from config import db
+from repositories.unidade_trabalho import confirmar
 from models.entidadeJuridica import EntidadeJuridica
 
 class EntidadeJuridicaRepository:
@@ -17,12 +18,12 @@ class EntidadeJuridicaRepository:
     
     def create(self, entidade: EntidadeJuridica):
         db.session.add(entidade)
-        db.session.commit()
+        confirmar()
         return entidade
     def update(self, entidade: EntidadeJuridica):
-        db.session.commit()
+        confirmar()
         return entidade
     def delete(self, entidade: EntidadeJuridica):
         entidade.desativar()
-        db.session.commit()
+        confirmar()
         return entidade
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""
+Colunas novas em bancos já existentes: db.create_all() só cria as tabelas
+que faltam, não acrescenta colunas às que já estão lá.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+from config import db
+
+
+def adicionar_colunas(modelo, colunas) -> list:
+    """ALTER TABLE ... ADD COLUMN das `colunas` do modelo que a tabela ainda não tem; retorna as criadas"""
+    tabela = modelo.__table__
+    existentes = {coluna['name'] for coluna in inspect(db.engine).get_columns(tabela.name)}
+    faltantes = [nome for nome in colunas if nome not in existentes]
+    if faltantes:
+        with db.engine.begin() as conexao:
+            for nome in faltantes:
+                definicao = CreateColumn(tabela.c[nome]).compile(dialect=conexao.dialect)
+                conexao.execute(text(f"ALTER TABLE {tabela.name} ADD COLUMN {definicao}"))
+    return faltantes
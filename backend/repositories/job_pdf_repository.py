@@ -0,0 +1,76 @@
+import json
+from datetime import datetime
+from config import db
+from models.jobPdf import JobPDF
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class JobPDFRepository:
+    """Repositório dos jobs de PDF no banco da aplicação (SQLite local por padrão)"""
+
+    def create(self, job_id: str, proposta_id: int):
+        job = JobPDF(id=job_id, proposta_id=proposta_id, status=JobPDF.STATUS_PENDENTE)
+        db.session.add(job)
+        db.session.commit()
+        return job.to_json()
+
+    def update(self, job_id: str, **campos):
+        job = db.session.get(JobPDF, job_id)
+        if not job:
+            return None
+        for key, value in campos.items():
+            setattr(job, key, value)
+        db.session.commit()
+        return job.to_json()
+
+    def get_by_id(self, job_id: str):
+        job = db.session.get(JobPDF, job_id)
+        return job.to_json() if job else None
+
+
+class JobPDFRedisRepository:
+    """Repositório dos jobs de PDF no Redis, para várias instâncias da API compartilharem a fila"""
+
+    PREFIXO = 'pdf_job:'
+    EXPIRACAO_SEGUNDOS = 7 * 24 * 60 * 60
+
+    def __init__(self, url: str):
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis não está disponível. Instale com: pip install redis")
+        self.cliente = redis.Redis.from_url(url, decode_responses=True)
+
+    def _salvar(self, job: dict):
+        self.cliente.set(self.PREFIXO + job['id'], json.dumps(job), ex=self.EXPIRACAO_SEGUNDOS)
+        return job
+
+    def create(self, job_id: str, proposta_id: int):
+        agora = datetime.utcnow().isoformat()
+        return self._salvar({
+            'id': job_id,
+            'proposta_id': proposta_id,
+            'status': JobPDF.STATUS_PENDENTE,
+            'caminho': None,
+            'erro': None,
+            'iniciado_em': None,
+            'concluido_em': None,
+            'created_at': agora,
+            'updated_at': agora,
+        })
+
+    def update(self, job_id: str, **campos):
+        job = self.get_by_id(job_id)
+        if not job:
+            return None
+        for key, value in campos.items():
+            job[key] = value.isoformat() if isinstance(value, datetime) else value
+        job['updated_at'] = datetime.utcnow().isoformat()
+        return self._salvar(job)
+
+    def get_by_id(self, job_id: str):
+        valor = self.cliente.get(self.PREFIXO + job_id)
+        return json.loads(valor) if valor else None
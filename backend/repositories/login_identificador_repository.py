@@ -0,0 +1,42 @@
+from sqlalchemy import select
+from config import db
+from models.organizacional import Usuario
+from models.loginIdentificador import LoginIdentificador, TIPOS_IDENTIFICADOR, chaves_identificador
+
+
+class LoginIdentificadorRepository:
+
+    def buscar_usuario(self, identificador: str):
+        """Usuário ativo por username, email ou CPF, em uma consulta (username > email > CPF)"""
+        # O mesmo texto é procurado como username, como email e como CPF
+        chaves = chaves_identificador({tipo: identificador for tipo in TIPOS_IDENTIFICADOR})
+        if not chaves:
+            return None
+        # No máximo uma linha por tipo. O filtro de ativo fica fora do SQL: com ele o
+        # SQLite prefere o índice pouco seletivo de funcionarios.ativo ao de chave
+        usuarios = (
+            Usuario.query
+            .join(LoginIdentificador, LoginIdentificador.usuario_id == Usuario.id)
+            .filter(LoginIdentificador.chave.in_(list(chaves.values())))
+            .order_by(LoginIdentificador.prioridade)
+            .all()
+        )
+        return next((usuario for usuario in usuarios if usuario.ativo), None)
+
+    def preencher_faltantes(self) -> int:
+        """Cria os identificadores de usuários que ainda não têm (bancos anteriores à tabela)"""
+        com_identificador = select(LoginIdentificador.usuario_id)
+        usuarios = db.session.execute(
+            select(Usuario.id, Usuario.username, Usuario.email, Usuario.cpf)
+            .where(Usuario.id.not_in(com_identificador))
+        ).all()
+
+        linhas = [
+            linha
+            for usuario in usuarios
+            for linha in LoginIdentificador.linhas_do_usuario(*usuario)
+        ]
+        if linhas:
+            db.session.execute(LoginIdentificador.__table__.insert(), linhas)
+            db.session.commit()
+        return len(usuarios)
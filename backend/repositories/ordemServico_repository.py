@@ -1,43 +1,92 @@
+from sqlalchemy import insert, func, select, update
+from sqlalchemy.orm import joinedload
 from config import db
+from repositories.esquema import adicionar_colunas
+from repositories.unidade_trabalho import confirmar
 from models.ordemServico import OrdemServico, ItemOrdemServico
+from models.totais import COLUNAS_TOTAIS, totais_da_ordem
+from repositories.carregamento import perfil_ordem_servico
+from repositories.paginacao import paginar_por_chave, iterar_em_lotes, TAMANHO_LOTE
 
 
 class OrdemServicoRepository:
     """Repositório para gerenciar os Agendamentos"""
+    def _ativas(self):
+        """Consulta base de ordens ativas com o perfil de carregamento do to_json"""
+        return OrdemServico.query.options(*perfil_ordem_servico()).filter_by(ativo=True)
+
     def get_all(self):
-        return OrdemServico.query.filter_by(ativo=True).all()
+        return self._ativas().all()
+
+    def get_page(self, limit: int = None, after: int = None):
+        """Retorna uma página de ordens ativas a partir do cursor `after`"""
+        return paginar_por_chave(self._ativas(), OrdemServico, limit, after)
+
+    def iter_all(self, tamanho_lote: int = TAMANHO_LOTE):
+        """Itera sobre todas as ordens ativas sem carregar a tabela inteira"""
+        return iterar_em_lotes(self._ativas(), OrdemServico, tamanho_lote)
 
     def get_by_id(self, ordem_id: int):
-        return OrdemServico.query.filter_by(ordem_id, ativo=True).first()
+        return self._ativas().filter_by(id=ordem_id).first()
+
+    def get_sem_relacoes(self, ordem_id: int):
+        """Só a linha da ordem, para alterações que não serializam as relações"""
+        return OrdemServico.query.filter_by(id=ordem_id, ativo=True).first()
     
     def get_by_cliente(self, cliente_id: int):
-        return OrdemServico.query.filter_by(cliente_id=cliente_id, ativo=True).all()
+        return self._ativas().filter_by(cliente_id=cliente_id).all()
     
     def get_by_protocolo(self, protocolo: str):
-        return OrdemServico.query.filter_by(protocolo=protocolo, ativo=True).first()
+        return self._ativas().filter_by(protocolo=protocolo).first()
     
     def get_by_empresa(self, empresa_id: int):
-        return OrdemServico.query.filter_by(empresa_id=empresa_id, ativo=True).all()
+        return self._ativas().filter_by(empresa_id=empresa_id).all()
     
     def get_by_departamento(self, departamento_id: int):
-        return OrdemServico.query.filter_by(departamento_id=departamento_id, ativo=True).all()
+        return self._ativas().filter_by(departamento_id=departamento_id).all()
     
     def get_by_usuario(self, usuario_id: int):
-        return OrdemServico.query.filter_by(usuario_id=usuario_id, ativo=True).all()
+        return self._ativas().filter_by(usuario_id=usuario_id).all()
     
     def get_by_status(self, status: str):
-        return OrdemServico.query.filter_by(status=status, ativo=True).all()
+        return self._ativas().filter_by(status=status).all()
     
+    def recalcular_totais(self, ordem_ids=None) -> int:
+        """
+        Refaz as colunas de totais a partir dos itens ativos, em um UPDATE
+        (todas as ordens, sem `ordem_ids`). Para escritas nos itens que não
+        passam pelos eventos do ORM; retorna as ordens alteradas.
+        """
+        itens = select(ItemOrdemServico.ordem_servico_id).where(
+            ItemOrdemServico.ordem_servico_id == OrdemServico.id, ItemOrdemServico.ativo == True
+        )
+        soma = lambda expressao: itens.with_only_columns(func.coalesce(func.sum(expressao), 0.0)).scalar_subquery()
+        comando = update(OrdemServico).values(**totais_da_ordem(
+            soma(ItemOrdemServico.quantidade * ItemOrdemServico.valor_unitario), soma(ItemOrdemServico.valor_total)
+        ))
+        if ordem_ids is not None:
+            comando = comando.where(OrdemServico.id.in_(ordem_ids))
+        alteradas = db.session.execute(comando, execution_options={'synchronize_session': 'fetch'}).rowcount
+        confirmar()
+        return alteradas
+
+    def preparar_totais(self) -> list:
+        """Cria as colunas de totais que faltarem (bancos criados antes delas) e as preenche"""
+        criadas = adicionar_colunas(OrdemServico, COLUNAS_TOTAIS[OrdemServico])
+        if criadas:
+            self.recalcular_totais()
+        return criadas
+
     def create(self, ordem: OrdemServico):
         db.session.add(ordem)
-        db.session.commit()
+        confirmar()
         return ordem
     def update(self, ordem: OrdemServico):
-        db.session.commit()
+        confirmar()
         return ordem
     def delete(self, ordem: OrdemServico):
         ordem.desativar()
-        db.session.commit()
+        confirmar()
         return ordem 
     
 class ItemOrdemServicoRepository:
@@ -50,15 +99,43 @@ class ItemOrdemServicoRepository:
     
     def get_by_ordem(self, ordem_id: int):
         return ItemOrdemServico.query.filter_by(ordem_id=ordem_id, ativo=True).all()
+
+    def get_by_ids(self, ordem_id: int, item_ids):
+        """Itens ativos da ordem com os ids informados, por id"""
+        if not item_ids:
+            return {}
+        itens = ItemOrdemServico.query.filter(
+            ItemOrdemServico.ordem_servico_id == ordem_id, ItemOrdemServico.id.in_(item_ids),
+            ItemOrdemServico.ativo == True
+        )
+        return {item.id: item for item in itens}
+
+    def inserir_em_lote(self, linhas: list):
+        """INSERT de várias linhas em um só comando (sem commit); devolve os itens criados"""
+        if not linhas:
+            return []
+        return db.session.scalars(
+            insert(ItemOrdemServico).returning(ItemOrdemServico), linhas
+        ).all()
+
+    def recarregar(self, item_ids):
+        """Lê de novo (uma consulta, com o serviço) itens expirados pelo commit, na ordem dos ids"""
+        if not item_ids:
+            return []
+        itens = ItemOrdemServico.query.options(joinedload(ItemOrdemServico.servico)).filter(
+            ItemOrdemServico.id.in_(item_ids)
+        )
+        por_id = {item.id: item for item in itens}
+        return [por_id[item_id] for item_id in item_ids]
     
     def create(self, item: ItemOrdemServico):
         db.session.add(item)
-        db.session.commit()
+        confirmar()
         return item
     def update(self, item: ItemOrdemServico):
-        db.session.commit()
+        confirmar()
         return item
     def delete(self, item: ItemOrdemServico):
         item.desativar()
-        db.session.commit()
+        confirmar()
         return item
\ No newline at end of file
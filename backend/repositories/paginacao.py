@@ -0,0 +1,39 @@
+""" Paginação por cursor (keyset) e leitura em lotes para os repositórios """
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+TAMANHO_LOTE = 500
+
+
+def normalizar_limite(limit):
+    """Garante um limite entre 1 e LIMITE_MAXIMO"""
+    if limit is None:
+        return LIMITE_PADRAO
+    if limit < 1:
+        raise ValueError("O parâmetro limit deve ser maior que zero")
+    return min(limit, LIMITE_MAXIMO)
+
+
+def paginar_por_chave(query, modelo, limit=None, after=None):
+    """
+    Retorna uma página ordenada por id, começando logo após o id `after`.
+
+    Busca limit + 1 linhas para saber se existe uma próxima página sem
+    precisar de um COUNT(*). Retorna (registros, proximo_after).
+    """
+    limit = normalizar_limite(limit)
+    if after is not None:
+        query = query.filter(modelo.id > after)
+
+    registros = query.order_by(modelo.id).limit(limit + 1).all()
+
+    proximo_after = None
+    if len(registros) > limit:
+        registros = registros[:limit]
+        proximo_after = registros[-1].id
+    return registros, proximo_after
+
+
+def iterar_em_lotes(query, modelo, tamanho_lote=TAMANHO_LOTE):
+    """Itera sobre todos os registros buscando `tamanho_lote` linhas por vez do cursor"""
+    return query.order_by(modelo.id).yield_per(tamanho_lote)
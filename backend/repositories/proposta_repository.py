@@ -1,51 +1,154 @@
+from sqlalchemy import insert, func, select, update
 from config import db
+from repositories.esquema import adicionar_colunas
+from repositories.unidade_trabalho import confirmar
 from models.proposta import Proposta, ItemProposta
+from models.totais import COLUNAS_TOTAIS, totais_da_proposta
+from repositories.carregamento import perfil_proposta, perfil_proposta_pdf
+from repositories.paginacao import paginar_por_chave, iterar_em_lotes, TAMANHO_LOTE
 
 class PropostaRepository:
     """Repositório para gerenciar os Propostas"""
+    def _ativas(self, perfil=perfil_proposta):
+        """Consulta base de propostas ativas com o perfil de carregamento do endpoint"""
+        return Proposta.query.options(*perfil()).filter_by(ativo=True)
+
     def get_all(self):
-        return Proposta.query.filter_by(ativo=True).all()
+        return self._ativas().all()
+
+    def get_page(self, limit: int = None, after: int = None):
+        """Retorna uma página de propostas ativas a partir do cursor `after`"""
+        return paginar_por_chave(self._ativas(), Proposta, limit, after)
+
+    def iter_all(self, tamanho_lote: int = TAMANHO_LOTE):
+        """Itera sobre todas as propostas ativas sem carregar a tabela inteira"""
+        return iterar_em_lotes(self._ativas(), Proposta, tamanho_lote)
 
     def get_by_id(self, proposta_id: int):
-        return Proposta.query.filter_by(proposta_id, ativo=True).first()
+        return self._ativas().filter_by(id=proposta_id).first()
+
+    def get_sem_relacoes(self, proposta_id: int):
+        """Só a linha da proposta, para alterações que não serializam as relações"""
+        return Proposta.query.filter_by(id=proposta_id, ativo=True).first()
+
+    def get_para_pdf(self, proposta_id: int):
+        """Busca a proposta com os serviços dos itens, usados no PDF"""
+        return self._ativas(perfil_proposta_pdf).filter_by(id=proposta_id).first()
+    
+    def consultar_para_pdf(self, status: str = None, inicio=None, fim=None, cliente_id: int = None):
+        """Consulta (ainda não executada) das propostas de uma exportação de PDFs em lote"""
+        query = self._ativas(perfil_proposta_pdf)
+        if status:
+            query = query.filter(Proposta.status == status)
+        if inicio is not None:
+            query = query.filter(Proposta.created_at >= inicio)
+        if fim is not None:
+            query = query.filter(Proposta.created_at < fim)
+        if cliente_id is not None:
+            query = query.filter(Proposta.cliente_id == cliente_id)
+        return query
     
     def get_by_cliente(self, cliente_id: int):
-        return Proposta.query.filter_by(cliente_id=cliente_id, ativo=True).all()
+        return self._ativas().filter_by(cliente_id=cliente_id).all()
     
     def get_by_empresa(self, empresa_id: int):
-        return Proposta.query.filter_by(empresa_id=empresa_id, ativo=True).all()
+        return self._ativas().filter_by(entidade_juridica_id=empresa_id).all()
     
     def get_by_usuario(self, usuario_id: int):
-        return Proposta.query.filter_by(usuario_id=usuario_id, ativo=True).all()
+        return self._ativas().filter_by(usuario_id=usuario_id).all()
     
     def get_by_status(self, status: str):
-        return Proposta.query.filter_by(status=status, ativo=True).all()
+        return self._ativas().filter_by(status=status).all()
+
+    def get_totais(self, status: str = None, cliente_id: int = None) -> list:
+        """Totais guardados das propostas ativas, lidos só da tabela de propostas (sem itens nem relações)"""
+        consulta = select(
+            Proposta.id, Proposta.numero_proposta, Proposta.status, Proposta.cliente_id,
+            Proposta.porcentagem_desconto, *(getattr(Proposta, coluna) for coluna in COLUNAS_TOTAIS[Proposta]),
+        ).where(Proposta.ativo == True).order_by(Proposta.id)
+        if status:
+            consulta = consulta.where(Proposta.status == status)
+        if cliente_id:
+            consulta = consulta.where(Proposta.cliente_id == cliente_id)
+        return [dict(linha) for linha in db.session.execute(consulta).mappings()]
     
+    def recalcular_totais(self, proposta_ids=None) -> int:
+        """
+        Refaz as colunas de totais a partir dos itens ativos, em um UPDATE
+        (todas as propostas, sem `proposta_ids`). Para escritas nos itens que
+        não passam pelos eventos do ORM; retorna as propostas alteradas.
+        """
+        itens = select(ItemProposta.proposta_id).where(
+            ItemProposta.proposta_id == Proposta.id, ItemProposta.ativo == True
+        )
+        comando = update(Proposta).values(
+            quantidade_itens=itens.with_only_columns(func.coalesce(func.sum(ItemProposta.quantidade), 0)).scalar_subquery(),
+            **totais_da_proposta(
+                itens.with_only_columns(func.coalesce(func.sum(ItemProposta.valor_total), 0.0)).scalar_subquery()
+            ),
+        )
+        if proposta_ids is not None:
+            comando = comando.where(Proposta.id.in_(proposta_ids))
+        alteradas = db.session.execute(comando, execution_options={'synchronize_session': 'fetch'}).rowcount
+        confirmar()
+        return alteradas
+
+    def preparar_totais(self) -> list:
+        """Cria as colunas de totais que faltarem (bancos criados antes delas) e as preenche"""
+        criadas = adicionar_colunas(Proposta, COLUNAS_TOTAIS[Proposta])
+        if criadas:
+            self.recalcular_totais()
+        return criadas
+
     def create(self, proposta: Proposta):
         db.session.add(proposta)
-        db.session.commit()
+        confirmar()
         return proposta
     def update(self, proposta: Proposta):
-        db.session.commit()
+        confirmar()
         return proposta
     def delete(self, proposta: Proposta):
         proposta.desativar()
-        db.session.commit()
+        confirmar()
         return proposta
     
 class ItemPropostaRepository:
     """Repositório para gerenciar os Itens da Proposta"""
     def get_all(self):
         return ItemProposta.query.filter_by(ativo=True).all()
+
+    def get_by_ids(self, proposta_id: int, item_ids):
+        """Itens ativos da proposta com os ids informados, por id"""
+        if not item_ids:
+            return {}
+        itens = ItemProposta.query.filter(
+            ItemProposta.proposta_id == proposta_id, ItemProposta.id.in_(item_ids), ItemProposta.ativo == True
+        )
+        return {item.id: item for item in itens}
+
+    def inserir_em_lote(self, linhas: list):
+        """INSERT de várias linhas em um só comando (sem commit); devolve os itens criados"""
+        if not linhas:
+            return []
+        return db.session.scalars(
+            insert(ItemProposta).returning(ItemProposta), linhas
+        ).all()
+
+    def recarregar(self, item_ids):
+        """Lê de novo (uma consulta) itens expirados pelo commit, na ordem dos ids"""
+        if not item_ids:
+            return []
+        por_id = {item.id: item for item in ItemProposta.query.filter(ItemProposta.id.in_(item_ids))}
+        return [por_id[item_id] for item_id in item_ids]
     
     def create(self, item: ItemProposta):
         db.session.add(item)
-        db.session.commit()
+        confirmar()
         return item
     def update(self, item: ItemProposta):
-        db.session.commit()
+        confirmar()
         return item
     def delete(self, item: ItemProposta):
         item.desativar()
-        db.session.commit()
+        confirmar()
         return item
\ No newline at end of file
@@ -1,4 +1,5 @@
 from config import db
+from repositories.unidade_trabalho import confirmar
 from models.entidadeJuridica import RegimeTributario
 
 class RegimeTributarioRepository:
@@ -26,16 +27,16 @@ class RegimeTributarioRepository:
     def create(self, regime: RegimeTributario):
         """Cria um novo regime tributário"""
         db.session.add(regime)
-        db.session.commit()
+        confirmar()
         return regime
     
     def update(self, regime: RegimeTributario):
         """Atualiza um regime tributário existente"""
-        db.session.commit()
+        confirmar()
         return regime
     
     def delete(self, regime: RegimeTributario):
         """Remove um regime tributário (soft delete)"""
         regime.desativar()
-        db.session.commit()
+        confirmar()
         return regime
\ No newline at end of file
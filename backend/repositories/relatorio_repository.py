@@ -1,5 +1,13 @@
+from sqlalchemy import select, func, literal, null, cast, desc, union_all, String, Float
 from config import db
+from repositories.unidade_trabalho import confirmar
 from models.relatorio import Relatorio
+from models.proposta import Proposta, ItemProposta
+from models.ordemServico import OrdemServico, ItemOrdemServico
+from models.cliente import Cliente
+from models.servico import Servico
+from models.agendamento import Agendamento
+from models.organizacional import Usuario, Departamento
 
 class RelatorioRepository:
     """Repositório para gerenciar os Relatórios"""
@@ -7,19 +15,192 @@ class RelatorioRepository:
         return Relatorio.query.filter_by(ativo=True).all()
 
     def get_by_id(self, relatorio_id: int):
-        return Relatorio.query.filter_by(relatorio_id, ativo=True).first()
+        return Relatorio.query.filter_by(id=relatorio_id, ativo=True).first()
     
     def get_by_funcionario(self, funcionario_id: int):
         return Relatorio.query.filter_by(funcionario_id=funcionario_id, ativo=True).first()
     
     def create(self, relatorio: Relatorio):
         db.session.add(relatorio)
-        db.session.commit()
+        confirmar()
         return relatorio
     def update(self, relatorio: Relatorio):
-        db.session.commit()
+        confirmar()
         return relatorio
     def delete(self, relatorio: Relatorio):
         relatorio.desativar()
-        db.session.commit()
-        return relatorio
\ No newline at end of file
+        confirmar()
+        return relatorio
+
+
+class RelatorioAgregacaoRepository:
+    """
+    Consultas agregadas dos relatórios.
+
+    Cada relatório é um conjunto de "dimensões" (total, status, mês,
+    cliente...) calculadas com GROUP BY e unidas com UNION ALL, de modo que
+    o relatório inteiro sai do banco em uma única consulta, só com linhas
+    (dimensao, chave, rotulo, quantidade, valor) e sem objetos ORM.
+    """
+
+    FONTES = ('propostas', 'itens_propostas', 'ordens_servico', 'itens_ordens_servico', 'clientes', 'agendamentos')
+
+    def _mes(self, coluna):
+        """Expressão 'AAAA-MM' da coluna, conforme o banco em uso"""
+        dialeto = db.session.get_bind().dialect.name
+        if dialeto == 'postgresql':
+            return func.to_char(coluna, 'YYYY-MM')
+        if dialeto in ('mysql', 'mariadb'):
+            return func.date_format(coluna, '%Y-%m')
+        return func.strftime('%Y-%m', coluna)
+
+    def _fonte(self, fonte: str):
+        """
+        Descrição de uma fonte: tabela de origem, joins obrigatórios, filtros
+        fixos, coluna de data do período, coluna de status, medidas e as
+        dimensões disponíveis como (chave, rótulo, joins extras).
+        """
+        if fonte == 'propostas':
+            return {
+                'origem': Proposta, 'joins': (), 'filtros': (Proposta.ativo == True,),
+                'data': Proposta.created_at, 'status': Proposta.status,
+                'quantidade': func.count(Proposta.id), 'valor': func.sum(Proposta.valor_total),
+                'dimensoes': {
+                    'status': (Proposta.status, Proposta.status, ()),
+                    'mes': (self._mes(Proposta.created_at),) * 2 + ((),),
+                    'cliente': (Proposta.cliente_id, Cliente.nome, ((Cliente, Proposta.cliente_id == Cliente.id),)),
+                    'usuario': (Proposta.usuario_id, Usuario.nome, ((Usuario, Proposta.usuario_id == Usuario.id),)),
+                },
+            }
+        if fonte == 'itens_propostas':
+            return {
+                'origem': ItemProposta, 'joins': ((Proposta, ItemProposta.proposta_id == Proposta.id),),
+                'filtros': (ItemProposta.ativo == True, Proposta.ativo == True),
+                'data': Proposta.created_at, 'status': Proposta.status,
+                'quantidade': func.sum(ItemProposta.quantidade), 'valor': func.sum(ItemProposta.valor_total),
+                'dimensoes': {
+                    'servico': (ItemProposta.servico_id, Servico.nome, ((Servico, ItemProposta.servico_id == Servico.id),)),
+                    'status': (Proposta.status, Proposta.status, ()),
+                    'mes': (self._mes(Proposta.created_at),) * 2 + ((),),
+                },
+            }
+        if fonte == 'ordens_servico':
+            return {
+                'origem': OrdemServico, 'joins': (), 'filtros': (OrdemServico.ativo == True,),
+                'data': OrdemServico.data_abertura, 'status': OrdemServico.status,
+                'quantidade': func.count(OrdemServico.id), 'valor': func.sum(OrdemServico.valor_total_os),
+                'dimensoes': {
+                    'status': (OrdemServico.status, OrdemServico.status, ()),
+                    'mes': (self._mes(OrdemServico.data_abertura),) * 2 + ((),),
+                    'cliente': (OrdemServico.cliente_id, Cliente.nome, ((Cliente, OrdemServico.cliente_id == Cliente.id),)),
+                    'departamento': (OrdemServico.departamento_id, Departamento.nome,
+                                     ((Departamento, OrdemServico.departamento_id == Departamento.id),)),
+                },
+            }
+        if fonte == 'itens_ordens_servico':
+            return {
+                'origem': ItemOrdemServico, 'joins': ((OrdemServico, ItemOrdemServico.ordem_servico_id == OrdemServico.id),),
+                'filtros': (ItemOrdemServico.ativo == True, OrdemServico.ativo == True),
+                'data': OrdemServico.data_abertura, 'status': OrdemServico.status,
+                'quantidade': func.sum(ItemOrdemServico.quantidade), 'valor': func.sum(ItemOrdemServico.valor_total),
+                'dimensoes': {
+                    'servico': (ItemOrdemServico.servico_id, Servico.nome,
+                                ((Servico, ItemOrdemServico.servico_id == Servico.id),)),
+                    'status': (OrdemServico.status, OrdemServico.status, ()),
+                    'mes': (self._mes(OrdemServico.data_abertura),) * 2 + ((),),
+                },
+            }
+        if fonte == 'clientes':
+            return {
+                'origem': Cliente, 'joins': (), 'filtros': (Cliente.ativo == True,),
+                'data': Cliente.created_at, 'status': None,
+                'quantidade': func.count(Cliente.id), 'valor': literal(0.0),
+                'dimensoes': {
+                    'mes': (self._mes(Cliente.created_at),) * 2 + ((),),
+                },
+            }
+        if fonte == 'agendamentos':
+            return {
+                'origem': Agendamento, 'joins': (), 'filtros': (Agendamento.ativo == True,),
+                'data': Agendamento.data_inicio, 'status': Agendamento.status,
+                'quantidade': func.count(Agendamento.id), 'valor': literal(0.0),
+                'dimensoes': {
+                    'status': (Agendamento.status, Agendamento.status, ()),
+                    'tipo': (Agendamento.tipo, Agendamento.tipo, ()),
+                    'mes': (self._mes(Agendamento.data_inicio),) * 2 + ((),),
+                    'funcionario': (Agendamento.funcionario_id, Usuario.nome,
+                                    ((Usuario, Agendamento.funcionario_id == Usuario.id),)),
+                },
+            }
+        raise ValueError(f"Fonte de relatório inválida: {fonte}. Use uma de: {', '.join(self.FONTES)}")
+
+    def dimensoes_disponiveis(self, fonte: str):
+        return ('total',) + tuple(self._fonte(fonte)['dimensoes'])
+
+    def _consulta(self, nome, spec, dimensao, inicio, fim, status, limite):
+        """SELECT agregado de uma dimensão, já com os filtros aplicados"""
+        if dimensao == 'total':
+            chave = rotulo = null()
+            joins = ()
+        else:
+            chave, rotulo, joins = spec['dimensoes'][dimensao]
+
+        consulta = select(
+            literal(nome).label('dimensao'),
+            cast(chave, String).label('chave'),
+            cast(rotulo, String).label('rotulo'),
+            func.coalesce(spec['quantidade'], 0).label('quantidade'),
+            cast(func.coalesce(spec['valor'], 0), Float).label('valor'),
+        ).select_from(spec['origem'])
+
+        for alvo, condicao in spec['joins']:
+            consulta = consulta.join(alvo, condicao)
+        for alvo, condicao in joins:
+            consulta = consulta.outerjoin(alvo, condicao)
+
+        consulta = consulta.where(*spec['filtros'])
+        if inicio is not None:
+            consulta = consulta.where(spec['data'] >= inicio)
+        if fim is not None:
+            consulta = consulta.where(spec['data'] < fim)
+        if status is not None and spec['status'] is not None:
+            consulta = consulta.where(spec['status'] == status)
+
+        if dimensao != 'total':
+            consulta = consulta.group_by(chave, rotulo)
+            if limite and dimensao != 'mes':
+                # Top N por valor; envolvido em subconsulta porque o SQLite não aceita
+                # ORDER BY/LIMIT dentro de uma parte de UNION ALL
+                consulta = select(consulta.order_by(desc('valor'), desc('quantidade')).limit(limite).subquery())
+        return consulta
+
+    def agregar(self, dimensoes, inicio=None, fim=None, status=None, limite=None):
+        """
+        Executa várias agregações em uma única ida ao banco.
+
+        `dimensoes` é uma lista de (nome_no_resultado, fonte, dimensao).
+        Retorna {nome_no_resultado: [{'chave', 'rotulo', 'quantidade', 'valor'}]}.
+        """
+        consultas = []
+        resultado = {}
+        for nome, fonte, dimensao in dimensoes:
+            spec = self._fonte(fonte)
+            if dimensao != 'total' and dimensao not in spec['dimensoes']:
+                raise ValueError(
+                    f"Agrupamento inválido para {fonte}: {dimensao}. "
+                    f"Use um de: {', '.join(self.dimensoes_disponiveis(fonte))}"
+                )
+            consultas.append(self._consulta(nome, spec, dimensao, inicio, fim, status, limite))
+            resultado[nome] = []
+
+        if not consultas:
+            return resultado
+
+        for linha in db.session.execute(union_all(*consultas)):
+            resultado[linha.dimensao].append({
+                'chave': linha.chave,
+                'rotulo': linha.rotulo,
+                'quantidade': linha.quantidade,
+                'valor': linha.valor,
+            })
+        return resultado
@@ -1,4 +1,5 @@
 from config import db
+from repositories.unidade_trabalho import confirmar
 from models.servico import CategoriaServico, Servico
 
 class CategoriaServicoRepository:
@@ -18,14 +19,14 @@ class CategoriaServicoRepository:
     
     def create(self, categoria: CategoriaServico):
         db.session.add(categoria)
-        db.session.commit()
+        confirmar()
         return categoria
     def update(self, categoria: CategoriaServico):
-        db.session.commit()
+        confirmar()
         return categoria
     def delete(self, categoria: CategoriaServico):
         categoria.desativar()
-        db.session.commit()
+        confirmar()
         return categoria
     
 class ServicoRepository:
@@ -41,15 +42,20 @@ class ServicoRepository:
         return Servico.query.filter_by(codigo=codigo, ativo=True).first()
     def get_by_nome(self, nome: str):
         return Servico.query.filter_by(nome=nome, ativo=True).first()
+    def get_by_ids(self, servico_ids):
+        """Serviços ativos dos ids informados, por id, em uma consulta"""
+        if not servico_ids:
+            return {}
+        return {servico.id: servico for servico in Servico.query.filter(Servico.id.in_(servico_ids), Servico.ativo == True)}
     
     def create(self, servico:Servico):
         db.session.add(servico)
-        db.session.commit()
+        confirmar()
         return servico    
     def update(self, servico: Servico):
-        db.session.commit()
+        confirmar()
         return servico
     def delete(self, servico: Servico):
         servico.desativar()
-        db.session.commit()
+        confirmar()
         return servico
\ No newline at end of file
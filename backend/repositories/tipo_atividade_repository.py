@@ -1,4 +1,5 @@
 from config import db
+from repositories.unidade_trabalho import confirmar
 from models.tipoAtividade import TipoAtividade
 
 class TipoAtividadeRepository:
@@ -30,16 +31,16 @@ class TipoAtividadeRepository:
     def create(self, tipo: TipoAtividade):
         """Cria um novo tipo de atividade"""
         db.session.add(tipo)
-        db.session.commit()
+        confirmar()
         return tipo
     
     def update(self, tipo: TipoAtividade):
         """Atualiza um tipo de atividade existente"""
-        db.session.commit()
+        confirmar()
         return tipo
     
     def delete(self, tipo: TipoAtividade):
         """Remove um tipo de atividade (soft delete)"""
         tipo.desativar()
-        db.session.commit()
+        confirmar()
         return tipo
\ No newline at end of file
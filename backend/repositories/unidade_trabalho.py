@@ -0,0 +1,63 @@
+"""
+Unidade de trabalho: várias chamadas de repositório em uma só transação.
+
+Os repositórios gravam com confirmar() em vez de db.session.commit(). Fora
+de um escopo transacao() isso continua sendo um commit por chamada; dentro
+dele vira só um flush (os ids gerados ficam disponíveis para as próximas
+chamadas) e o commit acontece uma vez, ao sair do escopo mais externo. Um
+erro que atravesse o escopo desfaz a transação inteira.
+
+    with transacao():
+        cliente = clientes.create(Cliente(...))
+        enderecos.create(Endereco(cliente_id=cliente.id, ...))
+
+Os escopos podem ser aninhados (um service transacional chamando outro) e
+transacao() também funciona como decorator.
+"""
+
+from contextlib import contextmanager
+
+from config import db
+
+CHAVE_PROFUNDIDADE = 'unidade_trabalho_profundidade'
+
+
+def em_transacao() -> bool:
+    """Se a sessão atual está dentro de um escopo transacao()"""
+    return db.session.info.get(CHAVE_PROFUNDIDADE, 0) > 0
+
+
+def confirmar():
+    """Commit da sessão, ou só flush dentro de um escopo transacao()"""
+    if em_transacao():
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+def desfazer():
+    """Rollback da sessão; dentro de um escopo fica a cargo do escopo mais externo"""
+    if not em_transacao():
+        db.session.rollback()
+
+
+@contextmanager
+def transacao():
+    """Escopo de unidade de trabalho: um commit no fim, rollback se sair por exceção"""
+    info = db.session.info
+    externo = info.get(CHAVE_PROFUNDIDADE, 0) == 0
+    info[CHAVE_PROFUNDIDADE] = info.get(CHAVE_PROFUNDIDADE, 0) + 1
+    try:
+        yield
+    except BaseException:
+        info[CHAVE_PROFUNDIDADE] -= 1
+        if externo:
+            db.session.rollback()
+        raise
+    info[CHAVE_PROFUNDIDADE] -= 1
+    if externo:
+        try:
+            db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            raise
@@ -1,4 +1,5 @@
 from config import db
+from repositories.unidade_trabalho import confirmar
 from models.organizacional import Usuario
 from datetime import datetime, timedelta
 
@@ -18,27 +19,26 @@ class UsuarioRepository:
         ).all()
     
     def criar_usuario(self, usuario: Usuario):
-        usuario = Usuario(usuario)
         db.session.add(usuario)
-        db.session.commit()
+        confirmar()
     def atualizar_usuario(self, usuario: Usuario):
-        db.session.commit()
+        confirmar()
         return usuario
     
     def deletar_usuario(self, usuario: Usuario):
         usuario.ativo = False
-        db.session.commit()
+        confirmar()
         return usuario
     
     def bloquear_usuario(self, usuario: Usuario, dias: int):
         usuario.bloqueado_ate = datetime.utcnow() + timedelta(days=dias)
         usuario.tentativas_login = 0
-        db.session.commit()
+        confirmar()
         return usuario
     
     def desbloquear_usuario(self, usuario: Usuario):
         usuario.bloqueado_ate = None
-        db.session.commit()
+        confirmar()
     
     def verificar_usuario_existe(self, cpf: str, exclude_id: int = None):
         query = Usuario.query.filter_by(cpf=cpf, ativo=True)
@@ -0,0 +1,111 @@
+"""
+Roteamento de leituras para réplicas.
+
+Com réplicas configuradas (DATABASE_REPLICA_URLS, separadas por vírgula),
+a sessão envia as consultas de requisições GET/HEAD para uma réplica e todo
+o resto para o banco principal:
+
+- escritas (flush, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE) sempre vão
+  para o principal;
+- depois da primeira escrita a sessão fica presa ao principal até o fim da
+  requisição, então ela lê o que acabou de gravar;
+- quem fez commit continua lendo do principal por REPLICA_JANELA_ESCRITA
+  segundos, tempo para a réplica alcançar (um POST seguido de GET do mesmo
+  usuário não recebe dado antigo);
+- scripts, workers e código fora de requisição usam só o principal.
+
+Cada sessão escolhe uma réplica na primeira leitura e fica com ela, para que
+as consultas de uma mesma resposta vejam o mesmo estado.
+"""
+
+import os
+import random
+import threading
+import time
+
+from flask import current_app, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_JANELA_ESCRITA = float(os.environ.get('REPLICA_JANELA_ESCRITA', 5))
+METODOS_LEITURA = ('GET', 'HEAD')
+
+# Chave em app.config com as bind keys das réplicas
+CONFIG_REPLICAS = 'BANCO_REPLICAS'
+CHAVE_ESCREVEU = 'roteamento_escreveu'
+CHAVE_REPLICA = 'roteamento_replica'
+
+# usuario_id -> instante (monotonic) até o qual as leituras dele vão para o principal
+_escritas_recentes = {}
+_lock = threading.Lock()
+_MAX_ESCRITAS_RECENTES = 10_000
+
+
+def binds_replicas(urls, opcoes) -> dict:
+    """SQLALCHEMY_BINDS das réplicas ('replica_1', 'replica_2'...); `opcoes(url)` dá as opções da engine"""
+    return {f'replica_{posicao}': {'url': url, **opcoes(url)} for posicao, url in enumerate(urls, start=1)}
+
+
+def _usuario_atual_id():
+    principal = getattr(request, 'usuario_atual', None)
+    return principal['user'].get('id') if principal else None
+
+
+def _registrar_escrita(usuario_id):
+    agora = time.monotonic()
+    with _lock:
+        if len(_escritas_recentes) >= _MAX_ESCRITAS_RECENTES:
+            for chave in [c for c, ate in _escritas_recentes.items() if ate <= agora]:
+                del _escritas_recentes[chave]
+        _escritas_recentes[usuario_id] = agora + REPLICA_JANELA_ESCRITA
+
+
+def _escreveu_recentemente(usuario_id) -> bool:
+    return _escritas_recentes.get(usuario_id, 0) > time.monotonic()
+
+
+def _eh_escrita(clause) -> bool:
+    return clause is not None and (
+        getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None
+    )
+
+
+class SessaoRoteada(Session):
+    """Sessão do Flask-SQLAlchemy que lê das réplicas quando é seguro"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if getattr(clause, 'is_dml', False):
+            # insert()/update()/delete() em massa pela sessão: não passam pelo flush
+            self.info[CHAVE_ESCREVEU] = True
+        if bind is None and not self._flushing and not _eh_escrita(clause):
+            replica = self._replica_para_leitura()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica_para_leitura(self):
+        if not has_request_context() or request.method not in METODOS_LEITURA:
+            return None
+        replicas = current_app.config.get(CONFIG_REPLICAS)
+        if not replicas or self.info.get(CHAVE_ESCREVEU):
+            return None
+        usuario_id = _usuario_atual_id()
+        if usuario_id is not None and _escreveu_recentemente(usuario_id):
+            return None
+        if CHAVE_REPLICA not in self.info:
+            self.info[CHAVE_REPLICA] = random.choice(replicas)
+        return self._db.engines[self.info[CHAVE_REPLICA]]
+
+
+@event.listens_for(SessaoRoteada, 'after_flush')
+def _marcar_escrita(session, flush_context):
+    session.info[CHAVE_ESCREVEU] = True
+
+
+@event.listens_for(SessaoRoteada, 'after_commit')
+def _fixar_usuario_no_principal(session):
+    if not session.info.get(CHAVE_ESCREVEU) or not has_request_context():
+        return
+    usuario_id = _usuario_atual_id()
+    if usuario_id is not None:
+        _registrar_escrita(usuario_id)
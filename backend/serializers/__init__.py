@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Serializadores compilados para as listagens da API
+Os schemas de todos os modelos são registrados ao importar o pacote
+"""
+
+from .registro import Schema, Relacao, registrar, obter_serializador, ler_campos, ler_expansoes
+from .json_rapido import ORJSON_AVAILABLE, dumps, resposta_json
+from . import schemas
+
+__all__ = [
+    'Schema',
+    'Relacao',
+    'registrar',
+    'obter_serializador',
+    'ler_campos',
+    'ler_expansoes',
+    'ORJSON_AVAILABLE',
+    'dumps',
+    'resposta_json',
+]
@@ -0,0 +1,34 @@
+""" Encoder JSON das respostas serializadas, usando orjson quando instalado """
+
+import json
+from datetime import date, datetime
+from flask import Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _padrao(valor):
+    """Converte o que o json da biblioteca padrão não conhece (datas como isoformat())"""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return str(valor)
+
+
+if ORJSON_AVAILABLE:
+    def dumps(dados) -> bytes:
+        # orjson já emite datetime sem fuso no mesmo formato de isoformat()
+        return orjson.dumps(dados, default=_padrao)
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_padrao)
+
+    def dumps(dados) -> bytes:
+        return _encoder.encode(dados).encode('utf-8')
+
+
+def resposta_json(dados, status=200):
+    """Equivalente a jsonify() para dados vindos dos serializadores compilados"""
+    return Response(dumps(dados), status=status, mimetype='application/json')
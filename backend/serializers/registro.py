@@ -0,0 +1,212 @@
+"""
+Registro declarativo de schemas e compilação de serializadores.
+
+Cada modelo declara uma vez quais campos, datas, campos calculados e
+relações o seu JSON possui (ver serializers/schemas.py). Para cada
+combinação de campos/expansões pedida é gerada — e guardada em cache —
+uma função Python "plana", sem laços nem verificações por campo, que
+lê as colunas direto do __dict__ da instância e devolve o dicionário do
+registro. As datas são entregues como datetime e
+convertidas pelo encoder JSON (serializers/json_rapido.py), evitando um
+isoformat() por campo por linha.
+
+Relações com dados de referência (tipo da empresa, regime, cargo...) não
+passam pelo ORM: o JSON vem de models/referencias.py pela chave estrangeira.
+"""
+
+from functools import lru_cache, partial
+
+from models.referencias import cache_referencias
+
+
+class Relacao:
+    """ Relação serializável de um schema """
+
+    def __init__(self, schema: str, lista: bool = False, somente_ativos: bool = False, padrao: bool = True,
+                 referencia: str = None, chave: str = None):
+        self.schema = schema
+        self.lista = lista
+        # Em listas filtra os itens inativos; em relações simples devolve None se inativo
+        self.somente_ativos = somente_ativos
+        # Se a relação é expandida quando o cliente não informa ?expand=
+        self.padrao = padrao
+        # Tipo em models/referencias.py e coluna com o id: o JSON sai do cache, sem consulta
+        self.referencia = referencia
+        self.chave = chave
+
+
+class Schema:
+    """ Descrição declarativa do JSON de um modelo """
+
+    def __init__(self, nome: str, campos=(), datas=(), calculados=None, relacoes=None):
+        self.nome = nome
+        self.campos = tuple(campos)
+        self.datas = tuple(datas)
+        self.calculados = dict(calculados or {})
+        self.relacoes = dict(relacoes or {})
+
+    @property
+    def nomes(self):
+        """Todos os nomes de campo aceitos, na ordem de saída"""
+        return self.campos + self.datas + tuple(self.calculados) + tuple(self.relacoes)
+
+
+SCHEMAS = {}
+
+
+def registrar(schema: Schema):
+    """Registra (ou substitui) o schema de um modelo"""
+    SCHEMAS[schema.nome] = schema
+    _compilar.cache_clear()
+    return schema
+
+
+def obter_schema(nome: str) -> Schema:
+    try:
+        return SCHEMAS[nome]
+    except KeyError:
+        raise KeyError(f"Schema não registrado: {nome}")
+
+
+# ======================================================
+# Parâmetros ?fields= e ?expand=
+# ======================================================
+
+def ler_campos(valor):
+    """'id,nome' -> ('id', 'nome'); None/ausente -> None (todos os campos)"""
+    if valor is None:
+        return None
+    return tuple(sorted({campo.strip() for campo in valor.split(',') if campo.strip()}))
+
+
+def ler_expansoes(valor):
+    """
+    'cliente,entidade_juridica.tipo' -> árvore congelada de expansões.
+
+    Cada nó é uma tupla de pares (relação, subárvore); subárvore None
+    significa "usar as expansões padrão do schema aninhado". Ausente
+    (None) mantém as expansões padrão; vazio ('') não expande nada.
+    """
+    if valor is None:
+        return None
+
+    arvore = {}
+    for caminho in valor.split(','):
+        partes = [parte.strip() for parte in caminho.split('.') if parte.strip()]
+        no = arvore
+        for i, parte in enumerate(partes):
+            ultimo = i == len(partes) - 1
+            if parte not in no or (no[parte] is None and not ultimo):
+                no[parte] = None if ultimo else {}
+            if not ultimo:
+                no = no[parte]
+    return _congelar(arvore)
+
+
+def _congelar(arvore):
+    if arvore is None:
+        return None
+    return tuple(sorted((nome, _congelar(sub)) for nome, sub in arvore.items()))
+
+
+# ======================================================
+# Compilação
+# ======================================================
+
+def obter_serializador(nome: str, campos=None, expand=None):
+    """
+    Devolve a função compilada para o schema `nome`.
+
+    `campos` e `expand` são os valores já lidos por ler_campos/ler_expansoes.
+    Levanta ValueError para campos ou relações desconhecidos.
+    """
+    return _compilar(nome, campos, expand)
+
+
+@lru_cache(maxsize=256)
+def _compilar(nome, campos, expand):
+    schema = obter_schema(nome)
+
+    if campos is not None:
+        desconhecidos = [campo for campo in campos if campo not in schema.nomes]
+        if desconhecidos:
+            raise ValueError(f"Campo(s) inválido(s) para {nome}: {', '.join(desconhecidos)}")
+
+    expansoes = dict(expand) if expand is not None else None
+    if expansoes:
+        desconhecidas = [rel for rel in expansoes if rel not in schema.relacoes]
+        if desconhecidas:
+            raise ValueError(f"Relação(ões) inválida(s) para {nome}: {', '.join(desconhecidas)}")
+
+    def incluir(campo):
+        return campos is None or campo in campos
+
+    ambiente = {}
+    colunas = [campo for campo in schema.campos + schema.datas if incluir(campo)]
+    calculados = []
+    relacoes = []
+
+    for campo, funcao in schema.calculados.items():
+        if incluir(campo):
+            ambiente[f'_calc_{campo}'] = funcao
+            calculados.append(f"{campo!r}: _calc_{campo}(obj),")
+
+    for campo, relacao in schema.relacoes.items():
+        if expansoes is None:
+            expandir = relacao.padrao if campos is None else campo in campos
+            subarvore = None
+        else:
+            expandir = campo in expansoes
+            subarvore = expansoes.get(campo)
+        if expandir and relacao.referencia:
+            ambiente[f'_rel_{campo}'] = partial(cache_referencias.json_por_id, relacao.referencia)
+            relacoes.append((campo, relacao))
+        elif expandir:
+            ambiente[f'_rel_{campo}'] = _compilar(relacao.schema, None, subarvore)
+            relacoes.append((campo, relacao))
+
+    fonte = (
+        "def serializar(obj):\n"
+        "    d = obj.__dict__\n"
+        "    try:\n"
+        + _corpo(colunas, calculados, relacoes, "d[{!r}]", recuo=8) +
+        "    except KeyError:\n"
+        "        # atributo expirado ou ainda não carregado: deixa o ORM buscar\n"
+        + _corpo(colunas, calculados, relacoes, "obj.{}", recuo=8)
+    )
+
+    exec(compile(fonte, f"<serializador {nome}>", "exec"), ambiente)
+    serializar = ambiente['serializar']
+    serializar.fonte = fonte
+    return serializar
+
+
+def _corpo(colunas, calculados, relacoes, acesso, recuo):
+    """
+    Gera o `return {...}` do serializador.
+
+    As colunas são lidas com `acesso` (direto do __dict__ da instância no
+    caminho rápido, pelo atributo no caminho de fallback); relações sempre
+    passam pelo atributo, já que coleções dinâmicas nunca ficam no __dict__.
+    """
+    espaco = ' ' * recuo
+    linhas = [f"{campo!r}: {acesso.format(campo)}," for campo in colunas] + list(calculados)
+    atribuicoes = []
+
+    for campo, relacao in relacoes:
+        if relacao.referencia:
+            linhas.append(f"{campo!r}: _rel_{campo}({acesso.format(relacao.chave)}),")
+        elif relacao.lista:
+            filtro = " if x.ativo" if relacao.somente_ativos else ""
+            linhas.append(f"{campo!r}: [_rel_{campo}(x) for x in obj.{campo}{filtro}],")
+        else:
+            condicao = f"v_{campo} is not None" + (f" and v_{campo}.ativo" if relacao.somente_ativos else "")
+            atribuicoes.append(f"{espaco}v_{campo} = obj.{campo}\n")
+            linhas.append(f"{campo!r}: _rel_{campo}(v_{campo}) if {condicao} else None,")
+
+    return (
+        "".join(atribuicoes)
+        + f"{espaco}return {{\n"
+        + "".join(f"{espaco}    {linha}\n" for linha in linhas)
+        + f"{espaco}}}\n"
+    )
@@ -0,0 +1,136 @@
+"""
+Schemas dos modelos expostos nas listagens.
+
+A saída padrão (sem ?fields= nem ?expand=) é idêntica à do to_json() de
+cada modelo; ao alterar um to_json(), altere também o schema aqui.
+"""
+
+from operator import attrgetter
+
+from serializers.registro import Schema, Relacao, registrar
+from models.cliente import Cliente
+from models.agendamento import SerieAgendamento
+
+TIMESTAMPS = ('created_at', 'updated_at')
+TIMESTAMPS_SOFT_DELETE = TIMESTAMPS + ('deleted_at',)
+
+
+registrar(Schema(
+    'Cliente',
+    campos=('id', 'nome', 'cpf', 'email', 'telefone', 'endereco', 'observacoes', 'ativo'),
+    datas=TIMESTAMPS_SOFT_DELETE,
+    calculados={'cpf_formatado': Cliente.formatar_cpf},
+))
+
+registrar(Schema(
+    'TipoEmpresa',
+    campos=('id', 'nome', 'descricao', 'ativo'),
+    datas=TIMESTAMPS,
+))
+
+registrar(Schema(
+    'RegimeTributario',
+    campos=('id', 'nome', 'descricao', 'ativo'),
+    datas=TIMESTAMPS,
+))
+
+registrar(Schema(
+    'EntidadeJuridica',
+    campos=('id', 'nome_fantasia', 'razao_social', 'cnpj', 'contato', 'status', 'inscricao_estadual',
+            'cliente_id', 'endereco_id', 'tipo_id', 'regime_tributario_id', 'ativo'),
+    datas=TIMESTAMPS_SOFT_DELETE,
+    relacoes={
+        'tipo': Relacao('TipoEmpresa', referencia='tipos_empresa', chave='tipo_id'),
+        'regime_tributario': Relacao('RegimeTributario', referencia='regimes_tributarios', chave='regime_tributario_id'),
+    },
+))
+
+registrar(Schema(
+    'Cargo',
+    campos=('id', 'nome', 'descricao', 'tipo', 'departamento_id', 'ativo'),
+    datas=TIMESTAMPS_SOFT_DELETE,
+))
+
+registrar(Schema(
+    'Departamento',
+    campos=('id', 'nome', 'descricao', 'status', 'empresa_id', 'ativo'),
+    datas=TIMESTAMPS_SOFT_DELETE,
+    relacoes={'cargos': Relacao('Cargo', lista=True, somente_ativos=True)},
+))
+
+registrar(Schema(
+    'Usuario',
+    campos=('id', 'nome', 'cpf', 'email', 'username', 'tipo_usuario', 'foto', 'eh_gerente', 'status',
+            'cargo_id', 'tentativas_login', 'ativo'),
+    datas=('ultimo_login', 'bloqueado_ate') + TIMESTAMPS_SOFT_DELETE,
+    relacoes={'cargo': Relacao('Cargo', referencia='cargos', chave='cargo_id')},
+))
+
+registrar(Schema(
+    'Servico',
+    campos=('id', 'codigo', 'nome', 'descricao', 'valor_unitario', 'regras_cobranca', 'categoria_id', 'ativo'),
+    datas=TIMESTAMPS,
+))
+
+registrar(Schema(
+    'ItemProposta',
+    campos=('id', 'proposta_id', 'servico_id', 'quantidade', 'valor_unitario', 'valor_total', 'ativo'),
+    datas=TIMESTAMPS,
+))
+
+registrar(Schema(
+    'Proposta',
+    campos=('id', 'numero_proposta', 'observacao', 'status', 'porcentagem_desconto', 'subtotal',
+            'valor_desconto', 'valor_total', 'quantidade_itens', 'requer_aprovacao', 'aprovado_por',
+            'motivo_rejeicao', 'pdf_gerado', 'pdf_caminho', 'ativo'),
+    datas=('validade', 'data_aprovacao', 'pdf_gerado_em') + TIMESTAMPS_SOFT_DELETE,
+    relacoes={
+        'cliente': Relacao('Cliente'),
+        'entidade_juridica': Relacao('EntidadeJuridica'),
+        'usuario': Relacao('Usuario'),
+        'itens': Relacao('ItemProposta', lista=True),
+    },
+))
+
+registrar(Schema(
+    'ItemOrdemServico',
+    campos=('id', 'ordem_servico_id', 'servico_id', 'quantidade', 'valor_unitario', 'valor_total',
+            'desconto', 'ativo'),
+    datas=TIMESTAMPS,
+    relacoes={'servico': Relacao('Servico')},
+))
+
+registrar(Schema(
+    'OrdemServico',
+    campos=('id', 'protocolo', 'observacao', 'status', 'subtotal_os', 'desconto_os', 'valor_total_os', 'ativo'),
+    datas=('vencimento', 'data_abertura', 'data_fechamento') + TIMESTAMPS,
+    relacoes={
+        'cliente': Relacao('Cliente'),
+        'empresa': Relacao('EntidadeJuridica'),
+        'usuario': Relacao('Usuario'),
+        'departamento': Relacao('Departamento'),
+        'itens': Relacao('ItemOrdemServico', lista=True, somente_ativos=True),
+    },
+))
+
+registrar(Schema(
+    'Agendamento',
+    campos=('id', 'titulo', 'descricao', 'tipo', 'status', 'destinatario', 'local', 'prioridade',
+            'funcionario_id', 'ativo'),
+    datas=('data_inicio', 'data_fim') + TIMESTAMPS_SOFT_DELETE,
+    # Ocorrências de séries (OcorrenciaAgendamento) saem pelo mesmo schema
+    calculados={'serie_id': attrgetter('serie_id')},
+    relacoes={'funcionario': Relacao('Usuario', somente_ativos=True)},
+))
+
+registrar(Schema(
+    'SerieAgendamento',
+    campos=('id', 'titulo', 'descricao', 'tipo', 'status', 'destinatario', 'local', 'prioridade',
+            'duracao_minutos', 'frequencia', 'intervalo', 'contagem', 'funcionario_id', 'ativo'),
+    datas=('data_inicio', 'ate', 'fim_serie') + TIMESTAMPS_SOFT_DELETE,
+    calculados={
+        'dias_semana': SerieAgendamento.lista_dias_semana,
+        'excecoes': SerieAgendamento.lista_excecoes,
+    },
+    relacoes={'funcionario': Relacao('Usuario', somente_ativos=True)},
+))
@@ -0,0 +1,177 @@
+"""
+Conferência de agenda: árvore de intervalos e varreduras de horários.
+
+A fonte da verdade é o banco: os agendamentos de um funcionário num período
+chegam por uma consulta no índice (funcionario_id, data_inicio, data_fim),
+feita na transação da gravação, e as séries por outra (só as regras). Nada
+fica guardado entre requisições, então todos os processos veem a mesma
+agenda.
+
+A árvore é uma treap ordenada por (início, id) em que cada nó guarda o maior
+fim da sua subárvore. Inserir custa O(log n) e achar os intervalos que
+cruzam um período custa O(log n + k), porque subárvores cujo maior fim já
+passou do início pedido são puladas inteiras. Ela é montada com as linhas de
+uma consulta quando muitos intervalos (as ocorrências de uma série) são
+conferidos contra a mesma agenda.
+"""
+
+import random
+from models.agendamento import STATUS_SEM_CONFLITO
+
+
+def ocupa_agenda(ativo, status) -> bool:
+    """Se o registro bloqueia o horário (ativo e com status fora de STATUS_SEM_CONFLITO)"""
+    return bool(ativo) and status not in STATUS_SEM_CONFLITO
+
+
+def trechos_livres(ocupados, inicio, fim, duracao) -> list:
+    """
+    Varredura dos intervalos ocupados (pares (inicio, fim) em ordem de
+    início, de uma ou várias agendas): devolve os trechos de [inicio, fim)
+    com pelo menos `duracao` em que nenhum deles está ocupado.
+    """
+    trechos = []
+    cursor = inicio
+    for de, ate in ocupados:
+        if de >= fim:
+            break
+        if de - cursor >= duracao:
+            trechos.append((cursor, de))
+        if ate > cursor:
+            cursor = ate
+    if fim - cursor >= duracao:
+        trechos.append((cursor, fim))
+    return trechos
+
+
+def intervalos_se_cruzam(primeiros, segundos) -> bool:
+    """
+    Se algum intervalo de `primeiros` cruza algum de `segundos`. Cada lista
+    vem em ordem de início com os fins também em ordem (ocorrências de uma
+    mesma série), então basta avançar as duas juntas.
+    """
+    primeiros, segundos = iter(primeiros), iter(segundos)
+    a, b = next(primeiros, None), next(segundos, None)
+    while a is not None and b is not None:
+        if a[1] <= b[0]:
+            a = next(primeiros, None)
+        elif b[1] <= a[0]:
+            b = next(segundos, None)
+        else:
+            return True
+    return False
+
+
+class _No:
+    __slots__ = ('inicio', 'fim', 'id', 'prioridade', 'esquerda', 'direita', 'max_fim')
+
+    def __init__(self, inicio, fim, registro_id):
+        self.inicio = inicio
+        self.fim = fim
+        self.id = registro_id
+        self.prioridade = random.random()
+        self.esquerda = None
+        self.direita = None
+        self.max_fim = fim
+
+
+def _atualizar(no):
+    maior = no.fim
+    if no.esquerda is not None and no.esquerda.max_fim > maior:
+        maior = no.esquerda.max_fim
+    if no.direita is not None and no.direita.max_fim > maior:
+        maior = no.direita.max_fim
+    no.max_fim = maior
+
+
+def _dividir(no, chave):
+    """(nós com (inicio, id) < chave, demais nós)"""
+    if no is None:
+        return None, None
+    if (no.inicio, no.id) < chave:
+        no.direita, direita = _dividir(no.direita, chave)
+        _atualizar(no)
+        return no, direita
+    esquerda, no.esquerda = _dividir(no.esquerda, chave)
+    _atualizar(no)
+    return esquerda, no
+
+
+def _juntar(esquerda, direita):
+    """Une duas treaps em que toda chave da esquerda é menor que as da direita"""
+    if esquerda is None or direita is None:
+        return esquerda or direita
+    if esquerda.prioridade > direita.prioridade:
+        esquerda.direita = _juntar(esquerda.direita, direita)
+        _atualizar(esquerda)
+        return esquerda
+    direita.esquerda = _juntar(esquerda, direita.esquerda)
+    _atualizar(direita)
+    return direita
+
+
+class ArvoreIntervalos:
+    """ Intervalos [inicio, fim) de uma agenda, com busca por sobreposição """
+
+    def __init__(self):
+        self._raiz = None
+        self._intervalos = {}   # id -> (inicio, fim)
+
+    def __len__(self):
+        return len(self._intervalos)
+
+    def __contains__(self, registro_id):
+        return registro_id in self._intervalos
+
+    def inserir(self, registro_id: int, inicio, fim):
+        """Insere ou substitui o intervalo do registro"""
+        self.remover(registro_id)
+        esquerda, direita = _dividir(self._raiz, (inicio, registro_id))
+        self._raiz = _juntar(_juntar(esquerda, _No(inicio, fim, registro_id)), direita)
+        self._intervalos[registro_id] = (inicio, fim)
+
+    def remover(self, registro_id: int):
+        intervalo = self._intervalos.pop(registro_id, None)
+        if intervalo is None:
+            return
+        esquerda, resto = _dividir(self._raiz, (intervalo[0], registro_id))
+        _, direita = _dividir(resto, (intervalo[0], registro_id + 1))
+        self._raiz = _juntar(esquerda, direita)
+
+    def _cruzando(self, inicio, fim):
+        """Nós que cruzam [inicio, fim), em ordem de início"""
+        pilha, no = [], self._raiz
+        while pilha or no is not None:
+            # Subárvore inteira terminando até `inicio` não tem nada a oferecer
+            while no is not None and no.max_fim > inicio:
+                pilha.append(no)
+                no = no.esquerda
+            if not pilha:
+                return
+            no = pilha.pop()
+            if no.inicio >= fim:
+                return
+            if no.fim > inicio:
+                yield no
+            no = no.direita
+
+    def sobrepostos(self, inicio, fim) -> list:
+        """[(inicio, fim, id)] dos intervalos que cruzam [inicio, fim)"""
+        return [(no.inicio, no.fim, no.id) for no in self._cruzando(inicio, fim)]
+
+    def livres(self, inicio, fim, duracao) -> list:
+        """[(inicio, fim)] dos trechos livres de [inicio, fim) com pelo menos `duracao`"""
+        return trechos_livres(((no.inicio, no.fim) for no in self._cruzando(inicio, fim)), inicio, fim, duracao)
+
+
+def em_conflito(ocupados, intervalos) -> list:
+    """
+    Ids dos ocupados (linhas (id, inicio, fim)) que cruzam algum dos
+    `intervalos` (pares (inicio, fim)), em ordem
+    """
+    arvore = ArvoreIntervalos()
+    for registro_id, inicio, fim in ocupados:
+        arvore.inserir(registro_id, inicio, fim)
+    if not len(arvore):
+        return []
+    return sorted({registro_id for de, ate in intervalos for _, _, registro_id in arvore.sobrepostos(de, ate)})
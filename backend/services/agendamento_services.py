@@ -1,41 +1,400 @@
-from datetime import datetime
-from models.agendamento import Agendamento
-from repositories.agendamento_repository import AgendamentoRepository
+import heapq
+import re
+from datetime import datetime, time, timedelta
+from operator import attrgetter
+from models.agendamento import Agendamento, SerieAgendamento, OcorrenciaAgendamento
+from repositories.agendamento_repository import AgendamentoRepository, SerieAgendamentoRepository
+from repositories.unidade_trabalho import transacao
+from services.agenda_indice import em_conflito, intervalos_se_cruzam, ocupa_agenda, trechos_livres
+
+CAMPOS_DATA = ('data_inicio', 'data_fim')
+CAMPOS_DATA_SERIE = ('data_inicio', 'ate')
+CAMPOS_INTEIROS_SERIE = ('funcionario_id', 'duracao_minutos', 'intervalo', 'contagem')
+# Colunas que o cliente não altera direto (fim_serie vem da regra)
+CAMPOS_INTERNOS_SERIE = ('id', 'fim_serie', 'created_at', 'updated_at', 'deleted_at', 'ativo')
+DISPONIBILIDADE_JANELA_MAXIMA = timedelta(days=366)
+DURACAO_PADRAO_MINUTOS = 30
+# Do início ao fim da última ocorrência: todas são conferidas contra a agenda ao gravar a série
+SERIE_DURACAO_MAXIMA = timedelta(days=5 * 366)
+
+
+class ConflitoAgendamento(ValueError):
+    """ O horário cruza outros agendamentos ou séries do mesmo funcionário """
+
+    def __init__(self, conflitos, series=()):
+        self.conflitos = list(conflitos)
+        self.series = list(series)
+        partes = []
+        if self.conflitos:
+            partes.append(f"o(s) agendamento(s) {', '.join(map(str, self.conflitos))}")
+        if self.series:
+            partes.append(f"a(s) série(s) {', '.join(map(str, self.series))}")
+        super().__init__(f"Conflito de horário com {' e '.join(partes)}")
+
+
+def ler_data(valor, nome: str):
+    """datetime a partir de um texto ISO 8601 (ou o próprio datetime)"""
+    if valor in (None, '') or isinstance(valor, datetime):
+        return valor or None
+    try:
+        return datetime.fromisoformat(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"{nome} deve ser uma data no formato ISO 8601")
+
+
+def ler_inteiro(valor, nome: str):
+    if valor in (None, ''):
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"{nome} deve ser um número inteiro")
+
+
+def ler_lista_inteiros(valor, nome: str) -> list:
+    """Lista de inteiros a partir de '1,2,3' (ou de uma lista)"""
+    if valor in (None, ''):
+        return []
+    partes = valor.split(',') if isinstance(valor, str) else valor
+    return [ler_inteiro(parte, nome) for parte in partes if str(parte).strip()]
+
+
+def ler_expediente(valor):
+    """(abertura, fechamento) a partir de 'HH:MM-HH:MM', ou None"""
+    if valor in (None, ''):
+        return None
+    encontrado = re.fullmatch(r'(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})', valor.strip())
+    try:
+        abertura = time(int(encontrado[1]), int(encontrado[2]))
+        fechamento = time(int(encontrado[3]), int(encontrado[4]))
+    except (TypeError, ValueError):
+        raise ValueError("expediente deve estar no formato HH:MM-HH:MM")
+    if fechamento <= abertura:
+        raise ValueError("O fim do expediente deve ser posterior ao início")
+    return abertura, fechamento
+
+
+def fora_do_expediente(inicio, fim, expediente):
+    """Intervalos (em ordem) de [inicio, fim) fora do expediente, tratados como ocupados"""
+    abertura, fechamento = expediente
+    dia = datetime.combine(inicio.date() - timedelta(days=1), time())
+    while dia < fim:
+        proximo = dia + timedelta(days=1)
+        yield datetime.combine(dia.date(), fechamento), datetime.combine(proximo.date(), abertura)
+        dia = proximo
+
+
+def series_em_conflito(funcionario_id: int, intervalos, ignorar: int = None) -> list:
+    """
+    Ids das séries do funcionário com alguma ocorrência cruzando um dos
+    `intervalos` (em ordem de início, com os fins em ordem). As séries vêm do
+    banco e cada uma é expandida só entre o primeiro início e o último fim.
+    """
+    intervalos = list(intervalos)
+    if not intervalos:
+        return []
+    janela_inicio, janela_fim = intervalos[0][0], max(ate for _, ate in intervalos)
+    return [
+        serie.id
+        for serie in SerieAgendamentoRepository().que_ocupam(janela_inicio, janela_fim, funcionario_id, ignorar)
+        if intervalos_se_cruzam(intervalos, serie.ocorrencias(janela_inicio, janela_fim))
+    ]
+
 
 class AgendamentoService:
     """ Serviço para gerenciar agendamentos """
 
     def __init__(self):
         self.repo = AgendamentoRepository()
-    
+
     def get_all(self):
         return self.repo.get_all()
-    
+
     def get_by_id(self, agendamento_id: int):
         return self.repo.get_by_id(agendamento_id)
-    
+
     def get_by_funcionario(self, funcionario_id: int):
         return self.repo.get_by_funcionario(funcionario_id)
 
+    def get_por_periodo(self, inicio=None, fim=None, funcionario_id=None):
+        """
+        Agendamentos que cruzam [inicio, fim), com as ocorrências das séries
+        no período (em ordem de início), geradas na hora. Sem uma das pontas
+        as ocorrências não têm fim, então a janela aberta só vale quando
+        nenhuma série da seleção cai nela.
+        """
+        inicio, fim = ler_data(inicio, 'inicio'), ler_data(fim, 'fim')
+        funcionario_id = ler_inteiro(funcionario_id, 'funcionario_id')
+        if inicio and fim and fim <= inicio:
+            raise ValueError("fim deve ser posterior a inicio")
+        if (not inicio or not fim) and SerieAgendamentoRepository().existe_no_periodo(inicio, fim, funcionario_id):
+            raise ValueError("Há séries recorrentes na seleção: informe inicio e fim para listar as ocorrências")
+        agendamentos = self.repo.get_por_periodo(inicio, fim, funcionario_id)
+        if not inicio or not fim:
+            return agendamentos
+        ocorrencias = [
+            OcorrenciaAgendamento(serie, de, ate)
+            for serie in SerieAgendamentoRepository().get_por_periodo(inicio, fim, funcionario_id)
+            for de, ate in serie.ocorrencias(inicio, fim)
+        ]
+        if not ocorrencias:
+            return agendamentos
+        return sorted(agendamentos + ocorrencias, key=attrgetter('data_inicio'))
+
+    def conflitos(self, funcionario_id, inicio, fim, ignorar=None, ignorar_serie=None) -> dict:
+        """Ids dos agendamentos e das séries do funcionário que cruzam [inicio, fim)"""
+        inicio, fim = ler_data(inicio, 'inicio'), ler_data(fim, 'fim')
+        funcionario_id = ler_inteiro(funcionario_id, 'funcionario_id')
+        if funcionario_id is None or not inicio or not fim:
+            raise ValueError("Informe funcionario_id, inicio e fim")
+        if fim <= inicio:
+            raise ValueError("fim deve ser posterior a inicio")
+        ocupados = self.repo.ocupacao(funcionario_id, inicio, fim, ignorar=ler_inteiro(ignorar, 'ignorar'))
+        return {
+            'conflitos': [registro_id for registro_id, _, _ in ocupados],
+            'series': series_em_conflito(
+                funcionario_id, [(inicio, fim)], ignorar=ler_inteiro(ignorar_serie, 'ignorar_serie')
+            ),
+        }
+
+    def horarios_livres(self, funcionario_id: int, inicio, fim, duracao) -> list:
+        """Trechos livres do funcionário em [inicio, fim) com pelo menos `duracao` minutos"""
+        inicio, fim = ler_data(inicio, 'inicio'), ler_data(fim, 'fim')
+        duracao = ler_inteiro(duracao, 'duracao') or DURACAO_PADRAO_MINUTOS
+        if not inicio or not fim:
+            raise ValueError("Informe inicio e fim")
+        if fim <= inicio:
+            raise ValueError("fim deve ser posterior a inicio")
+        if duracao < 1:
+            raise ValueError("duracao deve ser maior que zero")
+        ocupados = heapq.merge(
+            ((de, ate) for _, de, ate in self.repo.ocupacao(funcionario_id, inicio, fim)),
+            *(serie.ocorrencias(inicio, fim)
+              for serie in SerieAgendamentoRepository().que_ocupam(inicio, fim, funcionario_id)),
+        )
+        trechos = trechos_livres(ocupados, inicio, fim, timedelta(minutes=duracao))
+        return [{'inicio': de.isoformat(), 'fim': ate.isoformat()} for de, ate in trechos]
+
+    def disponibilidade(self, inicio, fim, duracao=None, funcionario_ids=None, departamento_id=None,
+                        cargo_id=None, expediente=None) -> dict:
+        """
+        Horários de [inicio, fim) em que toda a equipe está livre por pelo
+        menos `duracao` minutos. Os horários ocupados de todos chegam do
+        banco já em ordem de início (uma consulta), as ocorrências das
+        séries da equipe (outra consulta, só as regras) são geradas em ordem
+        e uma varredura única junta tudo; com `expediente` ('08:00-18:00') o
+        resto do dia conta como ocupado.
+        """
+        inicio, fim = ler_data(inicio, 'inicio'), ler_data(fim, 'fim')
+        duracao = ler_inteiro(duracao, 'duracao') or DURACAO_PADRAO_MINUTOS
+        funcionario_ids = ler_lista_inteiros(funcionario_ids, 'funcionario_ids')
+        departamento_id = ler_inteiro(departamento_id, 'departamento_id')
+        cargo_id = ler_inteiro(cargo_id, 'cargo_id')
+        expediente = ler_expediente(expediente)
+        if not inicio or not fim:
+            raise ValueError("Informe inicio e fim")
+        if fim <= inicio:
+            raise ValueError("fim deve ser posterior a inicio")
+        if fim - inicio > DISPONIBILIDADE_JANELA_MAXIMA:
+            raise ValueError(f"A janela deve ter no máximo {DISPONIBILIDADE_JANELA_MAXIMA.days} dias")
+        if duracao < 1:
+            raise ValueError("duracao deve ser maior que zero")
+        if not funcionario_ids and departamento_id is None and cargo_id is None:
+            raise ValueError("Informe funcionario_ids, departamento_id ou cargo_id")
+
+        equipe = set()
+
+        def ocupados():
+            for funcionario_id, de, ate in self.repo.ocupacao_da_equipe(
+                    inicio, fim, funcionario_ids, departamento_id, cargo_id):
+                equipe.add(funcionario_id)
+                if de is not None:
+                    yield de, ate
+
+        series = self.repo.series_da_equipe(inicio, fim, funcionario_ids, departamento_id, cargo_id)
+        intervalos = heapq.merge(ocupados(), *(serie.ocorrencias(inicio, fim) for serie in series))
+        if expediente:
+            intervalos = heapq.merge(intervalos, fora_do_expediente(inicio, fim, expediente))
+        trechos = trechos_livres(intervalos, inicio, fim, timedelta(minutes=duracao))
+        # A varredura para no fim da janela; o resto das linhas ainda conta para a equipe
+        for _ in intervalos:
+            pass
+
+        if not equipe:
+            raise ValueError("Nenhum funcionário ativo encontrado para a seleção")
+        return {
+            'funcionarios': len(equipe),
+            'duracao': duracao,
+            'livres': [{'inicio': de.isoformat(), 'fim': ate.isoformat()} for de, ate in trechos],
+        }
+
+    def _verificar_conflitos(self, agendamento: Agendamento):
+        """
+        Confere o horário no banco, com a agenda do funcionário travada: quem
+        chama grava na mesma transação (transacao()), então outra gravação
+        para o mesmo funcionário só confere depois do commit desta.
+        """
+        agendamento.validar_datas()
+        if not ocupa_agenda(True, agendamento.status):
+            return
+        self.repo.travar_agenda(agendamento.funcionario_id)
+        ocupados = self.repo.ocupacao(
+            agendamento.funcionario_id, agendamento.data_inicio, agendamento.data_fim, ignorar=agendamento.id
+        )
+        series = series_em_conflito(agendamento.funcionario_id, [(agendamento.data_inicio, agendamento.data_fim)])
+        if ocupados or series:
+            raise ConflitoAgendamento([registro_id for registro_id, _, _ in ocupados], series)
+
     def criar_agendamento(self, **data):
-        if 'data_fim' in data and isinstance(data['data_fim'], str):
-            data['data_fim'] = datetime.fromisoformat(data['data_fim'])
+        for campo in CAMPOS_DATA:
+            if campo in data:
+                data[campo] = ler_data(data[campo], campo)
         agendamento = Agendamento(**data)
-        return self.repo.create(agendamento)
-    
+        with transacao():
+            self._verificar_conflitos(agendamento)
+            return self.repo.create(agendamento)
+
+    @transacao()
     def atualizar_agendamento(self, agendamento_id: int, **data):
         agendamento = self.repo.get_by_id(agendamento_id)
 
         if not agendamento:
             raise ValueError("Agendamento não encontrado")
-        
+        for campo in CAMPOS_DATA:
+            if campo in data:
+                data[campo] = ler_data(data[campo], campo)
+
+        # Confere o novo horário antes de tocar no registro da sessão
+        novo = Agendamento(**{
+            'titulo': agendamento.titulo, 'status': agendamento.status,
+            'funcionario_id': agendamento.funcionario_id,
+            'data_inicio': agendamento.data_inicio, 'data_fim': agendamento.data_fim,
+            **{campo: data[campo] for campo in ('titulo', 'status', 'funcionario_id', *CAMPOS_DATA) if campo in data},
+        })
+        novo.id = agendamento.id
+        self._verificar_conflitos(novo)
+
         for key, value in data.items():
             setattr(agendamento, key, value)
         return self.repo.update(agendamento)
-    
+
     def deletar_agendamento(self, agendamento_id: int):
         agendamento = self.repo.get_by_id(agendamento_id)
-        
+
         if not agendamento:
             raise ValueError("Agendamento não encontrado")
-        return self.repo.delete(agendamento)
\ No newline at end of file
+        return self.repo.delete(agendamento)
+
+
+class SerieAgendamentoService:
+    """ Serviço para gerenciar séries de agendamentos recorrentes """
+
+    def __init__(self):
+        self.repo = SerieAgendamentoRepository()
+
+    def get_all(self):
+        return self.repo.get_all()
+
+    def get_by_id(self, serie_id: int):
+        return self.repo.get_by_id(serie_id)
+
+    def ocorrencias(self, serie_id: int, inicio, fim) -> list:
+        """Ocorrências da série em [inicio, fim), como agendamentos não gravados"""
+        serie = self.repo.get_by_id(serie_id)
+        if not serie:
+            raise ValueError("Série não encontrada")
+        inicio, fim = ler_data(inicio, 'inicio'), ler_data(fim, 'fim')
+        if not inicio or not fim:
+            raise ValueError("Informe inicio e fim")
+        if fim <= inicio:
+            raise ValueError("fim deve ser posterior a inicio")
+        return [OcorrenciaAgendamento(serie, de, ate) for de, ate in serie.ocorrencias(inicio, fim)]
+
+    @staticmethod
+    def _ler_dados(data: dict) -> dict:
+        for campo in CAMPOS_DATA_SERIE:
+            if campo in data:
+                data[campo] = ler_data(data[campo], campo)
+        for campo in CAMPOS_INTEIROS_SERIE:
+            if campo in data:
+                data[campo] = ler_inteiro(data[campo], campo)
+        for campo in CAMPOS_INTERNOS_SERIE:
+            data.pop(campo, None)
+        return data
+
+    def _verificar_conflitos(self, serie: SerieAgendamento):
+        """
+        Valida a regra e confere todas as ocorrências contra os agendamentos
+        e as outras séries do funcionário, no banco e com a agenda dele
+        travada (ver AgendamentoService._verificar_conflitos). Por isso a
+        série precisa terminar (`ate` ou `contagem`) em até SERIE_DURACAO_MAXIMA.
+        Os agendamentos do período chegam numa consulta só e viram uma árvore
+        de intervalos para conferir as ocorrências. Agendamentos criados
+        depois, em qualquer data, são conferidos contra a série por conta própria.
+        """
+        serie.validar_regra()
+        if serie.fim_serie is None:
+            raise ValueError("Informe ate ou contagem: a série precisa terminar")
+        if serie.fim_serie - serie.data_inicio > SERIE_DURACAO_MAXIMA:
+            raise ValueError(f"A série deve terminar em até {SERIE_DURACAO_MAXIMA.days} dias do início")
+        if not ocupa_agenda(True, serie.status):
+            return
+        intervalos = list(serie.ocorrencias(serie.data_inicio, serie.fim_serie))
+        if not intervalos:
+            return
+        agendamentos = AgendamentoRepository()
+        agendamentos.travar_agenda(serie.funcionario_id)
+        ocupados = agendamentos.ocupacao(serie.funcionario_id, intervalos[0][0], max(ate for _, ate in intervalos))
+        conflitos = em_conflito(ocupados, intervalos)
+        series = series_em_conflito(serie.funcionario_id, intervalos, ignorar=serie.id)
+        if conflitos or series:
+            raise ConflitoAgendamento(conflitos, series)
+
+    def criar_serie(self, **data):
+        serie = SerieAgendamento(**self._ler_dados(data))
+        with transacao():
+            self._verificar_conflitos(serie)
+            return self.repo.create(serie)
+
+    @transacao()
+    def atualizar_serie(self, serie_id: int, **data):
+        serie = self.repo.get_by_id(serie_id)
+
+        if not serie:
+            raise ValueError("Série não encontrada")
+        data = self._ler_dados(data)
+
+        # Confere a nova regra numa cópia antes de tocar no registro da sessão
+        atual = {
+            coluna.key: getattr(serie, coluna.key)
+            for coluna in SerieAgendamento.__table__.columns if coluna.key not in CAMPOS_INTERNOS_SERIE
+        }
+        nova = SerieAgendamento(**{**atual, **data})
+        nova.id = serie.id
+        self._verificar_conflitos(nova)
+
+        for key, value in data.items():
+            setattr(serie, key, value)
+        serie.validar_regra()
+        return self.repo.update(serie)
+
+    def adicionar_excecao(self, serie_id: int, data):
+        """Remove da série a ocorrência que começa em `data`"""
+        serie = self.repo.get_by_id(serie_id)
+
+        if not serie:
+            raise ValueError("Série não encontrada")
+        data = ler_data(data, 'data')
+        if not data:
+            raise ValueError("Informe a data da ocorrência")
+        if not any(de == data for de, _ in serie.ocorrencias(data, data + serie.duracao)):
+            raise ValueError("A série não tem ocorrência começando nessa data")
+        serie.excecoes = serie.lista_excecoes() + [data]
+        return self.repo.update(serie)
+
+    def deletar_serie(self, serie_id: int):
+        serie = self.repo.get_by_id(serie_id)
+
+        if not serie:
+            raise ValueError("Série não encontrada")
+        return self.repo.delete(serie)
@@ -0,0 +1,243 @@
+"""
+Índice de autocomplete em memória para os seletores do frontend.
+
+Para cada entidade há uma lista ordenada de (chave, id): uma chave por
+palavra do nome/código, a partir daquela palavra, sem acentos e em
+minúsculas ("joao da silva", "da silva", "silva"). Um prefixo é achado com
+bisect e as chaves seguintes são lidas até deixarem de começar com ele, sem
+acessar o banco.
+
+O índice é de cada processo. Ele é carregado na inicialização e acompanha
+os commits feitos pelo próprio processo: os registros alterados são anotados
+no flush e aplicados só depois do commit (um rollback descarta as
+anotações). Para os commits de outros processos (outros workers, scripts),
+uma thread confere a cada AUTOCOMPLETE_RECARREGAR_SEGUNDOS (0 desliga) a
+versão de cada tabela (count(*) e max(updated_at)) e recarrega as que mudaram:
+    AUTOCOMPLETE_RECARREGAR_SEGUNDOS=60
+"""
+
+import os
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import namedtuple
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from config import db
+from models.cliente import Cliente
+from models.entidadeJuridica import EntidadeJuridica
+from models.servico import Servico
+from models.tipoAtividade import TipoAtividade
+
+LIMITE_AUTOCOMPLETE_PADRAO = 10
+LIMITE_AUTOCOMPLETE_MAXIMO = 50
+AUTOCOMPLETE_RECARREGAR_SEGUNDOS = int(os.environ.get('AUTOCOMPLETE_RECARREGAR_SEGUNDOS', 60))
+
+FonteAutocomplete = namedtuple('FonteAutocomplete', 'modelo indexados retornados')
+
+FONTES_AUTOCOMPLETE = {
+    'clientes': FonteAutocomplete(Cliente, ('nome',), ('nome', 'cpf')),
+    'entidades-juridicas': FonteAutocomplete(EntidadeJuridica, ('nome_fantasia',), ('nome_fantasia', 'razao_social', 'cnpj')),
+    'servicos': FonteAutocomplete(Servico, ('nome', 'codigo'), ('nome', 'codigo', 'valor_unitario')),
+    'tipos-atividade': FonteAutocomplete(TipoAtividade, ('nome', 'codigo'), ('nome', 'codigo')),
+}
+
+
+def normalizar(texto) -> str:
+    """Minúsculas e sem acentos"""
+    decomposto = unicodedata.normalize('NFKD', str(texto or ''))
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold().strip()
+
+
+def chaves_do_valor(valor) -> set:
+    palavras = normalizar(valor).split()
+    return {' '.join(palavras[i:]) for i in range(len(palavras))}
+
+
+class IndiceAutocomplete:
+    """ Lista ordenada de (chave, id) de uma entidade, com os dados devolvidos por id """
+
+    def __init__(self, fonte: FonteAutocomplete):
+        self.fonte = fonte
+        self._chaves = []      # [(chave, id)] ordenada
+        self._registros = {}   # id -> (chaves, dados)
+        self._lock = threading.Lock()
+
+    def _montar(self, registro_id: int, valores: dict):
+        chaves = set()
+        for campo in self.fonte.indexados:
+            chaves |= chaves_do_valor(valores.get(campo))
+        dados = {'id': registro_id, **{campo: valores.get(campo) for campo in self.fonte.retornados}}
+        return chaves, dados
+
+    def carregar(self, registros):
+        """Substitui o conteúdo pelos registros informados (dicts com id e os campos da fonte)"""
+        novas_chaves = []
+        novos_registros = {}
+        for valores in registros:
+            chaves, dados = self._montar(valores['id'], valores)
+            novos_registros[valores['id']] = (chaves, dados)
+            novas_chaves.extend((chave, valores['id']) for chave in chaves)
+        novas_chaves.sort()
+        with self._lock:
+            self._chaves = novas_chaves
+            self._registros = novos_registros
+
+    def _remover(self, registro_id: int):
+        anterior = self._registros.pop(registro_id, None)
+        if anterior is None:
+            return
+        for chave in anterior[0]:
+            posicao = bisect_left(self._chaves, (chave, registro_id))
+            if posicao < len(self._chaves) and self._chaves[posicao] == (chave, registro_id):
+                del self._chaves[posicao]
+
+    def remover(self, registro_id: int):
+        with self._lock:
+            self._remover(registro_id)
+
+    def atualizar(self, registro_id: int, valores: dict):
+        chaves, dados = self._montar(registro_id, valores)
+        with self._lock:
+            self._remover(registro_id)
+            self._registros[registro_id] = (chaves, dados)
+            for chave in chaves:
+                insort(self._chaves, (chave, registro_id))
+
+    def buscar(self, prefixo: str, limite: int = LIMITE_AUTOCOMPLETE_PADRAO) -> list:
+        prefixo = normalizar(prefixo)
+        resultados = []
+        vistos = set()
+        with self._lock:
+            posicao = bisect_left(self._chaves, (prefixo,))
+            while posicao < len(self._chaves) and len(resultados) < limite:
+                chave, registro_id = self._chaves[posicao]
+                if not chave.startswith(prefixo):
+                    break
+                if registro_id not in vistos:
+                    vistos.add(registro_id)
+                    resultados.append(self._registros[registro_id][1])
+                posicao += 1
+        return resultados
+
+    def __len__(self):
+        return len(self._registros)
+
+
+class AutocompleteService:
+    """ Índices de autocomplete de todas as entidades """
+
+    def __init__(self):
+        self.indices = {nome: IndiceAutocomplete(fonte) for nome, fonte in FONTES_AUTOCOMPLETE.items()}
+        self._por_modelo = {fonte.modelo: nome for nome, fonte in FONTES_AUTOCOMPLETE.items()}
+        self._versoes = {}
+
+    def _valores(self, fonte: FonteAutocomplete, registro) -> dict:
+        campos = set(fonte.indexados) | set(fonte.retornados)
+        return {'id': registro.id, **{campo: getattr(registro, campo) for campo in campos}}
+
+    def _versao(self, fonte: FonteAutocomplete) -> tuple:
+        """count(*) e max(updated_at) da tabela: mudam com inclusões, alterações e desativações"""
+        modelo = fonte.modelo
+        return tuple(db.session.execute(select(func.count(), func.max(modelo.updated_at)).select_from(modelo)).one())
+
+    def _carregar_entidade(self, nome: str):
+        fonte = FONTES_AUTOCOMPLETE[nome]
+        # Versão lida antes dos registros: um commit no meio só causa uma recarga a mais
+        versao = self._versao(fonte)
+        registros = fonte.modelo.query.filter_by(ativo=True).yield_per(1000)
+        self.indices[nome].carregar(self._valores(fonte, registro) for registro in registros)
+        self._versoes[nome] = versao
+
+    def carregar(self):
+        """Lê os registros ativos de cada entidade (precisa de app context)"""
+        for nome in FONTES_AUTOCOMPLETE:
+            self._carregar_entidade(nome)
+
+    def recarregar_se_mudou(self) -> list:
+        """Recarrega as entidades cuja tabela mudou desde a última carga (commits de outros processos)"""
+        recarregadas = []
+        for nome, fonte in FONTES_AUTOCOMPLETE.items():
+            if self._versao(fonte) != self._versoes.get(nome):
+                self._carregar_entidade(nome)
+                recarregadas.append(nome)
+        return recarregadas
+
+    def buscar(self, entidade: str, prefixo: str, limite=None) -> list:
+        if entidade not in self.indices:
+            raise ValueError(f"Entidade inválida: {entidade}. Use: {', '.join(self.indices)}")
+        prefixo = (prefixo or '').strip()
+        if not prefixo:
+            raise ValueError("O parâmetro prefix é obrigatório")
+        if limite in (None, ''):
+            limite = LIMITE_AUTOCOMPLETE_PADRAO
+        try:
+            limite = int(limite)
+        except (TypeError, ValueError):
+            raise ValueError("O parâmetro limit deve ser um número inteiro")
+        if limite < 1:
+            raise ValueError("O parâmetro limit deve ser maior que zero")
+        return self.indices[entidade].buscar(prefixo, min(limite, LIMITE_AUTOCOMPLETE_MAXIMO))
+
+    # Acompanhamento dos commits
+
+    def anotar_flush(self, session):
+        """Guarda o estado dos registros alterados no flush; só vale depois do commit"""
+        pendentes = session.info.setdefault('autocomplete_pendentes', {})
+        for registro in list(session.new) + list(session.dirty):
+            nome = self._por_modelo.get(type(registro))
+            if nome and registro.id is not None:
+                fonte = FONTES_AUTOCOMPLETE[nome]
+                pendentes[(nome, registro.id)] = self._valores(fonte, registro) if registro.ativo else None
+        for registro in session.deleted:
+            nome = self._por_modelo.get(type(registro))
+            if nome and registro.id is not None:
+                pendentes[(nome, registro.id)] = None
+
+    def aplicar_commit(self, session):
+        pendentes = session.info.pop('autocomplete_pendentes', None)
+        for (nome, registro_id), valores in (pendentes or {}).items():
+            if valores is None:
+                self.indices[nome].remover(registro_id)
+            else:
+                self.indices[nome].atualizar(registro_id, valores)
+
+    def descartar(self, session):
+        session.info.pop('autocomplete_pendentes', None)
+
+
+class RecargaAutocomplete:
+    """ Thread que recarrega os índices alterados por outros processos """
+
+    def __init__(self, intervalo: int = AUTOCOMPLETE_RECARREGAR_SEGUNDOS):
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self, app):
+        if self.intervalo <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._executar, args=(app,), name='recarga-autocomplete', daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _executar(self, app):
+        while not self._parar.wait(self.intervalo):
+            with app.app_context():
+                try:
+                    autocomplete_service.recarregar_se_mudou()
+                except Exception as e:
+                    print(f"❌ Erro ao recarregar o autocomplete: {e}")
+                finally:
+                    db.session.remove()
+
+
+autocomplete_service = AutocompleteService()
+recarga_autocomplete = RecargaAutocomplete()
+
+event.listen(Session, 'after_flush', lambda session, _contexto: autocomplete_service.anotar_flush(session))
+event.listen(Session, 'after_commit', autocomplete_service.aplicar_commit)
+event.listen(Session, 'after_soft_rollback', lambda session, _transacao: autocomplete_service.descartar(session))
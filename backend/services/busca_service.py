@@ -0,0 +1,60 @@
+from repositories.busca_repository import BuscaRepository, FONTES_BUSCA
+from repositories.paginacao import normalizar_limite
+
+LIMITE_BUSCA_PADRAO = 20
+TAMANHO_MINIMO_TERMO = 2
+
+
+class BuscaService:
+    """ Busca textual unificada (clientes, entidades jurídicas, serviços e usuários) """
+
+    def __init__(self):
+        self.repo = BuscaRepository()
+
+    def _ler_tipos(self, tipos):
+        if not tipos:
+            return None
+        if isinstance(tipos, str):
+            tipos = [tipo.strip() for tipo in tipos.split(',') if tipo.strip()]
+        invalidos = [tipo for tipo in tipos if tipo not in FONTES_BUSCA]
+        if invalidos:
+            raise ValueError(
+                f"Tipo de busca inválido: {', '.join(invalidos)}. Use: {', '.join(FONTES_BUSCA)}"
+            )
+        return tipos
+
+    def _ler_inteiro(self, valor, nome: str):
+        if valor in (None, ''):
+            return None
+        try:
+            return int(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f"O parâmetro {nome} deve ser um número inteiro")
+
+    def buscar(self, q: str, tipos=None, limit=None, offset=None):
+        """Resultados ordenados por relevância, paginados por limit/offset"""
+        q = (q or '').strip()
+        if len(q) < TAMANHO_MINIMO_TERMO:
+            raise ValueError(f"O parâmetro q deve ter pelo menos {TAMANHO_MINIMO_TERMO} caracteres")
+
+        tipos = self._ler_tipos(tipos)
+        limit = self._ler_inteiro(limit, 'limit')
+        limit = normalizar_limite(limit) if limit is not None else LIMITE_BUSCA_PADRAO
+        offset = self._ler_inteiro(offset, 'offset') or 0
+        if offset < 0:
+            raise ValueError("O parâmetro offset não pode ser negativo")
+
+        resultados, tem_mais = self.repo.buscar(q, tipos, limit, offset)
+        return {
+            'data': resultados,
+            'q': q,
+            'limit': limit,
+            'offset': offset,
+            'next_offset': offset + limit if tem_mais else None,
+            'has_more': tem_mais,
+        }
+
+    def buscar_ids(self, q: str, tipo: str, limit: int = 50) -> list:
+        """Ids do tipo informado, do mais para o menos relevante"""
+        resultados, _tem_mais = self.repo.buscar(q, [tipo], limit)
+        return [resultado['id'] for resultado in resultados]
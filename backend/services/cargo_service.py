@@ -1,5 +1,6 @@
 from models.organizacional import Cargo
 from repositories.cargo_repository import CargoRepository
+from models.referencias import cache_referencias
 
 class CargoService:
     """ Serviços para gerenciar cargos """
@@ -11,6 +12,10 @@ class CargoService:
         """Retorna todos os cargos"""
         return self.repo.get_all()
     
+    def listar_json(self):
+        """(JSON dos ativos, ETag) vindos do cache de referências"""
+        return cache_referencias.listar_com_etag('cargos')
+
     def get_by_id(self, cargo_id: int):
         """Retorna cargo por ID"""
         cargo = self.repo.get_by_id(cargo_id)
@@ -49,7 +54,9 @@ class CargoService:
         
         # Criar cargo
         cargo = Cargo(**data)
-        return self.repo.create(cargo)
+        resultado = self.repo.create(cargo)
+        cache_referencias.invalidar('cargos')
+        return resultado
     
     def atualizar_cargo(self, cargo_id: int, **data):
         """Atualiza um cargo existente"""
@@ -74,7 +81,9 @@ class CargoService:
             if hasattr(cargo, key):
                 setattr(cargo, key, value)
         
-        return self.repo.update(cargo)
+        resultado = self.repo.update(cargo)
+        cache_referencias.invalidar('cargos')
+        return resultado
     
     def deletar_cargo(self, cargo_id: int):
         """Remove um cargo"""
@@ -86,4 +95,6 @@ class CargoService:
         if cargo.usuarios.count() > 0:
             raise ValueError("Não é possível deletar cargo com funcionários vinculados")
         
-        return self.repo.delete(cargo)
\ No newline at end of file
+        resultado = self.repo.delete(cargo)
+        cache_referencias.invalidar('cargos')
+        return resultado
\ No newline at end of file
@@ -1,14 +1,24 @@
-from models.cliente import Cliente
+from models.cliente import Cliente, Endereco
+from models.entidadeJuridica import EntidadeJuridica
 from repositories.cliente_repository import ClienteRepository
+from repositories.endereco_repository import EnderecoRepository
+from repositories.entidade_juridica_repository import EntidadeJuridicaRepository
+from repositories.unidade_trabalho import transacao
 
 class ClienteService:
     """ Serviço para gerenciar clientes """
 
     def __init__(self):
         self.repo = ClienteRepository()
+        self.endereco_repo = EnderecoRepository()
+        self.entidade_repo = EntidadeJuridicaRepository()
     
     def get_all(self):
         return self.repo.get_all()
+    def get_pagina(self, limit: int = None, after: int = None):
+        return self.repo.get_page(limit, after)
+    def iterar_todos(self):
+        return self.repo.iter_all()
     def get_by_id(self, cliente_id: int):
         return self.repo.get_by_id(cliente_id)
     def get_by_cpf(self, cpf: str):
@@ -16,14 +26,24 @@ class ClienteService:
     def get_by_email(self, email: str):
         return self.repo.get_by_email(email)
 
-    def criar_cliente(self, **data):
-        cliente = Cliente(**data)
+    def criar_cliente(self, enderecos=None, entidades_juridicas=None, **data):
+        """Cria o cliente e, se informados, seus endereços e entidades jurídicas em uma transação"""
+        with transacao():
+            cliente = Cliente(**data)
 
-        if self.repo.get_by_cpf(data['cpf']):
-            raise ValueError("CPF já cadastrado")
-        if self.get_by_email(data['email']):
-            raise ValueError("E-mail já cadastrado")
-        return self.repo.create(cliente)
+            if self.repo.get_by_cpf(data['cpf']):
+                raise ValueError("CPF já cadastrado")
+            if self.get_by_email(data['email']):
+                raise ValueError("E-mail já cadastrado")
+            self.repo.create(cliente)
+
+            for dados in enderecos or []:
+                self.endereco_repo.create(Endereco(**{**dados, 'cliente_id': cliente.id}))
+            for dados in entidades_juridicas or []:
+                if self.entidade_repo.get_by_cnpj(dados.get('cnpj')):
+                    raise ValueError("CNPJ já cadastrado")
+                self.entidade_repo.create(EntidadeJuridica(**{**dados, 'cliente_id': cliente.id}))
+        return cliente
     
     def atualizar_cliente(self, cliente_id: int,**data):
         cliente = self.repo.get_by_id(cliente_id)
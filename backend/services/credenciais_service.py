@@ -0,0 +1,128 @@
+"""
+Limite de concorrência para o hash e a verificação de senhas.
+
+O scrypt/pbkdf2 do werkzeug ocupa a CPU por dezenas de milissegundos. O hash
+roda na própria thread da requisição (que espera por ele; o hashlib libera o
+GIL enquanto calcula, então as outras threads seguem atendendo), mas no
+máximo SENHA_HASH_WORKERS de uma vez, deixando núcleos livres para o resto
+da API (health checks inclusive). Cabem no máximo SENHA_HASH_FILA_MAX
+operações esperando a vez; acima disso a operação é recusada na hora com
+CredenciaisOcupadas, que os controllers transformam em 429.
+
+O método de hash vem de SENHA_HASH_METODO (config.py). Senhas gravadas com
+outro método são refeitas com o atual no próximo login bem-sucedido.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from config import SENHA_HASH_METODO
+
+SENHA_HASH_WORKERS = int(os.environ.get('SENHA_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+SENHA_HASH_FILA_MAX = int(os.environ.get('SENHA_HASH_FILA_MAX', SENHA_HASH_WORKERS * 8))
+SENHA_HASH_RETRY_AFTER = 1
+AMOSTRAS_LATENCIA = 1000
+
+
+class CredenciaisOcupadas(Exception):
+    """ Fila de hash de senhas cheia; a requisição deve ser repetida mais tarde """
+
+
+class CredenciaisService:
+    """ Limite de concorrência para gerar e verificar hashes de senha, com métricas """
+
+    def __init__(self, max_workers: int = SENHA_HASH_WORKERS, fila_max: int = SENHA_HASH_FILA_MAX,
+                 metodo: str = SENHA_HASH_METODO):
+        self.metodo = metodo
+        self.max_workers = max_workers
+        self.fila_max = fila_max
+        # Prefixo que o werkzeug grava para o método configurado (ex.: "scrypt:32768:8:1")
+        self.prefixo_metodo = generate_password_hash('', method=metodo).split('$', 1)[0]
+
+        # Hashes calculando ao mesmo tempo
+        self._calculando = threading.BoundedSemaphore(max_workers)
+        # Vagas = operações calculando + operações esperando
+        self._vagas = threading.BoundedSemaphore(max_workers + fila_max)
+        self._lock = threading.Lock()
+        self._em_andamento = 0
+        self._latencias = deque(maxlen=AMOSTRAS_LATENCIA)
+        self._total = 0
+        self._recusadas = 0
+
+    def _executar(self, funcao, *args):
+        if not self._vagas.acquire(blocking=False):
+            with self._lock:
+                self._recusadas += 1
+            raise CredenciaisOcupadas("Muitas operações de senha em andamento. Tente novamente em instantes.")
+
+        with self._lock:
+            self._em_andamento += 1
+
+        try:
+            with self._calculando:
+                inicio = time.perf_counter()
+                try:
+                    return funcao(*args)
+                finally:
+                    duracao = time.perf_counter() - inicio
+                    with self._lock:
+                        self._latencias.append(duracao)
+                        self._total += 1
+        finally:
+            with self._lock:
+                self._em_andamento -= 1
+            self._vagas.release()
+
+    def gerar_hash(self, senha: str) -> str:
+        return self._executar(generate_password_hash, senha, self.metodo)
+
+    def verificar(self, senha_hash: str, senha: str) -> bool:
+        if not senha_hash or senha is None:
+            return False
+        return self._executar(check_password_hash, senha_hash, senha)
+
+    def precisa_rehash(self, senha_hash: str) -> bool:
+        """Se o hash foi gerado com outro método ou outros parâmetros"""
+        return bool(senha_hash) and senha_hash.split('$', 1)[0] != self.prefixo_metodo
+
+    def tentar_rehash(self, senha: str):
+        """Novo hash no método atual, ou None se a fila estiver cheia (fica para o próximo login)"""
+        try:
+            return self.gerar_hash(senha)
+        except CredenciaisOcupadas:
+            return None
+
+    def metricas(self) -> dict:
+        with self._lock:
+            latencias = sorted(self._latencias)
+            em_andamento = self._em_andamento
+            total = self._total
+            recusadas = self._recusadas
+
+        def percentil(p):
+            if not latencias:
+                return None
+            return round(latencias[min(len(latencias) - 1, int(len(latencias) * p))] * 1000, 2)
+
+        return {
+            'metodo': self.prefixo_metodo,
+            'workers': self.max_workers,
+            'fila_max': self.fila_max,
+            'em_andamento': em_andamento,
+            'na_fila': max(0, em_andamento - self.max_workers),
+            'total_operacoes': total,
+            'recusadas': recusadas,
+            'latencia_ms': {
+                'amostras': len(latencias),
+                'media': round(sum(latencias) / len(latencias) * 1000, 2) if latencias else None,
+                'p50': percentil(0.50),
+                'p95': percentil(0.95),
+                'max': round(latencias[-1] * 1000, 2) if latencias else None,
+            }
+        }
+
+
+credenciais_service = CredenciaisService()
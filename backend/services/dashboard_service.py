@@ -0,0 +1,118 @@
+"""
+Resumo do dashboard a partir dos contadores materializados (models/dashboard.py).
+
+O resumo lê só as linhas de contadores (status de ordens e propostas,
+clientes ativos e um contador por dia dos próximos dias), sem varrer as
+tabelas. As ocorrências de séries recorrentes não são linhas: entram nos
+agendamentos expandindo as regras das séries do período (uma consulta).
+
+A reconciliação recalcula todos os contadores a partir das tabelas e roda na
+inicialização e depois a cada DASHBOARD_RECONCILIAR_SEGUNDOS (0 desliga),
+corrigindo o que escapou dos eventos (escritas em massa, outros sistemas):
+    DASHBOARD_DIAS_PROXIMOS=7   DASHBOARD_RECONCILIAR_SEGUNDOS=900
+"""
+
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+
+from config import db
+from models.ordemServico import STATUS_ORDEM_SERVICO
+from models.proposta import STATUS_PROPOSTA
+from models.dashboard import chave_agendamentos_do_dia
+from repositories.dashboard_repository import DashboardRepository
+from repositories.agendamento_repository import SerieAgendamentoRepository
+
+DASHBOARD_DIAS_PROXIMOS = int(os.environ.get('DASHBOARD_DIAS_PROXIMOS', 7))
+DASHBOARD_RECONCILIAR_SEGUNDOS = int(os.environ.get('DASHBOARD_RECONCILIAR_SEGUNDOS', 900))
+
+# Ordens nesses status não contam como abertas
+STATUS_ORDEM_ENCERRADA = ('concluida', 'cancelada')
+
+
+class DashboardService:
+    """ Serviço do resumo do dashboard """
+
+    def __init__(self):
+        self.repo = DashboardRepository()
+
+    def resumo(self, hoje: date = None) -> dict:
+        hoje = hoje or date.today()
+        dias = [hoje + timedelta(days=n) for n in range(DASHBOARD_DIAS_PROXIMOS)]
+        contadores = self.repo.get_contadores(dias)
+
+        ordens = {status: contadores.get(f"ordens:{status}", 0) for status in STATUS_ORDEM_SERVICO}
+        propostas = {status: contadores.get(f"propostas:{status}", 0) for status in STATUS_PROPOSTA}
+
+        inicio = datetime.combine(hoje, time())
+        amanha = inicio + timedelta(days=1)
+        ocorrencias = self._inicios_de_ocorrencias(inicio, inicio + timedelta(days=DASHBOARD_DIAS_PROXIMOS))
+        agendamentos_hoje = (
+            contadores.get(chave_agendamentos_do_dia(hoje), 0)
+            + sum(1 for de in ocorrencias if de < amanha)
+        )
+        agendamentos_proximos = (
+            sum(contadores.get(chave_agendamentos_do_dia(dia), 0) for dia in dias)
+            + len(ocorrencias)
+        )
+
+        return {
+            'ordens': {
+                'abertas': sum(total for status, total in ordens.items() if status not in STATUS_ORDEM_ENCERRADA),
+                'por_status': ordens,
+            },
+            'propostas': {
+                'total': sum(propostas.values()),
+                'por_status': propostas,
+            },
+            'clientes': {'ativos': contadores.get('clientes:ativos', 0)},
+            'agendamentos': {
+                'hoje': agendamentos_hoje,
+                'proximos': agendamentos_proximos,
+                'dias': DASHBOARD_DIAS_PROXIMOS,
+            },
+        }
+
+    @staticmethod
+    def _inicios_de_ocorrencias(inicio, fim) -> list:
+        """Inícios das ocorrências das séries que ocupam a agenda e começam em [inicio, fim)"""
+        return [
+            de
+            for serie in SerieAgendamentoRepository().que_ocupam(inicio, fim)
+            for de, _ in serie.ocorrencias(inicio, fim) if de >= inicio
+        ]
+
+    def reconciliar(self, hoje: date = None) -> dict:
+        """Recalcula os contadores a partir das tabelas (dias de agendamento só de hoje em diante)"""
+        return self.repo.reconciliar(hoje or date.today())
+
+
+class ReconciliacaoDashboard:
+    """ Thread que reconcilia os contadores de tempos em tempos """
+
+    def __init__(self, intervalo: int = DASHBOARD_RECONCILIAR_SEGUNDOS):
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self, app):
+        if self.intervalo <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._executar, args=(app,), name='reconciliacao-dashboard', daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _executar(self, app):
+        while not self._parar.wait(self.intervalo):
+            with app.app_context():
+                try:
+                    DashboardService().reconciliar()
+                except Exception as e:
+                    print(f"❌ Erro ao reconciliar os contadores do dashboard: {e}")
+                finally:
+                    db.session.remove()
+
+
+reconciliacao_dashboard = ReconciliacaoDashboard()
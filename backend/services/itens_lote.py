@@ -0,0 +1,98 @@
+"""
+Validação de lotes de itens (propostas e ordens de serviço).
+
+Um lote é uma lista de objetos: sem `id` é um item novo (servico_id
+obrigatório; valor_unitario, se omitido, vem do serviço); com `id` altera um
+item existente do mesmo pai, só nos campos enviados. Todo o lote é validado
+antes de qualquer escrita, com as regras (@validates) do próprio modelo, e
+os erros voltam juntos, um por item.
+"""
+
+LIMITE_ITENS_LOTE = 500
+
+# campo -> conversão aplicada ao valor recebido no JSON
+CONVERSOES = {
+    'servico_id': int,
+    'quantidade': int,
+    'valor_unitario': float,
+    'desconto': float,
+}
+
+
+def ler_lote(dados) -> list:
+    """Aceita {'itens': [...]} ou a lista direto"""
+    itens = dados.get('itens') if isinstance(dados, dict) else dados
+    if not isinstance(itens, list) or not itens:
+        raise ValueError("Informe uma lista não vazia de itens")
+    if len(itens) > LIMITE_ITENS_LOTE:
+        raise ValueError(f"No máximo {LIMITE_ITENS_LOTE} itens por lote")
+    for posicao, item in enumerate(itens, start=1):
+        if not isinstance(item, dict):
+            raise ValueError(f"Item {posicao}: deve ser um objeto")
+        if item.get('id') is not None and (isinstance(item['id'], bool) or not isinstance(item['id'], int)):
+            raise ValueError(f"Item {posicao}: id inválido")
+    return itens
+
+
+def ids_referenciados(itens):
+    """(ids dos itens existentes, ids dos serviços) citados no lote"""
+    item_ids = {item['id'] for item in itens if item.get('id') is not None}
+    servico_ids = set()
+    for item in itens:
+        try:
+            servico_ids.add(int(item['servico_id']))
+        except (KeyError, TypeError, ValueError):
+            pass
+    return item_ids, servico_ids
+
+
+def preparar_lote(modelo, itens, campos, existentes: dict, servicos: dict, calcular_total):
+    """
+    Valida o lote e devolve (novos, alterados): dicts de colunas para o
+    INSERT e pares (item, valores) para as alterações. `calcular_total`
+    recebe os valores do item e devolve o valor_total. Levanta ValueError
+    com os erros de todos os itens.
+    """
+    novos, alterados, erros = [], [], []
+    for posicao, dados in enumerate(itens, start=1):
+        try:
+            valores = {}
+            for campo in campos:
+                if dados.get(campo) is not None:
+                    try:
+                        valores[campo] = CONVERSOES[campo](dados[campo])
+                    except (TypeError, ValueError):
+                        raise ValueError(f"{campo} inválido")
+
+            item = None
+            if dados.get('id') is not None:
+                item = existentes.get(dados['id'])
+                if item is None:
+                    raise ValueError(f"item {dados['id']} não encontrado")
+                valores = {**{campo: getattr(item, campo) for campo in campos}, **valores}
+            elif 'servico_id' not in valores:
+                raise ValueError("servico_id é obrigatório")
+
+            servico = servicos.get(valores.get('servico_id'))
+            if dados.get('servico_id') is not None and servico is None:
+                raise ValueError(f"serviço {dados['servico_id']} não encontrado")
+            if valores.get('valor_unitario') is None:
+                valores['valor_unitario'] = servico.valor_unitario
+            if valores.get('quantidade') is None:
+                valores['quantidade'] = 1
+            valores['valor_total'] = calcular_total(valores)
+
+            # Instância transitória só para rodar os @validates do modelo
+            modelo(**valores)
+        except ValueError as e:
+            erros.append(f"Item {posicao}: {e}")
+            continue
+
+        if item is None:
+            novos.append(valores)
+        else:
+            alterados.append((item, valores))
+
+    if erros:
+        raise ValueError('; '.join(erros))
+    return novos, alterados
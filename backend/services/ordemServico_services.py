@@ -1,14 +1,36 @@
-from models.ordemServico import OrdemServico
-from repositories.ordemServico_repository import OrdemServicoRepository
+from models.ordemServico import OrdemServico, ItemOrdemServico
+from models.totais import COLUNAS_TOTAIS
+from repositories.ordemServico_repository import OrdemServicoRepository, ItemOrdemServicoRepository
+from repositories.servico_repository import ServicoRepository
+from repositories.unidade_trabalho import transacao
+from services.itens_lote import ler_lote, ids_referenciados, preparar_lote
+
+CAMPOS_ITEM_ORDEM = ('servico_id', 'quantidade', 'valor_unitario', 'desconto')
+# Calculados a partir dos itens (models/totais.py): ignorados nos dados recebidos
+CAMPOS_TOTAIS = COLUNAS_TOTAIS[OrdemServico]
+
+
+def _total_item_ordem(valores) -> float:
+    """Mesma regra de ItemOrdemServico.calcular_valor_total()"""
+    subtotal = valores['quantidade'] * valores['valor_unitario']
+    return subtotal - subtotal * ((valores.get('desconto') or 0) / 100)
 
 class OrdemServicoService:
     """ Serviço para gerenciar ordens de serviço """
 
     def __init__(self):
         self.repo = OrdemServicoRepository()
+        self.itens_repo = ItemOrdemServicoRepository()
+        self.servico_repo = ServicoRepository()
     
     def get_all(self):
         return self.repo.get_all()
+
+    def get_pagina(self, limit: int = None, after: int = None):
+        return self.repo.get_page(limit, after)
+
+    def iterar_todos(self):
+        return self.repo.iter_all()
     
     def get_by_id(self, ordem_servico_id: int):
         return self.repo.get_by_id(ordem_servico_id)
@@ -16,8 +38,12 @@ class OrdemServicoService:
     def get_by_agendamento(self, agendamento_id: int):
         return self.repo.get_by_agendamento(agendamento_id)
 
+    @staticmethod
+    def _sem_totais(data: dict) -> dict:
+        return {campo: valor for campo, valor in data.items() if campo not in CAMPOS_TOTAIS}
+
     def criar_ordem_servico(self, **data):
-        ordem_servico = OrdemServico(**data)
+        ordem_servico = OrdemServico(**self._sem_totais(data))
         return self.repo.create(ordem_servico)
     
     def atualizar_ordem_servico(self, ordem_servico_id: int, **data):
@@ -26,7 +52,7 @@ class OrdemServicoService:
         if not ordem_servico:
             raise ValueError("Ordem de Serviço não encontrada")
         
-        for key, value in data.items():
+        for key, value in self._sem_totais(data).items():
             setattr(ordem_servico, key, value)
         return self.repo.update(ordem_servico)
     
@@ -35,4 +61,37 @@ class OrdemServicoService:
         
         if not ordem_servico:
             raise ValueError("Ordem de Serviço não encontrada")
-        return self.repo.delete(ordem_servico)
\ No newline at end of file
+        return self.repo.delete(ordem_servico)
+
+    def salvar_itens_em_lote(self, ordem_servico_id: int, dados):
+        """
+        Cria e altera vários itens da ordem em uma transação e recalcula
+        os totais uma vez no fim. Retorna (ordem, itens do lote).
+        """
+        itens = ler_lote(dados)
+        ordem_servico = self.repo.get_sem_relacoes(ordem_servico_id)
+        if not ordem_servico:
+            raise ValueError("Ordem de Serviço não encontrada")
+
+        item_ids, servico_ids = ids_referenciados(itens)
+        novos, alterados = preparar_lote(
+            ItemOrdemServico, itens, CAMPOS_ITEM_ORDEM,
+            existentes=self.itens_repo.get_by_ids(ordem_servico_id, item_ids),
+            servicos=self.servico_repo.get_by_ids(servico_ids),
+            calcular_total=_total_item_ordem,
+        )
+
+        with transacao():
+            for item, valores in alterados:
+                for campo, valor in valores.items():
+                    setattr(item, campo, valor)
+            criados = self.itens_repo.inserir_em_lote(
+                [{'desconto': 0.0, **valores, 'ordem_servico_id': ordem_servico_id} for valores in novos]
+            )
+            # O insert em massa não passa pelos eventos que mantêm os totais (models/totais.py)
+            if criados:
+                self.repo.recalcular_totais([ordem_servico_id])
+            # Antes do commit (fim do escopo): depois dele cada acesso a um item expirado seria uma consulta
+            ids_lote = [item.id for item, _ in alterados] + sorted(item.id for item in criados)
+
+        return ordem_servico, self.itens_repo.recarregar(ids_lote)
@@ -0,0 +1,86 @@
+"""
+Cache endereçado por conteúdo dos PDFs de propostas.
+
+O nome de cada arquivo é o SHA-256 dos dados do template mais o digest dos
+arquivos de template, então a mesma revisão de uma proposta sempre cai no
+mesmo arquivo: baixar de novo uma proposta sem alterações custa a leitura do
+arquivo, não uma execução do WeasyPrint, e propostas com conteúdo idêntico
+compartilham o mesmo PDF no disco. O diretório é limitado por tamanho
+(PDF_CACHE_MAX_MB), removendo primeiro os arquivos usados há mais tempo.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+PDF_CACHE_MAX_MB = int(os.environ.get('PDF_CACHE_MAX_MB', 512))
+
+# Data de emissão impressa no PDF; não muda o conteúdo da proposta
+CAMPOS_IGNORADOS = ('data_atual',)
+
+
+def digest_templates(template_dir: str) -> str:
+    """Digest de todos os arquivos do diretório de templates"""
+    digest = hashlib.sha256()
+    for raiz, _diretorios, arquivos in sorted(os.walk(template_dir)):
+        for nome in sorted(arquivos):
+            caminho = os.path.join(raiz, nome)
+            digest.update(os.path.relpath(caminho, template_dir).encode('utf-8'))
+            with open(caminho, 'rb') as arquivo:
+                digest.update(arquivo.read())
+    return digest.hexdigest()
+
+
+class CachePDF:
+    """ Diretório de PDFs nomeados pelo hash do conteúdo, com remoção LRU por tamanho """
+
+    def __init__(self, diretorio: str, tamanho_maximo: int = PDF_CACHE_MAX_MB * 1024 * 1024):
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        self._lock = threading.Lock()
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def chave(self, template_data: dict, digest_template: str) -> str:
+        dados = {k: v for k, v in template_data.items() if k not in CAMPOS_IGNORADOS}
+        conteudo = json.dumps(dados, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(f"{digest_template}:{conteudo}".encode('utf-8')).hexdigest()
+
+    def caminho(self, chave: str) -> str:
+        return os.path.join(self.diretorio, f"{chave}.pdf")
+
+    def usar(self, caminho: str) -> bool:
+        """Se o PDF já existe, marca como usado agora (para o LRU) e retorna True"""
+        try:
+            os.utime(caminho)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def tamanho_total(self) -> int:
+        with os.scandir(self.diretorio) as entradas:
+            return sum(entrada.stat().st_size for entrada in entradas if entrada.name.endswith('.pdf'))
+
+    def aplicar_limite(self, preservar: str = None) -> int:
+        """Remove os PDFs menos usados até o diretório caber no limite; retorna quantos saíram"""
+        with self._lock:
+            with os.scandir(self.diretorio) as entradas:
+                arquivos = [
+                    (entrada.stat().st_mtime, entrada.stat().st_size, entrada.path)
+                    for entrada in entradas if entrada.name.endswith('.pdf')
+                ]
+
+            total = sum(tamanho for _uso, tamanho, _caminho in arquivos)
+            removidos = 0
+            for _uso, tamanho, caminho in sorted(arquivos):
+                if total <= self.tamanho_maximo:
+                    break
+                if preservar and os.path.abspath(caminho) == os.path.abspath(preservar):
+                    continue
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+                total -= tamanho
+                removidos += 1
+            return removidos
@@ -0,0 +1,129 @@
+"""
+Fila de geração de PDFs de propostas.
+
+A requisição só lê a proposta e prepara os dados do template (rápido, com
+acesso ao banco). A renderização — Jinja + WeasyPrint, de 1 a 3 s de CPU por
+documento — roda em um ProcessPoolExecutor, fora dos workers do Flask e
+espalhada pelos núcleos. Ao terminar, o job e as colunas pdf_gerado,
+pdf_caminho e pdf_gerado_em da proposta são atualizados. Revisões que já
+estão no cache de PDFs (services/pdf_cache.py) concluem sem renderizar.
+
+Os jobs ficam no banco da aplicação por padrão ou no Redis, escolhido por
+variável de ambiente:
+    PDF_JOBS_BACKEND=sqlite|redis   REDIS_URL=redis://...   PDF_WORKERS=4
+"""
+
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from flask import current_app
+
+from models.jobPdf import JobPDF
+from repositories.job_pdf_repository import JobPDFRepository, JobPDFRedisRepository
+from services.pdf_generator import PropostaPDF, inicializar_processo_pdf, renderizar_pdf_em_processo, WEASYPRINT_AVAILABLE
+
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', os.cpu_count() or 2))
+PDF_JOBS_BACKEND = os.environ.get('PDF_JOBS_BACKEND', 'sqlite')
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+
+def criar_repositorio_jobs(backend: str = PDF_JOBS_BACKEND):
+    """Escolhe onde os jobs são guardados"""
+    if backend == 'redis':
+        return JobPDFRedisRepository(REDIS_URL)
+    if backend == 'sqlite':
+        return JobPDFRepository()
+    raise ValueError(f"PDF_JOBS_BACKEND inválido: {backend}. Use 'sqlite' ou 'redis'")
+
+
+class FilaPDFService:
+    """ Serviço que enfileira e acompanha a geração de PDFs """
+
+    def __init__(self, repo=None, max_workers: int = PDF_WORKERS):
+        self.repo = repo or criar_repositorio_jobs()
+        self.max_workers = max_workers
+        self.gerador = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def pool(self):
+        """Cria o pool de processos no primeiro uso (e recria se um processo morrer)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=inicializar_processo_pdf
+                )
+            return self._executor
+
+    def descartar_pool(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def get_gerador(self):
+        """PropostaPDF do processo da API, usado só para preparar dados e consultar o cache"""
+        if self.gerador is None:
+            self.gerador = PropostaPDF()
+        return self.gerador
+
+    def enfileirar(self, proposta_id: int):
+        """Prepara os dados da proposta, agenda a renderização e devolve o job"""
+        if not WEASYPRINT_AVAILABLE:
+            raise ImportError("WeasyPrint não está disponível. Instale com: pip install weasyprint")
+
+        template_data, caminho_arquivo = self.get_gerador().preparar_pdf_proposta(proposta_id)
+
+        job_id = uuid.uuid4().hex
+        self.repo.create(job_id, proposta_id)
+
+        if self.gerador.cache.usar(caminho_arquivo):
+            # Revisão já renderizada: conclui na hora, sem passar pelo pool
+            self.gerador.atualizar_status_pdf_proposta(proposta_id, caminho_arquivo)
+            return self.repo.update(
+                job_id,
+                status=JobPDF.STATUS_CONCLUIDO,
+                caminho=caminho_arquivo,
+                iniciado_em=datetime.utcnow(),
+                concluido_em=datetime.utcnow()
+            )
+
+        # Marcado antes de enviar ao pool: o callback de conclusão pode rodar antes do retorno de submit()
+        job = self.repo.update(job_id, status=JobPDF.STATUS_PROCESSANDO, iniciado_em=datetime.utcnow())
+
+        app = current_app._get_current_object()
+        try:
+            future = self.pool().submit(renderizar_pdf_em_processo, template_data, caminho_arquivo)
+        except BrokenProcessPool as e:
+            self.descartar_pool()
+            return self.repo.update(job_id, status=JobPDF.STATUS_ERRO, erro=str(e), concluido_em=datetime.utcnow())
+
+        future.add_done_callback(lambda f: self._concluir(app, job_id, proposta_id, f))
+        return job
+
+    def _concluir(self, app, job_id: str, proposta_id: int, future):
+        """Callback do pool: grava o resultado no job e na proposta"""
+        with app.app_context():
+            try:
+                caminho_arquivo = future.result()
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    self.descartar_pool()
+                self.repo.update(job_id, status=JobPDF.STATUS_ERRO, erro=str(e), concluido_em=datetime.utcnow())
+                return
+
+            self.gerador.cache.aplicar_limite(preservar=caminho_arquivo)
+            self.gerador.atualizar_status_pdf_proposta(proposta_id, caminho_arquivo)
+            self.repo.update(
+                job_id,
+                status=JobPDF.STATUS_CONCLUIDO,
+                caminho=caminho_arquivo,
+                concluido_em=datetime.utcnow()
+            )
+
+    def get_job(self, job_id: str):
+        return self.repo.get_by_id(job_id)
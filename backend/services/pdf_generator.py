@@ -2,15 +2,11 @@ import os
 import json
 import shutil
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
 from reportlab.lib import colors
+from services.pdf_cache import CachePDF
+from services.pdf_renderizador import obter_renderizador, WEASYPRINT_AVAILABLE
 
-try:
-    import weasyprint
-    WEASYPRINT_AVAILABLE = True
-except ImportError:
-    WEASYPRINT_AVAILABLE = False
-    print("WeasyPrint não encontrado. Instale com: pip install weasyprint")
+if not WEASYPRINT_AVAILABLE:
     print("WeasyPrint não encontrado. Instale com: pip install weasyprint")
 
 try: 
@@ -19,7 +15,7 @@ try:
     from models.cliente import Cliente
     from models.entidadeJuridica import EntidadeJuridica
     from models.servico import Servico
-    from models import ServicoProposta
+    from repositories.proposta_repository import PropostaRepository
     MODELS_AVAILABLE = True
 except ImportError:
     MODELS_AVAILABLE = False
@@ -30,14 +26,13 @@ class PropostaPDF:
         self.upload_dir = os.path.join(os.getcwd(), 'uploads', 'pdfs')
         os.makedirs(self.upload_dir, exist_ok=True)
         
-        # Template directory setup
-        template_dir = os.path.join(os.path.dirname(__file__), '..', 'app', 'templates')
-        if not os.path.exists(template_dir):
-            template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
-        
-        self.jinja_env = Environment(loader=FileSystemLoader(template_dir))
+        # Template, CSS, fontes e logo ficam no renderizador do processo (services/pdf_renderizador.py)
+        self.renderizador = obter_renderizador()
+        self.jinja_env = self.renderizador.jinja_env
         
-        self._setup_flask_functions()
+        # PDFs nomeados pelo hash dos dados + templates (ver services/pdf_cache.py)
+        self.cache = CachePDF(self.upload_dir)
+        self.digest_template = self.renderizador.digest
         
         self.empresa = {
             'nome': 'Christino Consultoria',
@@ -62,54 +57,8 @@ class PropostaPDF:
             'branco': colors.white
         }
         
-        # Setup logo path
-        self.empresa['logo_path'] = self._find_logo_path()
-            
-    def _setup_flask_functions(self):
-        """Configura funções do Flask para o ambiente Jinja2"""
-        try:
-            from flask import Flask, url_for
-            
-            app = Flask(__name__)
-            app.config['SERVER_NAME'] = 'localhost:5000'
+        self.empresa['logo_path'] = self.renderizador.logo_path
             
-            self.jinja_env.globals['url_for'] = url_for
-            
-        except ImportError:
-            def url_for(endpoint, **values):
-                if endpoint == 'static':
-                    filename = values.get('filename', '')
-                    return f'/static/{filename}'
-                return '#'
-            
-            self.jinja_env.globals['url_for'] = url_for
-            
-        def format_currency(value):
-            """Formata valores monetários para o padrão brasileiro"""
-            if value is None:
-                return "R$ 0,00"
-            try:
-                return f"R$ {value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-            except (ValueError, TypeError):
-                return "R$ 0,00"
-        
-        self.jinja_env.filters['currency'] = format_currency
-        
-    def _find_logo_path(self):
-        """Busca o caminho do logo da empresa"""
-        possible_paths = [
-            os.path.join(os.path.dirname(__file__), '..', 'static', 'images', 'logo.png'),
-            os.path.join(os.path.dirname(__file__), '..', 'app', 'static', 'images', 'logo.png'),
-            os.path.join(os.path.dirname(__file__), '..', 'assets', 'logo.png'),
-            os.path.join(os.getcwd(), 'logo.png'),
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-                
-        return None
-        
     def gerar_pdf_proposta(self, proposta_id: int) -> str:
         """Gera PDF de uma proposta específica e atualiza o modelo"""
         
@@ -124,27 +73,13 @@ class PropostaPDF:
             from flask import current_app
             
             with current_app.app_context():
-                proposta = Proposta.query.filter_by(id=proposta_id, ativo=True).first()
-                if not proposta:
-                    raise ValueError(f"Proposta com ID {proposta_id} não encontrada")
-                
-                template_data = self._preparar_dados_proposta(proposta)
-                
-                template = self.jinja_env.get_template('modelo_pdf.html')
-                html_content = template.render(**template_data)
-                
-                nome_arquivo = f"proposta_{proposta.numero_proposta}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-                caminho_arquivo = os.path.join(self.upload_dir, nome_arquivo)
-                
-                self._gerar_pdf_weasyprint(html_content, caminho_arquivo)
+                template_data, caminho_arquivo = self.preparar_pdf_proposta(proposta_id)
+                if not self.cache.usar(caminho_arquivo):
+                    self.renderizar_pdf(template_data, caminho_arquivo)
+                    self.cache.aplicar_limite(preservar=caminho_arquivo)
                 
                 # Atualizar modelo da proposta
-                proposta.pdf_gerado = True
-                proposta.pdf_caminho = caminho_arquivo
-                proposta.pdf_gerado_em = datetime.now()
-                
-                # Salvar mudanças no banco
-                db.session.commit()
+                self.atualizar_status_pdf_proposta(proposta_id, caminho_arquivo)
                 
                 return caminho_arquivo
                 
@@ -154,12 +89,50 @@ class PropostaPDF:
             traceback.print_exc()
             raise e
             
+    def preparar_pdf_proposta(self, proposta_id: int) -> tuple:
+        """
+        Lê a proposta do banco e devolve (dados do template, caminho do arquivo).
+        Os dados são só tipos simples, então podem ser enviados a outro processo.
+        O caminho é o endereço no cache: se o arquivo já existe, não é preciso renderizar.
+        """
+        proposta = PropostaRepository().get_para_pdf(proposta_id)
+        if not proposta:
+            raise ValueError(f"Proposta com ID {proposta_id} não encontrada")
+        
+        return self.preparar_pdf(proposta)
+        
+    def gerar_pdf_bytes(self, proposta_id: int) -> bytes:
+        """Gera o PDF da proposta em memória, sem gravar em uploads/pdfs (usa o cache se houver)"""
+        template_data, caminho_arquivo = self.preparar_pdf_proposta(proposta_id)
+        if self.cache.usar(caminho_arquivo):
+            with open(caminho_arquivo, 'rb') as arquivo:
+                return arquivo.read()
+        return self.renderizador.pdf_bytes(template_data)
+        
+    def preparar_pdf(self, proposta: 'Proposta') -> tuple:
+        """Mesmo que preparar_pdf_proposta, para uma proposta já carregada (perfil de PDF)"""
+        template_data = self._preparar_dados_proposta(proposta)
+        
+        chave = self.cache.chave(template_data, self.digest_template)
+        return template_data, self.cache.caminho(chave)
+        
+    def renderizar_pdf(self, template_data: dict, caminho_arquivo: str) -> str:
+        """Renderiza o template e grava o PDF (parte pesada, sem acesso ao banco)"""
+        html_content = self.renderizador.renderizar_html(template_data)
+        
+        # Grava em arquivo temporário e troca de uma vez: duas renderizações da mesma
+        # revisão ao mesmo tempo nunca deixam um PDF pela metade no cache
+        caminho_temporario = f"{caminho_arquivo}.{os.getpid()}.tmp"
+        self._gerar_pdf_weasyprint(html_content, caminho_temporario)
+        os.replace(caminho_temporario, caminho_arquivo)
+        
+        return caminho_arquivo
+            
     def _gerar_pdf_mock(self, proposta_id: int) -> str:
         """Gera PDF usando dados mockados para teste"""
         template_data = self._criar_dados_mock(proposta_id)
         
-        template = self.jinja_env.get_template('modelo_pdf.html')
-        html_content = template.render(**template_data)
+        html_content = self.renderizador.renderizar_html(template_data)
         
         nome_arquivo = f"proposta_mock_{proposta_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         caminho_arquivo = os.path.join(self.upload_dir, nome_arquivo)
@@ -239,7 +212,7 @@ class PropostaPDF:
             
     def _preparar_dados_proposta(self, proposta: 'Proposta') -> dict:
         """Prepara dados da proposta para o template usando os campos corretos do modelo"""
-        logo_path = self._find_logo_path()
+        logo_path = self.renderizador.logo_path
         
         itens_com_servicos = []
         subtotal_servicos = 0.0
@@ -295,8 +268,8 @@ class PropostaPDF:
                     'cnpj': ej.cnpj
                 })
         
-        # Usar o valor_total já calculado do modelo
-        total_proposta = float(proposta.valor_total) if proposta.valor_total else subtotal_servicos
+        # Total guardado na proposta, mantido a partir dos itens (models/totais.py)
+        total_proposta = float(proposta.valor_total or 0.0)
         
         return {
             'data_atual': datetime.now().strftime('%d/%m/%Y'),
@@ -333,14 +306,8 @@ class PropostaPDF:
             raise ImportError("WeasyPrint não disponível")
             
         try:
-            # Configurações para WeasyPrint
-            base_url = os.path.dirname(os.path.abspath(__file__))
-            
-            # Criar documento PDF
-            html_doc = weasyprint.HTML(string=html_content, base_url=base_url)
-            
-            # Gerar PDF
-            html_doc.write_pdf(caminho_arquivo)
+            # Estilos e fontes já carregados pelo renderizador do processo
+            self.renderizador.escrever_pdf(html_content, caminho_arquivo)
             
             print(f"PDF gerado com sucesso: {caminho_arquivo}")
             
@@ -377,23 +344,9 @@ class PropostaPDF:
         
         return False
     
-    def limpar_pdfs_antigos(self, dias: int = 30) -> int:
-        """Remove PDFs mais antigos que X dias"""
-        removidos = 0
-        limite = datetime.now().timestamp() - (dias * 24 * 60 * 60)
-        
-        if os.path.exists(self.upload_dir):
-            for arquivo in os.listdir(self.upload_dir):
-                if arquivo.endswith('.pdf'):
-                    caminho = os.path.join(self.upload_dir, arquivo)
-                    if os.path.getctime(caminho) < limite:
-                        try:
-                            os.remove(caminho)
-                            removidos += 1
-                        except Exception as e:
-                            print(f"Erro ao remover {arquivo}: {e}")
-        
-        return removidos
+    def limpar_cache(self) -> int:
+        """Remove os PDFs usados há mais tempo até o cache caber em PDF_CACHE_MAX_MB"""
+        return self.cache.aplicar_limite()
 
 
 # Função de conveniência para uso direto
@@ -403,6 +356,23 @@ def gerar_pdf_proposta(proposta_id: int) -> str:
     return generator.gerar_pdf_proposta(proposta_id)
 
 
+# Gerador reaproveitado pelos processos do pool de PDFs (services/pdf_fila.py)
+_gerador_do_processo = None
+
+
+def inicializar_processo_pdf():
+    """Initializer do pool: monta gerador e renderizador (template, CSS, fontes) uma única vez por processo"""
+    global _gerador_do_processo
+    _gerador_do_processo = PropostaPDF()
+
+
+def renderizar_pdf_em_processo(template_data: dict, caminho_arquivo: str) -> str:
+    """Executada dentro de um processo do pool com o gerador já aquecido"""
+    if _gerador_do_processo is None:
+        inicializar_processo_pdf()
+    return _gerador_do_processo.renderizar_pdf(template_data, caminho_arquivo)
+
+
 # Exemplo de uso
 if __name__ == "__main__":
     # Teste da classe
@@ -0,0 +1,183 @@
+"""
+Exportação de PDFs de propostas em lote (ZIP ou um único PDF).
+
+As propostas do filtro são lidas do banco em lotes e renderizadas em
+paralelo no mesmo pool de processos da fila de PDFs, com no máximo
+JANELA_POR_WORKER documentos em andamento por processo. Cada PDF é lido do
+cache em disco e copiado para a resposta em pedaços, à medida que fica
+pronto e na ordem das propostas; nenhum documento fica inteiro na memória
+da API. Revisões que já estão no cache não passam pelo pool.
+"""
+
+import io
+import zipfile
+from collections import deque
+from datetime import datetime, timedelta
+from tempfile import SpooledTemporaryFile
+
+from repositories.proposta_repository import PropostaRepository
+from repositories.paginacao import iterar_em_lotes
+from models.proposta import Proposta
+from services.pdf_generator import renderizar_pdf_em_processo, WEASYPRINT_AVAILABLE
+
+try:
+    from pypdf import PdfWriter
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+LIMITE_PROPOSTAS_LOTE = 1000
+JANELA_POR_WORKER = 2
+TAMANHO_PEDACO = 64 * 1024
+FORMATOS = ('zip', 'pdf')
+
+
+class _SaidaEmPedacos(io.RawIOBase):
+    """Arquivo só de escrita que acumula bytes até o gerador da resposta retirá-los"""
+
+    def __init__(self):
+        self.partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+    def retirar(self) -> bytes:
+        dados = b''.join(self.partes)
+        self.partes.clear()
+        return dados
+
+
+class LotePDFService:
+    """ Serviço de exportação de PDFs em lote """
+
+    def __init__(self, fila):
+        # Reaproveita o pool de processos e o gerador da fila de PDFs
+        self.fila = fila
+        self.repo = PropostaRepository()
+
+    def _ler_data(self, valor, nome: str, fim: bool = False):
+        if valor in (None, ''):
+            return None
+        try:
+            data = datetime.fromisoformat(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f"{nome} deve estar no formato AAAA-MM-DD")
+        if fim and len(valor) == 10:
+            data += timedelta(days=1)
+        return data
+
+    def preparar_lote(self, formato: str = 'zip', status: str = None, data_inicio: str = None,
+                      data_fim: str = None, cliente_id: int = None):
+        """Valida o pedido e devolve a consulta das propostas; erros de filtro levantam ValueError"""
+        if not WEASYPRINT_AVAILABLE:
+            raise ImportError("WeasyPrint não está disponível. Instale com: pip install weasyprint")
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato inválido: {formato}. Use um de: {', '.join(FORMATOS)}")
+        if formato == 'pdf' and not PYPDF_AVAILABLE:
+            raise ImportError("pypdf não está disponível. Instale com: pip install pypdf")
+        if cliente_id is not None:
+            try:
+                cliente_id = int(cliente_id)
+            except (TypeError, ValueError):
+                raise ValueError("cliente_id deve ser um número inteiro")
+
+        query = self.repo.consultar_para_pdf(
+            status=status,
+            inicio=self._ler_data(data_inicio, 'data_inicio'),
+            fim=self._ler_data(data_fim, 'data_fim', fim=True),
+            cliente_id=cliente_id,
+        )
+        quantidade = query.count()
+        if quantidade == 0:
+            raise ValueError("Nenhuma proposta encontrada para o filtro informado")
+        if quantidade > LIMITE_PROPOSTAS_LOTE:
+            raise ValueError(
+                f"O filtro retornou {quantidade} propostas; o limite por lote é {LIMITE_PROPOSTAS_LOTE}"
+            )
+        return query
+
+    def renderizar(self, query):
+        """
+        Gera (numero_proposta, caminho_do_pdf, erro) na ordem das propostas.
+
+        Mantém uma janela limitada de renderizações em andamento no pool, para
+        que a leitura do banco, a renderização e o envio andem juntos.
+        """
+        gerador = self.fila.get_gerador()
+        pool = self.fila.pool()
+        janela = max(1, self.fila.max_workers * JANELA_POR_WORKER)
+        pendentes = deque()
+
+        def proximo_pronto():
+            numero, caminho, future = pendentes.popleft()
+            if future is None:
+                return numero, caminho, None
+            try:
+                return numero, future.result(), None
+            except Exception as e:
+                return numero, None, str(e)
+
+        for proposta in iterar_em_lotes(query, Proposta):
+            template_data, caminho = gerador.preparar_pdf(proposta)
+            if gerador.cache.usar(caminho):
+                pendentes.append((proposta.numero_proposta, caminho, None))
+            else:
+                future = pool.submit(renderizar_pdf_em_processo, template_data, caminho)
+                pendentes.append((proposta.numero_proposta, caminho, future))
+
+            while len(pendentes) >= janela:
+                yield proximo_pronto()
+
+        while pendentes:
+            yield proximo_pronto()
+
+        gerador.cache.aplicar_limite()
+
+    def gerar_zip(self, query):
+        """Stream de um ZIP com um PDF por proposta (e ERROS.txt, se alguma falhar)"""
+        saida = _SaidaEmPedacos()
+        erros = []
+        with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_STORED) as arquivo_zip:
+            for numero, caminho, erro in self.renderizar(query):
+                if erro:
+                    erros.append(f"{numero}: {erro}")
+                    continue
+                with open(caminho, 'rb') as pdf, arquivo_zip.open(f"proposta_{numero}.pdf", 'w') as destino:
+                    while True:
+                        pedaco = pdf.read(TAMANHO_PEDACO)
+                        if not pedaco:
+                            break
+                        destino.write(pedaco)
+                        yield saida.retirar()
+            if erros:
+                arquivo_zip.writestr('ERROS.txt', '\n'.join(erros))
+        yield saida.retirar()
+
+    def gerar_pdf_unico(self, query):
+        """
+        Stream de um único PDF com todas as propostas.
+
+        O pypdf precisa do documento inteiro para escrever a tabela de
+        referências, então o resultado é montado em um arquivo temporário
+        (em disco acima de 10 MB) e enviado em pedaços.
+        """
+        writer = PdfWriter()
+        for numero, caminho, erro in self.renderizar(query):
+            if erro:
+                print(f"Erro ao gerar PDF da proposta {numero}: {erro}")
+                continue
+            writer.append(caminho)
+
+        with SpooledTemporaryFile(max_size=10 * 1024 * 1024) as temporario:
+            writer.write(temporario)
+            writer.close()
+            temporario.seek(0)
+            while True:
+                pedaco = temporario.read(TAMANHO_PEDACO)
+                if not pedaco:
+                    break
+                yield pedaco
@@ -0,0 +1,138 @@
+"""
+Renderizador de PDFs de propostas, criado uma única vez por processo.
+
+Tudo que não depende da proposta é preparado na construção e reaproveitado
+em cada documento: o template Jinja compilado, a folha de estilos
+(templates/modelo_pdf.css) já interpretada pelo WeasyPrint, a configuração
+de fontes e o logo embutido como data URI. Use obter_renderizador() para
+pegar a instância do processo.
+"""
+
+import base64
+import hashlib
+import mimetypes
+import os
+import threading
+from jinja2 import Environment, FileSystemLoader
+
+from services.pdf_cache import digest_templates
+
+try:
+    import weasyprint
+    from weasyprint.text.fonts import FontConfiguration
+    WEASYPRINT_AVAILABLE = True
+except ImportError:
+    WEASYPRINT_AVAILABLE = False
+
+TEMPLATE_PDF = 'modelo_pdf.html'
+CSS_PDF = 'modelo_pdf.css'
+
+
+def _diretorio_templates() -> str:
+    template_dir = os.path.join(os.path.dirname(__file__), '..', 'app', 'templates')
+    if not os.path.exists(template_dir):
+        template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
+    return os.path.abspath(template_dir)
+
+
+def _caminho_logo():
+    """Busca o caminho do logo da empresa"""
+    possible_paths = [
+        os.path.join(os.path.dirname(__file__), '..', 'static', 'images', 'logo.png'),
+        os.path.join(os.path.dirname(__file__), '..', 'app', 'static', 'images', 'logo.png'),
+        os.path.join(os.path.dirname(__file__), '..', 'assets', 'logo.png'),
+        os.path.join(os.getcwd(), 'logo.png'),
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+
+    return None
+
+
+def formatar_moeda(value):
+    """Formata valores monetários para o padrão brasileiro"""
+    if value is None:
+        return "R$ 0,00"
+    try:
+        return f"R$ {value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    except (ValueError, TypeError):
+        return "R$ 0,00"
+
+
+def _url_for(endpoint, **values):
+    """url_for mínimo para o template, sem depender de uma aplicação Flask"""
+    if endpoint == 'static':
+        filename = values.get('filename', '')
+        return f'/static/{filename}'
+    return '#'
+
+
+class RenderizadorPDF:
+    """ Template, estilos, fontes e logo carregados uma vez e usados em todos os PDFs """
+
+    def __init__(self, template_dir: str = None):
+        self.template_dir = template_dir or _diretorio_templates()
+
+        self.jinja_env = Environment(loader=FileSystemLoader(self.template_dir))
+        self.jinja_env.filters['currency'] = formatar_moeda
+        self.jinja_env.globals['url_for'] = _url_for
+
+        self.logo_path = _caminho_logo()
+        logo = None
+        if self.logo_path:
+            with open(self.logo_path, 'rb') as arquivo:
+                logo = arquivo.read()
+        tipo_logo = mimetypes.guess_type(self.logo_path or '')[0] or 'image/png'
+        self.jinja_env.globals['logo_uri'] = (
+            f"data:{tipo_logo};base64,{base64.b64encode(logo).decode('ascii')}" if logo else None
+        )
+
+        self.template = self.jinja_env.get_template(TEMPLATE_PDF)
+
+        # Muda quando qualquer template, a folha de estilos ou o logo mudam (chave do cache de PDFs)
+        self.digest = hashlib.sha256(
+            (digest_templates(self.template_dir) + hashlib.sha256(logo or b'').hexdigest()).encode('ascii')
+        ).hexdigest()
+
+        self.font_config = None
+        self.css = None
+        if WEASYPRINT_AVAILABLE:
+            self.font_config = FontConfiguration()
+            self.css = weasyprint.CSS(
+                filename=os.path.join(self.template_dir, CSS_PDF),
+                font_config=self.font_config
+            )
+
+    def renderizar_html(self, template_data: dict) -> str:
+        return self.template.render(**template_data)
+
+    def escrever_pdf(self, html_content: str, destino=None):
+        """
+        Converte o HTML em PDF com os estilos e fontes pré-carregados.
+        Sem `destino` devolve os bytes do PDF, sem passar pelo disco.
+        """
+        if not WEASYPRINT_AVAILABLE:
+            raise ImportError("WeasyPrint não disponível")
+
+        documento = weasyprint.HTML(string=html_content, base_url=self.template_dir)
+        return documento.write_pdf(destino, stylesheets=[self.css], font_config=self.font_config)
+
+    def pdf_bytes(self, template_data: dict) -> bytes:
+        """Renderiza os dados direto para bytes (para enviar na resposta ou anexar)"""
+        return self.escrever_pdf(self.renderizar_html(template_data))
+
+
+_renderizador = None
+_lock = threading.Lock()
+
+
+def obter_renderizador() -> RenderizadorPDF:
+    """Renderizador do processo, criado no primeiro uso"""
+    global _renderizador
+    if _renderizador is None:
+        with _lock:
+            if _renderizador is None:
+                _renderizador = RenderizadorPDF()
+    return _renderizador
@@ -1,14 +1,30 @@
-from models.proposta import Proposta
-from repositories.proposta_repository import PropostaRepository
+from models.proposta import Proposta, ItemProposta
+from models.totais import COLUNAS_TOTAIS
+from repositories.proposta_repository import PropostaRepository, ItemPropostaRepository
+from repositories.servico_repository import ServicoRepository
+from repositories.unidade_trabalho import transacao
+from services.itens_lote import ler_lote, ids_referenciados, preparar_lote
+
+CAMPOS_ITEM_PROPOSTA = ('servico_id', 'quantidade', 'valor_unitario')
+# Calculados a partir dos itens (models/totais.py): ignorados nos dados recebidos
+CAMPOS_TOTAIS = COLUNAS_TOTAIS[Proposta]
 
 class PropostaService:
     """ Serviço para gerenciar propostas """
 
     def __init__(self):
         self.repo = PropostaRepository()
+        self.itens_repo = ItemPropostaRepository()
+        self.servico_repo = ServicoRepository()
     
     def get_all(self):
         return self.repo.get_all()
+
+    def get_pagina(self, limit: int = None, after: int = None):
+        return self.repo.get_page(limit, after)
+
+    def iterar_todos(self):
+        return self.repo.iter_all()
     
     def get_by_id(self, proposta_id: int):
         return self.repo.get_by_id(proposta_id)
@@ -16,8 +32,15 @@ class PropostaService:
     def get_by_cliente(self, cliente_id: int):
         return self.repo.get_by_cliente(cliente_id)
 
+    def get_totais(self, status: str = None, cliente_id: int = None):
+        return self.repo.get_totais(status, cliente_id)
+
+    @staticmethod
+    def _sem_totais(data: dict) -> dict:
+        return {campo: valor for campo, valor in data.items() if campo not in CAMPOS_TOTAIS}
+
     def criar_proposta(self, **data):
-        proposta = Proposta(**data)
+        proposta = Proposta(**self._sem_totais(data))
         return self.repo.create(proposta)
     
     def atualizar_proposta(self, proposta_id: int, **data):
@@ -26,7 +49,7 @@ class PropostaService:
         if not proposta:
             raise ValueError("Proposta não encontrada")
         
-        for key, value in data.items():
+        for key, value in self._sem_totais(data).items():
             setattr(proposta, key, value)
         return self.repo.update(proposta)
     
@@ -36,3 +59,37 @@ class PropostaService:
         if not proposta:
             raise ValueError("Proposta não encontrada")
         return self.repo.delete(proposta)
+
+    def salvar_itens_em_lote(self, proposta_id: int, dados):
+        """
+        Cria e altera vários itens da proposta em uma transação e recalcula
+        os totais uma vez no fim. Retorna (proposta, itens do lote).
+        """
+        itens = ler_lote(dados)
+        proposta = self.repo.get_sem_relacoes(proposta_id)
+        if not proposta:
+            raise ValueError("Proposta não encontrada")
+
+        item_ids, servico_ids = ids_referenciados(itens)
+        novos, alterados = preparar_lote(
+            ItemProposta, itens, CAMPOS_ITEM_PROPOSTA,
+            existentes=self.itens_repo.get_by_ids(proposta_id, item_ids),
+            servicos=self.servico_repo.get_by_ids(servico_ids),
+            calcular_total=lambda valores: valores['quantidade'] * valores['valor_unitario'],
+        )
+
+        with transacao():
+            for item, valores in alterados:
+                for campo, valor in valores.items():
+                    setattr(item, campo, valor)
+            criados = self.itens_repo.inserir_em_lote(
+                [{**valores, 'proposta_id': proposta_id} for valores in novos]
+            )
+
+            # O insert em massa não passa pelos eventos que mantêm os totais (models/totais.py)
+            if criados:
+                self.repo.recalcular_totais([proposta_id])
+            # Antes do commit (fim do escopo): depois dele cada acesso a um item expirado seria uma consulta
+            ids_lote = [item.id for item, _ in alterados] + sorted(item.id for item in criados)
+
+        return proposta, self.itens_repo.recarregar(ids_lote)
@@ -1,5 +1,6 @@
 from models.entidadeJuridica import RegimeTributario
 from repositories.regime_tributario_repository import RegimeTributarioRepository
+from models.referencias import cache_referencias
 
 class RegimeTributarioService:
     """ Serviços para gerenciar regimes tributários """
@@ -11,6 +12,10 @@ class RegimeTributarioService:
         """Retorna todos os regimes tributários"""
         return self.repo.get_all()
     
+    def listar_json(self):
+        """(JSON dos ativos, ETag) vindos do cache de referências"""
+        return cache_referencias.listar_com_etag('regimes_tributarios')
+
     def get_by_id(self, regime_id: int):
         """Retorna regime tributário por ID"""
         regime = self.repo.get_by_id(regime_id)
@@ -37,7 +42,9 @@ class RegimeTributarioService:
         
         # Criar regime
         regime = RegimeTributario(**data)
-        return self.repo.create(regime)
+        resultado = self.repo.create(regime)
+        cache_referencias.invalidar('regimes_tributarios')
+        return resultado
     
     def atualizar_regime(self, regime_id: int, **data):
         """Atualiza um regime tributário existente"""
@@ -56,7 +63,9 @@ class RegimeTributarioService:
             if hasattr(regime, key):
                 setattr(regime, key, value)
         
-        return self.repo.update(regime)
+        resultado = self.repo.update(regime)
+        cache_referencias.invalidar('regimes_tributarios')
+        return resultado
     
     def deletar_regime(self, regime_id: int):
         """Remove um regime tributário"""
@@ -68,4 +77,6 @@ class RegimeTributarioService:
         if regime.entidades_juridicas.count() > 0:
             raise ValueError("Não é possível deletar regime com entidades jurídicas vinculadas")
         
-        return self.repo.delete(regime)
\ No newline at end of file
+        resultado = self.repo.delete(regime)
+        cache_referencias.invalidar('regimes_tributarios')
+        return resultado
\ No newline at end of file
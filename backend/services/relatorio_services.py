@@ -1,11 +1,16 @@
+from datetime import datetime, timedelta
 from models.relatorio import Relatorio
-from repositories.relatorio_repository import RelatorioRepository
+from repositories.relatorio_repository import RelatorioRepository, RelatorioAgregacaoRepository
+
+FILTROS_RELATORIO = ('data_inicio', 'data_fim', 'status', 'limite')
+LIMITE_RANKING = 10
 
 class RelatorioService:
     """ Serviço para gerenciar relatórios """
     
     def __init__(self):
         self.repo = RelatorioRepository()
+        self.agregacao = RelatorioAgregacaoRepository()
         
     def get_all(self):
         return self.repo.get_all()
@@ -31,4 +36,162 @@ class RelatorioService:
         
         if not relatorio:
             raise ValueError("Relatorio não encontrado")
-        return self.repo.delete(relatorio)
\ No newline at end of file
+        return self.repo.delete(relatorio)
+
+    # ======================================================
+    # Relatórios agregados (GROUP BY no banco, uma consulta por relatório)
+    # ======================================================
+
+    def _ler_data(self, valor, nome: str, fim: bool = False):
+        if valor in (None, ''):
+            return None
+        try:
+            data = datetime.fromisoformat(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f"{nome} deve estar no formato AAAA-MM-DD")
+        # Data sem hora no fim do período inclui o dia inteiro
+        if fim and len(valor) == 10:
+            data += timedelta(days=1)
+        return data
+
+    def _ler_filtros(self, filtros: dict):
+        desconhecidos = [nome for nome in filtros if nome not in FILTROS_RELATORIO]
+        if desconhecidos:
+            raise ValueError(f"Filtro(s) inválido(s): {', '.join(desconhecidos)}")
+
+        limite = filtros.get('limite', LIMITE_RANKING)
+        try:
+            limite = int(limite)
+        except (TypeError, ValueError):
+            raise ValueError("limite deve ser um número inteiro")
+        if limite < 1:
+            raise ValueError("limite deve ser maior que zero")
+
+        return {
+            'inicio': self._ler_data(filtros.get('data_inicio'), 'data_inicio'),
+            'fim': self._ler_data(filtros.get('data_fim'), 'data_fim', fim=True),
+            'status': filtros.get('status') or None,
+            'limite': limite,
+        }
+
+    def _gerar(self, tipo: str, dimensoes, filtros: dict):
+        """Executa as agregações e monta o envelope comum dos relatórios"""
+        parametros = self._ler_filtros(filtros)
+        grupos = self.agregacao.agregar(dimensoes, **parametros)
+
+        for linhas in grupos.values():
+            for linha in linhas:
+                linha['valor'] = round(linha['valor'] or 0.0, 2)
+                linha['quantidade'] = linha['quantidade'] or 0
+
+        relatorio = {
+            'tipo': tipo,
+            'periodo': {'data_inicio': filtros.get('data_inicio'), 'data_fim': filtros.get('data_fim')},
+            'gerado_em': datetime.now().isoformat(),
+        }
+        for nome, _fonte, dimensao in dimensoes:
+            linhas = grupos[nome]
+            if dimensao == 'total':
+                # Agregação sem GROUP BY devolve sempre uma única linha
+                relatorio[nome] = {'quantidade': linhas[0]['quantidade'], 'valor': linhas[0]['valor']}
+            elif dimensao == 'mes':
+                relatorio[nome] = sorted(linhas, key=lambda linha: linha['chave'] or '')
+            else:
+                relatorio[nome] = sorted(linhas, key=lambda linha: (-linha['valor'], -linha['quantidade']))
+        return relatorio
+
+    def _por_chave(self, linhas):
+        return {linha['chave']: linha for linha in linhas}
+
+    def _taxa(self, parte, todo):
+        return round(parte / todo, 4) if todo else 0.0
+
+    def gerar_relatorio_propostas(self, **filtros):
+        relatorio = self._gerar('propostas', [
+            ('totais', 'propostas', 'total'),
+            ('por_status', 'propostas', 'status'),
+            ('por_mes', 'propostas', 'mes'),
+            ('por_cliente', 'propostas', 'cliente'),
+            ('por_usuario', 'propostas', 'usuario'),
+        ], filtros)
+
+        status = self._por_chave(relatorio['por_status'])
+        quantidade = lambda nome: status.get(nome, {}).get('quantidade', 0)
+        # Rascunhos ainda não foram apresentados ao cliente e ficam fora da conversão
+        enviadas = relatorio['totais']['quantidade'] - quantidade('rascunho')
+        relatorio['conversao'] = {
+            'enviadas': enviadas,
+            'aceitas': quantidade('aceita'),
+            'rejeitadas': quantidade('rejeitada'),
+            'expiradas': quantidade('expirada'),
+            'taxa_conversao': self._taxa(quantidade('aceita'), enviadas),
+            'taxa_rejeicao': self._taxa(quantidade('rejeitada'), enviadas),
+        }
+        return relatorio
+
+    def gerar_relatorio_clientes(self, **filtros):
+        relatorio = self._gerar('clientes', [
+            ('totais', 'clientes', 'total'),
+            ('novos_por_mes', 'clientes', 'mes'),
+            ('por_propostas', 'propostas', 'cliente'),
+            ('por_ordens_servico', 'ordens_servico', 'cliente'),
+        ], filtros)
+        relatorio['totais'] = {'quantidade': relatorio['totais']['quantidade']}
+        return relatorio
+
+    def gerar_relatorio_agendamentos(self, **filtros):
+        return self._gerar('agendamentos', [
+            ('totais', 'agendamentos', 'total'),
+            ('por_status', 'agendamentos', 'status'),
+            ('por_tipo', 'agendamentos', 'tipo'),
+            ('por_mes', 'agendamentos', 'mes'),
+            ('por_funcionario', 'agendamentos', 'funcionario'),
+        ], filtros)
+
+    def gerar_relatorio_servicos(self, **filtros):
+        return self._gerar('servicos', [
+            ('totais', 'itens_propostas', 'total'),
+            ('propostas_por_servico', 'itens_propostas', 'servico'),
+            ('totais_ordens_servico', 'itens_ordens_servico', 'total'),
+            ('ordens_por_servico', 'itens_ordens_servico', 'servico'),
+        ], filtros)
+
+    def gerar_relatorio_financeiro(self, **filtros):
+        relatorio = self._gerar('financeiro', [
+            ('totais', 'propostas', 'total'),
+            ('propostas_por_status', 'propostas', 'status'),
+            ('propostas_por_mes', 'propostas', 'mes'),
+            ('totais_ordens_servico', 'ordens_servico', 'total'),
+            ('ordens_por_status', 'ordens_servico', 'status'),
+            ('ordens_por_mes', 'ordens_servico', 'mes'),
+            ('ordens_por_departamento', 'ordens_servico', 'departamento'),
+        ], filtros)
+
+        propostas = self._por_chave(relatorio['propostas_por_status'])
+        ordens = self._por_chave(relatorio['ordens_por_status'])
+        totais_os = relatorio['totais_ordens_servico']
+        relatorio['resumo'] = {
+            'valor_propostas': relatorio['totais']['valor'],
+            'valor_propostas_aceitas': propostas.get('aceita', {}).get('valor', 0.0),
+            'valor_ordens_servico': totais_os['valor'],
+            'valor_ordens_concluidas': ordens.get('concluida', {}).get('valor', 0.0),
+            'ticket_medio_ordem_servico': round(totais_os['valor'] / totais_os['quantidade'], 2) if totais_os['quantidade'] else 0.0,
+        }
+        return relatorio
+
+    def gerar_relatorio_customizado(self, fonte: str = None, agrupar_por=None, titulo: str = None, filtros=None, **outros):
+        # Filtros podem vir no objeto "filtros" ou direto no corpo
+        filtros = {**(filtros or {}), **outros}
+        if not fonte:
+            raise ValueError("fonte é obrigatória")
+        if isinstance(agrupar_por, str):
+            agrupar_por = [agrupar_por]
+        agrupar_por = list(agrupar_por or [])
+
+        dimensoes = [('totais', fonte, 'total')]
+        dimensoes += [(f'por_{dimensao}', fonte, dimensao) for dimensao in agrupar_por if dimensao != 'total']
+        relatorio = self._gerar('customizado', dimensoes, filtros)
+        relatorio['titulo'] = titulo
+        relatorio['fonte'] = fonte
+        relatorio['agrupar_por'] = agrupar_por
+        return relatorio
@@ -1,5 +1,6 @@
 from models.servico import Servico, CategoriaServico
 from repositories.servico_repository import ServicoRepository, CategoriaServicoRepository
+from models.referencias import cache_referencias
 
 class ServicoService:
     """ Serviço para gerenciar serviços """
@@ -68,6 +69,8 @@ class CategoriaServicoService:
     
     def get_all(self):
         return self.repo.get_all()
+    def listar_json(self):
+        return cache_referencias.listar_com_etag('categorias_servico')
     def get_by_id(self, categoria_id: int):
         return self.repo.get_by_id(categoria_id)
     
@@ -76,7 +79,9 @@ class CategoriaServicoService:
         
         if 'nome' in data and self.repo.get_by_nome(data['nome']):
             raise ValueError("Categoria já cadastrada")
-        return self.repo.create(categoria)
+        resultado = self.repo.create(categoria)
+        cache_referencias.invalidar('categorias_servico')
+        return resultado
     def atualizar_categoria(self, categoria_id: int, **data):
         categoria = self.repo.get_by_id(categoria_id)
         
@@ -88,11 +93,15 @@ class CategoriaServicoService:
         
         for key, value in data.items():
             setattr(categoria, key, value)
-        return self.repo.update(categoria)
+        resultado = self.repo.update(categoria)
+        cache_referencias.invalidar('categorias_servico')
+        return resultado
     
     def deletar_categoria(self, categoria_id: int):
         categoria = self.repo.get_by_id(categoria_id)
         
         if not categoria:
             raise ValueError("Categoria não encontrada")
-        return self.repo.delete(categoria)
\ No newline at end of file
+        resultado = self.repo.delete(categoria)
+        cache_referencias.invalidar('categorias_servico')
+        return resultado
\ No newline at end of file
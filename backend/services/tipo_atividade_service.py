@@ -1,5 +1,6 @@
 from models.tipoAtividade import TipoAtividade
 from repositories.tipo_atividade_repository import TipoAtividadeRepository
+from models.referencias import cache_referencias
 
 class TipoAtividadeService:
     """ Serviços para gerenciar tipos de atividade """
@@ -11,6 +12,10 @@ class TipoAtividadeService:
         """Retorna todos os tipos de atividade"""
         return self.repo.get_all()
     
+    def listar_json(self):
+        """(JSON dos ativos, ETag) vindos do cache de referências"""
+        return cache_referencias.listar_com_etag('tipos_atividade')
+
     def get_by_id(self, tipo_id: int):
         """Retorna tipo de atividade por ID"""
         tipo = self.repo.get_by_id(tipo_id)
@@ -43,7 +48,9 @@ class TipoAtividadeService:
         
         # Criar tipo
         tipo = TipoAtividade(**data)
-        return self.repo.create(tipo)
+        resultado = self.repo.create(tipo)
+        cache_referencias.invalidar('tipos_atividade')
+        return resultado
     
     def atualizar_tipo(self, tipo_id: int, **data):
         """Atualiza um tipo de atividade existente"""
@@ -68,7 +75,9 @@ class TipoAtividadeService:
             if hasattr(tipo, key):
                 setattr(tipo, key, value)
         
-        return self.repo.update(tipo)
+        resultado = self.repo.update(tipo)
+        cache_referencias.invalidar('tipos_atividade')
+        return resultado
     
     def deletar_tipo(self, tipo_id: int):
         """Remove um tipo de atividade"""
@@ -76,4 +85,6 @@ class TipoAtividadeService:
         if not tipo:
             raise ValueError("Tipo de atividade não encontrado")
         
-        return self.repo.delete(tipo)
\ No newline at end of file
+        resultado = self.repo.delete(tipo)
+        cache_referencias.invalidar('tipos_atividade')
+        return resultado
\ No newline at end of file
@@ -1,12 +1,20 @@
 from repositories.usuario_repository import UsuarioRepository
+from repositories.login_identificador_repository import LoginIdentificadorRepository
 from models.organizacional import Usuario
 from datetime import datetime, timedelta
-from config import db
+from repositories.unidade_trabalho import confirmar
+from middleware.principal_cache import cache_principais
+from middleware.autenticacao_middleware import revogar_tokens_usuario
+from services.credenciais_service import credenciais_service, CredenciaisOcupadas
+from services.busca_service import BuscaService
 
 class UsuarioService:
 
     def __init__(self):
         self.repo = UsuarioRepository()
+        self.login_repo = LoginIdentificadorRepository()
+        self.credenciais = credenciais_service
+        self.busca = BuscaService()
     
     def get_all(self):
         """Listar todos os usuários ativos"""
@@ -16,12 +24,25 @@ class UsuarioService:
         """Buscar usuário por ID"""
         return Usuario.query.filter_by(id=usuario_id, ativo=True).first()
     
+    def search_by_name_or_email(self, termo: str):
+        """Busca funcionários por nome ou email no índice de busca, do mais relevante ao menos"""
+        ids = self.busca.buscar_ids(termo, 'usuario')
+        if not ids:
+            return []
+        por_id = {usuario.id: usuario for usuario in Usuario.query.filter(Usuario.id.in_(ids), Usuario.ativo == True)}
+        return [por_id[usuario_id] for usuario_id in ids if usuario_id in por_id]
+    
     def get_by_username(self, username: str):
         return self.repo.get_by_username(username)
     
     def get_usuario_por_ultimo_login(self, dias: int):
         return self.repo.get_usuario_por_ultimo_login(dias)
     
+    def _definir_senha(self, usuario: Usuario, senha: str):
+        """Valida e grava o hash da senha, calculado no executor de credenciais"""
+        Usuario.validar_senha(senha)
+        usuario.senha_hash = self.credenciais.gerar_hash(senha)
+    
     def criar_usuario(self, **data):
         """Criar novo usuário"""
         if not data.get('username'):
@@ -34,7 +55,9 @@ class UsuarioService:
         if self.repo.verificar_usuario_existe(data['username']):
             raise ValueError("Username já existe")
         
+        senha = data.pop('senha')
         usuario = Usuario(**data)
+        self._definir_senha(usuario, senha)
         self.repo.criar_usuario(usuario)
         return usuario
     
@@ -57,8 +80,10 @@ class UsuarioService:
         usuario.cargo_id = data.get('cargo_id', usuario.cargo_id)
         
         if 'senha' in data:
-            usuario.set_senha(data['senha'])
+            self._definir_senha(usuario, data['senha'])
         self.repo.atualizar_usuario(usuario)
+        # Papel e dados do usuário podem ter mudado: os tokens em cache leem de novo do banco
+        cache_principais.invalidar_usuario(usuario_id)
         return usuario
     
     def deletar_usuario(self, usuario_id: int):
@@ -66,15 +91,17 @@ class UsuarioService:
         usuario = self.get_by_id(usuario_id)
         if usuario:
             usuario.ativo = False
-            db.session.commit()
+            confirmar()
+            cache_principais.invalidar_usuario(usuario_id)
+            revogar_tokens_usuario(usuario_id)
     
     def alterar_senha(self, usuario_id: int, senha_atual: str, nova_senha: str):
         usuario = self.repo.get_by_id(usuario_id)
         if not usuario:
             raise ValueError("Usuário não encontrado")
-        if not usuario.check_password(senha_atual):
+        if not self.credenciais.verificar(usuario.senha_hash, senha_atual):
             raise ValueError("Senha atual incorreta")
-        usuario.set_password(nova_senha)
+        self._definir_senha(usuario, nova_senha)
         self.repo.atualizar_usuario(usuario)
         return usuario
     
@@ -82,7 +109,7 @@ class UsuarioService:
         usuario = self.repo.get_by_username(username)
         if not usuario:
             raise ValueError("Usuário não encontrado")
-        if not usuario.check_password(senha):
+        if not self.credenciais.verificar(usuario.senha_hash, senha):
             usuario.tentativas_login += 1
             if usuario.tentativas_login >= 3:
                 self.repo.bloquear_usuario(usuario, 1)
@@ -92,43 +119,35 @@ class UsuarioService:
         return usuario
     
     def validar_credenciais(self, identificador, senha):
-        """Validar credenciais usando email, username ou CPF"""
+        """Validar credenciais usando username, email ou CPF (uma consulta na tabela de identificadores)"""
         try:
-            print(f"Tentando login com identificador: {identificador}")
-            
-            # Tentar buscar por username primeiro
-            usuario = Usuario.query.filter_by(username=identificador, ativo=True).first()
-            
-            # Se não encontrou por username, tentar por email
-            if not usuario:
-                usuario = Usuario.query.filter_by(email=identificador, ativo=True).first()
-            
-            # Se não encontrou por email, tentar por CPF
+            usuario = self.login_repo.buscar_usuario(identificador)
             if not usuario:
-                usuario = Usuario.query.filter_by(cpf=identificador, ativo=True).first()
-            
-            if not usuario:
-                print("Usuário não encontrado")
                 return None
             
-            # Verificar se a senha está correta
-            if not usuario.verificar_senha(senha):
-                print("Senha incorreta")
+            # Verificar se a senha está correta (no executor de credenciais)
+            if not self.credenciais.verificar(usuario.senha_hash, senha):
                 return None
             
-            print(f"Login realizado com sucesso para: {usuario.email}")
-            
             # Verificar se não está bloqueado
             if usuario.bloqueado_ate and usuario.bloqueado_ate > datetime.utcnow():
                 raise ValueError("Usuário bloqueado")
             
+            # Hash gravado com método antigo: refazer com o atual enquanto temos a senha
+            if self.credenciais.precisa_rehash(usuario.senha_hash):
+                novo_hash = self.credenciais.tentar_rehash(senha)
+                if novo_hash:
+                    usuario.senha_hash = novo_hash
+            
             # Atualizar último login
             usuario.ultimo_login = datetime.utcnow()
             usuario.tentativas_login = 0
-            db.session.commit()
+            confirmar()
             
             return usuario
             
+        except CredenciaisOcupadas:
+            raise
         except Exception as e:
             print(f"Erro na validação de credenciais: {str(e)}")
             return None
@@ -152,7 +171,7 @@ class UsuarioService:
             print(f"Usuário encontrado: {usuario.nome}")
             
             # Verificar senha
-            if not usuario.verificar_senha(senha):
+            if not self.credenciais.verificar(usuario.senha_hash, senha):
                 print("Senha incorreta")
                 return None
             
@@ -160,10 +179,12 @@ class UsuarioService:
             # Atualizar último login
             usuario.ultimo_login = datetime.utcnow()
             usuario.tentativas_login = 0
-            db.session.commit()
+            confirmar()
             
             return usuario
             
+        except CredenciaisOcupadas:
+            raise
         except Exception as e:
             print(f"Erro na validação: {e}")
             return None
@@ -0,0 +1,33 @@
+"""
+Fixtures dos testes: uma aplicação isolada com banco SQLite em memória (como
+benchmarks/ambiente.py), com as tabelas criadas do zero a cada teste.
+
+Uso (na pasta backend):
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from flask import Flask
+
+from config import db
+from roteamento_banco import CONFIG_REPLICAS
+import models  # registra os modelos e os eventos
+
+
+@pytest.fixture
+def app():
+    app = Flask('testes')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config[CONFIG_REPLICAS] = ()
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,104 @@
+"""Expansão das regras de recorrência (models/recorrencia.py)"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.recorrencia import ocorrencias, fim_da_serie
+
+HORA = timedelta(hours=1)
+# Segunda-feira
+INICIO = datetime(2026, 1, 5, 9, 0)
+JANELA_ABERTA = {'janela_inicio': datetime(2000, 1, 1), 'janela_fim': datetime(2100, 1, 1)}
+
+
+def inicios(**regra) -> list:
+    return [de for de, _ in ocorrencias(**{'duracao': HORA, **JANELA_ABERTA, **regra})]
+
+
+def test_diaria_com_intervalo():
+    assert inicios(inicio=INICIO, frequencia='diaria', intervalo=2, contagem=4) == [
+        datetime(2026, 1, 5, 9), datetime(2026, 1, 7, 9), datetime(2026, 1, 9, 9), datetime(2026, 1, 11, 9),
+    ]
+
+
+def test_semanal_pula_dias_da_primeira_semana_antes_do_inicio():
+    quarta = datetime(2026, 1, 7, 9, 0)
+    assert inicios(inicio=quarta, frequencia='semanal', dias_semana=(0, 2), contagem=3) == [
+        datetime(2026, 1, 7, 9), datetime(2026, 1, 12, 9), datetime(2026, 1, 14, 9),
+    ]
+
+
+def test_semanal_sem_dias_repete_no_dia_do_inicio():
+    assert inicios(inicio=INICIO, frequencia='semanal', intervalo=2, contagem=3) == [
+        datetime(2026, 1, 5, 9), datetime(2026, 1, 19, 9), datetime(2026, 2, 2, 9),
+    ]
+
+
+def test_mensal_pula_meses_sem_o_dia():
+    assert inicios(inicio=datetime(2026, 1, 31, 9), frequencia='mensal', contagem=4) == [
+        datetime(2026, 1, 31, 9), datetime(2026, 3, 31, 9), datetime(2026, 5, 31, 9), datetime(2026, 7, 31, 9),
+    ]
+
+
+def test_ate_inclui_a_ocorrencia_que_comeca_nele():
+    assert inicios(inicio=INICIO, frequencia='diaria', ate=datetime(2026, 1, 7, 9)) == [
+        datetime(2026, 1, 5, 9), datetime(2026, 1, 6, 9), datetime(2026, 1, 7, 9),
+    ]
+
+
+def test_contagem_conta_as_excecoes():
+    excecoes = frozenset({datetime(2026, 1, 6, 9)})
+    assert inicios(inicio=INICIO, frequencia='diaria', contagem=3, excecoes=excecoes) == [
+        datetime(2026, 1, 5, 9), datetime(2026, 1, 7, 9),
+    ]
+
+
+def test_janela_inclui_ocorrencias_que_a_cruzam():
+    resultado = list(ocorrencias(
+        inicio=INICIO, duracao=2 * HORA, frequencia='diaria',
+        janela_inicio=datetime(2026, 1, 10, 10), janela_fim=datetime(2026, 1, 12, 10),
+    ))
+    assert resultado == [
+        (datetime(2026, 1, 10, 9), datetime(2026, 1, 10, 11)),
+        (datetime(2026, 1, 11, 9), datetime(2026, 1, 11, 11)),
+        (datetime(2026, 1, 12, 9), datetime(2026, 1, 12, 11)),
+    ]
+
+
+def test_serie_sem_fim_gera_so_a_janela():
+    resultado = list(ocorrencias(
+        inicio=INICIO, duracao=HORA, frequencia='semanal', dias_semana=(0, 4),
+        janela_inicio=datetime(2036, 1, 1), janela_fim=datetime(2036, 1, 15),
+    ))
+    assert [de for de, _ in resultado] == [
+        datetime(2036, 1, 4, 9), datetime(2036, 1, 7, 9), datetime(2036, 1, 11, 9), datetime(2036, 1, 14, 9),
+    ]
+
+
+@pytest.mark.parametrize('regra', [
+    {'frequencia': 'diaria', 'intervalo': 3, 'contagem': 40},
+    {'frequencia': 'semanal', 'intervalo': 2, 'dias_semana': (1, 3, 5), 'contagem': 40},
+    {'frequencia': 'mensal', 'intervalo': 1, 'ate': datetime(2028, 12, 31)},
+])
+def test_salto_para_a_janela_igual_a_expansao_completa(regra):
+    regra = {'inicio': INICIO, 'duracao': 3 * HORA, **regra}
+    completa = list(ocorrencias(**regra, **JANELA_ABERTA))
+    for dias in (0, 10, 45, 200, 400):
+        janela_inicio = INICIO + timedelta(days=dias, hours=1)
+        janela_fim = janela_inicio + timedelta(days=20)
+        esperado = [(de, ate) for de, ate in completa if de < janela_fim and ate > janela_inicio]
+        assert list(ocorrencias(**regra, janela_inicio=janela_inicio, janela_fim=janela_fim)) == esperado
+
+
+def test_fim_da_serie():
+    assert fim_da_serie(INICIO, HORA, 'diaria', contagem=3) == datetime(2026, 1, 7, 10)
+    assert fim_da_serie(INICIO, HORA, 'diaria', ate=datetime(2026, 2, 1)) == datetime(2026, 2, 1, 1)
+    # O limite menor vale
+    assert fim_da_serie(INICIO, HORA, 'semanal', contagem=2, ate=datetime(2026, 3, 1)) == datetime(2026, 1, 12, 10)
+    assert fim_da_serie(INICIO, HORA, 'mensal') is None
+
+
+def test_frequencia_invalida():
+    with pytest.raises(ValueError):
+        inicios(inicio=INICIO, frequencia='anual')
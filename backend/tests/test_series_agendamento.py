@@ -0,0 +1,63 @@
+"""Conferência de conflitos das séries recorrentes e listagem por período (services/agendamento_services.py)"""
+
+import pytest
+
+from config import db
+from models import Usuario
+from services.agendamento_services import AgendamentoService, SerieAgendamentoService, ConflitoAgendamento
+
+SEMANAL = {
+    'titulo': 'Reunião semanal', 'data_inicio': '2026-01-05T09:00', 'duracao_minutos': 60,
+    'frequencia': 'semanal', 'dias_semana': [0, 2],
+}
+
+
+@pytest.fixture
+def funcionario_id(app):
+    usuario = Usuario(nome='Ana', email='ana@teste.com', username='ana', senha_hash='x')
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario.id
+
+
+def test_serie_sem_fim_e_recusada(funcionario_id):
+    with pytest.raises(ValueError, match='ate ou contagem'):
+        SerieAgendamentoService().criar_serie(funcionario_id=funcionario_id, **SEMANAL)
+
+
+def test_serie_longa_demais_e_recusada(funcionario_id):
+    with pytest.raises(ValueError, match='dias do início'):
+        SerieAgendamentoService().criar_serie(funcionario_id=funcionario_id, ate='2040-01-01T00:00', **SEMANAL)
+
+
+def test_conflito_depois_do_primeiro_ano(funcionario_id):
+    agendamento = AgendamentoService().criar_agendamento(
+        titulo='Visita', funcionario_id=funcionario_id,
+        data_inicio='2028-03-01T09:30', data_fim='2028-03-01T10:30',
+    )
+    with pytest.raises(ConflitoAgendamento) as erro:
+        SerieAgendamentoService().criar_serie(funcionario_id=funcionario_id, ate='2029-01-01T00:00', **SEMANAL)
+    assert erro.value.conflitos == [agendamento.id]
+
+
+def test_agendamento_em_conflito_com_serie(funcionario_id):
+    serie = SerieAgendamentoService().criar_serie(funcionario_id=funcionario_id, contagem=10, **SEMANAL)
+    with pytest.raises(ConflitoAgendamento) as erro:
+        AgendamentoService().criar_agendamento(
+            titulo='Visita', funcionario_id=funcionario_id,
+            data_inicio='2026-01-14T09:30', data_fim='2026-01-14T10:00',
+        )
+    assert erro.value.series == [serie.id]
+
+
+def test_periodo_aberto_com_series_na_selecao(funcionario_id):
+    SerieAgendamentoService().criar_serie(funcionario_id=funcionario_id, contagem=4, **SEMANAL)
+    service = AgendamentoService()
+    with pytest.raises(ValueError, match='informe inicio e fim'):
+        service.get_por_periodo(inicio='2026-01-01')
+    with pytest.raises(ValueError, match='informe inicio e fim'):
+        service.get_por_periodo(funcionario_id=funcionario_id)
+    # Depois do fim da série a janela aberta não tem ocorrências
+    assert service.get_por_periodo(inicio='2026-02-01') == []
+    ocorrencias = service.get_por_periodo(inicio='2026-01-01', fim='2026-02-01')
+    assert [o.data_inicio.day for o in ocorrencias] == [5, 7, 12, 14]
@@ -0,0 +1,191 @@
+"""Totais guardados de propostas e ordens mantidos pelos eventos dos itens (models/totais.py)"""
+
+import pytest
+from sqlalchemy import insert, select
+
+from config import db
+from models import Proposta, ItemProposta, OrdemServico, ItemOrdemServico
+from models.totais import COLUNAS_TOTAIS
+from repositories.proposta_repository import PropostaRepository
+from repositories.ordemServico_repository import OrdemServicoRepository
+
+
+def totais_no_banco(modelo, registro_id: int) -> dict:
+    """Colunas de totais lidas direto da tabela (sem o objeto da sessão)"""
+    tabela = modelo.__table__
+    colunas = COLUNAS_TOTAIS[modelo]
+    linha = db.session.execute(
+        select(*(tabela.c[coluna] for coluna in colunas)).where(tabela.c.id == registro_id)
+    ).one()
+    return dict(zip(colunas, linha))
+
+
+def criar_proposta(numero: str = 'PROP-1', desconto: int = 0) -> Proposta:
+    proposta = Proposta(numero_proposta=numero, porcentagem_desconto=desconto)
+    db.session.add(proposta)
+    db.session.commit()
+    return proposta
+
+
+def item(proposta: Proposta, quantidade: int, valor_unitario: float) -> ItemProposta:
+    return ItemProposta(
+        proposta=proposta, quantidade=quantidade,
+        valor_unitario=valor_unitario, valor_total=quantidade * valor_unitario,
+    )
+
+
+def test_inserir_itens_soma_na_proposta(app):
+    proposta = criar_proposta(desconto=10)
+    db.session.add_all([item(proposta, 2, 50.0), item(proposta, 1, 30.0)])
+    db.session.commit()
+
+    esperado = {'subtotal': 130.0, 'quantidade_itens': 3, 'valor_desconto': 13.0, 'valor_total': 117.0}
+    assert totais_no_banco(Proposta, proposta.id) == esperado
+    # O objeto da sessão acompanha a linha sem recarregar
+    assert {coluna: getattr(proposta, coluna) for coluna in esperado} == esperado
+
+
+def test_alterar_item_soma_so_a_diferenca(app):
+    proposta = criar_proposta()
+    primeiro, segundo = item(proposta, 1, 100.0), item(proposta, 1, 20.0)
+    db.session.add_all([primeiro, segundo])
+    db.session.commit()
+
+    primeiro.quantidade = 3
+    primeiro.valor_total = 300.0
+    db.session.commit()
+
+    assert totais_no_banco(Proposta, proposta.id) == {
+        'subtotal': 320.0, 'quantidade_itens': 4, 'valor_desconto': 0.0, 'valor_total': 320.0,
+    }
+
+
+def test_desativar_e_reativar_item(app):
+    proposta = criar_proposta()
+    mantido, desativado = item(proposta, 1, 40.0), item(proposta, 2, 25.0)
+    db.session.add_all([mantido, desativado])
+    db.session.commit()
+
+    desativado.desativar()
+    db.session.commit()
+    assert totais_no_banco(Proposta, proposta.id)['subtotal'] == 40.0
+    assert totais_no_banco(Proposta, proposta.id)['quantidade_itens'] == 1
+
+    desativado.ativar()
+    db.session.commit()
+    assert totais_no_banco(Proposta, proposta.id)['subtotal'] == 90.0
+    assert totais_no_banco(Proposta, proposta.id)['quantidade_itens'] == 3
+
+
+def test_excluir_item(app):
+    proposta = criar_proposta()
+    removido = item(proposta, 1, 15.0)
+    db.session.add_all([item(proposta, 1, 10.0), removido])
+    db.session.commit()
+
+    db.session.delete(removido)
+    db.session.commit()
+
+    assert totais_no_banco(Proposta, proposta.id)['subtotal'] == 10.0
+    assert totais_no_banco(Proposta, proposta.id)['quantidade_itens'] == 1
+
+
+def test_trocar_item_de_proposta(app):
+    origem = criar_proposta('PROP-1')
+    destino = criar_proposta('PROP-2', desconto=50)
+    movido = item(origem, 2, 10.0)
+    db.session.add_all([movido, item(origem, 1, 5.0), item(destino, 1, 100.0)])
+    db.session.commit()
+
+    movido.proposta_id = destino.id
+    db.session.commit()
+
+    assert totais_no_banco(Proposta, origem.id) == {
+        'subtotal': 5.0, 'quantidade_itens': 1, 'valor_desconto': 0.0, 'valor_total': 5.0,
+    }
+    assert totais_no_banco(Proposta, destino.id) == {
+        'subtotal': 120.0, 'quantidade_itens': 3, 'valor_desconto': 60.0, 'valor_total': 60.0,
+    }
+
+
+def test_trocar_de_proposta_e_alterar_valor_no_mesmo_flush(app):
+    origem = criar_proposta('PROP-1')
+    destino = criar_proposta('PROP-2')
+    movido = item(origem, 1, 10.0)
+    db.session.add(movido)
+    db.session.commit()
+
+    movido.proposta_id = destino.id
+    movido.valor_total = 70.0
+    db.session.commit()
+
+    assert totais_no_banco(Proposta, origem.id)['subtotal'] == 0.0
+    assert totais_no_banco(Proposta, destino.id)['subtotal'] == 70.0
+
+
+def test_mudar_porcentagem_de_desconto(app):
+    proposta = criar_proposta()
+    db.session.add(item(proposta, 1, 200.0))
+    db.session.commit()
+
+    proposta.porcentagem_desconto = 25
+    db.session.commit()
+
+    assert totais_no_banco(Proposta, proposta.id) == {
+        'subtotal': 200.0, 'quantidade_itens': 1, 'valor_desconto': 50.0, 'valor_total': 150.0,
+    }
+
+
+def test_rollback_nao_altera_os_totais(app):
+    proposta = criar_proposta()
+    db.session.add(item(proposta, 1, 10.0))
+    db.session.commit()
+
+    db.session.add(item(proposta, 1, 99.0))
+    db.session.flush()
+    db.session.rollback()
+
+    assert totais_no_banco(Proposta, proposta.id)['subtotal'] == 10.0
+
+
+def test_recalcular_totais_depois_de_insert_em_massa(app):
+    proposta = criar_proposta(desconto=10)
+    outra = criar_proposta('PROP-2')
+    db.session.add(item(proposta, 1, 10.0))
+    db.session.commit()
+
+    # insert() direto na tabela não passa pelos eventos do ORM
+    db.session.execute(insert(ItemProposta.__table__), [
+        {'proposta_id': proposta.id, 'quantidade': 1, 'valor_unitario': 20.0, 'valor_total': 20.0, 'ativo': True},
+        {'proposta_id': proposta.id, 'quantidade': 2, 'valor_unitario': 35.0, 'valor_total': 70.0, 'ativo': True},
+        {'proposta_id': proposta.id, 'quantidade': 1, 'valor_unitario': 500.0, 'valor_total': 500.0, 'ativo': False},
+    ])
+    db.session.commit()
+    assert totais_no_banco(Proposta, proposta.id)['subtotal'] == 10.0
+
+    assert PropostaRepository().recalcular_totais([proposta.id]) == 1
+    assert totais_no_banco(Proposta, proposta.id) == {
+        'subtotal': 100.0, 'quantidade_itens': 4, 'valor_desconto': 10.0, 'valor_total': 90.0,
+    }
+    assert totais_no_banco(Proposta, outra.id)['subtotal'] == 0.0
+
+
+def test_totais_da_ordem(app):
+    ordem = OrdemServico(protocolo='OS-0001')
+    db.session.add(ordem)
+    db.session.commit()
+
+    com_desconto = ItemOrdemServico(ordem_servico=ordem, quantidade=2, valor_unitario=50.0, valor_total=90.0, desconto=10.0)
+    db.session.add_all([com_desconto, ItemOrdemServico(ordem_servico=ordem, quantidade=1, valor_unitario=30.0, valor_total=30.0)])
+    db.session.commit()
+    assert totais_no_banco(OrdemServico, ordem.id) == {'subtotal_os': 130.0, 'desconto_os': 10.0, 'valor_total_os': 120.0}
+
+    com_desconto.desativar()
+    db.session.commit()
+    assert totais_no_banco(OrdemServico, ordem.id) == {'subtotal_os': 30.0, 'desconto_os': 0.0, 'valor_total_os': 30.0}
+
+    db.session.execute(insert(ItemOrdemServico.__table__), [
+        {'ordem_servico_id': ordem.id, 'quantidade': 1, 'valor_unitario': 40.0, 'valor_total': 40.0, 'ativo': True},
+    ])
+    OrdemServicoRepository().recalcular_totais([ordem.id])
+    assert totais_no_banco(OrdemServico, ordem.id) == {'subtotal_os': 70.0, 'desconto_os': 0.0, 'valor_total_os': 70.0}